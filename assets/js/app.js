@@ -71,6 +71,48 @@ var EXPERT_VIEWS = {
   'reset':  { orbit: '35deg 75deg 2.5m', fov: '45deg', label: 'Vue initiale' }
 };
 
+/**
+ * Configuration de la telemetrie (chargement et interactions)
+ * endpoint : URL du collecteur (scripts/telemetry_collector.py), ou attribut
+ * data-telemetry-endpoint sur <model-viewer>. Sans endpoint, rien n'est envoye.
+ */
+var TELEMETRY_CONFIG = {
+  endpoint: null,
+  batchSize: 20,
+  flushInterval: 15000,
+  frameSampleDuration: 2000
+};
+
+/**
+ * Configuration du cache des modeles (Blob object URLs en memoire)
+ * maxBytes : plafond du cache LRU ; prefetch : charger pendant les temps
+ * morts l'etat de la phase suivante
+ */
+var MODEL_CACHE_CONFIG = {
+  maxBytes: 48 * 1024 * 1024,
+  prefetch: true,
+  idleTimeout: 2000
+};
+
+/**
+ * Animation de demontage (scripts/export_states.py --disassembly) :
+ * manifest JSON des temps de chaque etat, ou attribut data-disassembly
+ * sur <model-viewer>. Sans manifest, un GLB par etat est charge.
+ */
+var DISASSEMBLY_CONFIG = {
+  manifest: null,
+  maxTransition: 1.5
+};
+
+/**
+ * GLB progressifs (scripts/progressive_glb.py) : la version grossiere,
+ * en tete du fichier, est affichee des son arrivee. Active par
+ * l'attribut data-progressive sur <model-viewer> ou par enabled.
+ */
+var PROGRESSIVE_CONFIG = {
+  enabled: false
+};
+
 var currentPhase = 0;
 var currentState = 'state_a';
 
@@ -82,20 +124,26 @@ document.addEventListener('DOMContentLoaded', function() {
 
   modelViewer.addEventListener('load', function() {
     console.log('[AR Module] Modele 3D charge');
+    telemetryModelLoaded();
     initHotspots();
+    scheduleModelPrefetch();
   });
 
   modelViewer.addEventListener('error', function(e) {
     console.error('[AR Module] Erreur de chargement:', e);
   });
 
-  // Initialiser les controles
+  // Initialiser la telemetrie et les controles
+  initTelemetry(modelViewer);
+  initSceneViewerGuard(modelViewer);
   initStateButtons();
   initPhaseButtons();
   initViewButtons();
 
-  // Afficher phase 0
-  setPhase(0);
+  // Afficher phase 0 (apres lecture du manifest de demontage, s'il existe)
+  initDisassembly(modelViewer, function() {
+    setPhase(0);
+  });
 });
 
 /**
@@ -173,8 +221,28 @@ function setState(stateId) {
   var modelViewer = document.getElementById('moteur-hemi');
   var state = STATES[stateId];
 
-  // Changer le modele
-  modelViewer.src = state.src;
+  // Changer le modele : position dans l'animation de demontage, ou
+  // GLB de l'etat (depuis le cache si deja telecharge)
+  if (disassembly) {
+    if (modelViewer.src !== disassembly.url) {
+      // GLB de l'etat remis pour Scene Viewer : retour a l'animation
+      telemetryLoadStarted(stateId, disassembly.url);
+      modelViewer.src = disassembly.url;
+    } else {
+      scrubDisassembly(modelViewer, disassembly.times[stateId]);
+    }
+  } else {
+    var src = getCachedModelUrl(stateId);
+    if (!src && isProgressiveEnabled(modelViewer) && window.ReadableStream) {
+      loadProgressiveModel(modelViewer, stateId);
+    } else {
+      src = src || state.src;
+      if (modelViewer.src !== src) {
+        telemetryLoadStarted(stateId, src);
+      }
+      modelViewer.src = src;
+    }
+  }
 
   // Mettre a jour les boutons
   var buttons = document.querySelectorAll('.state-btn');
@@ -299,6 +367,589 @@ function prevPhase() {
   }
 }
 
+/**
+ * DEMONTAGE : un seul GLB anime, chaque etat est un instant de l'animation
+ */
+var disassembly = null;       // { url, times: { stateId: secondes } }
+var disassemblyTween = null;
+
+function initDisassembly(modelViewer, done) {
+  var manifestUrl = modelViewer.getAttribute('data-disassembly') || DISASSEMBLY_CONFIG.manifest;
+  if (!manifestUrl || !window.fetch) {
+    done();
+    return;
+  }
+
+  fetch(manifestUrl)
+    .then(function(response) {
+      if (!response.ok) throw new Error('HTTP ' + response.status);
+      return response.json();
+    })
+    .then(function(manifest) {
+      // Etats du manifest associes par nom de fichier GLB
+      var times = {};
+      manifest.states.forEach(function(entry) {
+        for (var stateId in STATES) {
+          if (STATES[stateId].src.split('/').pop() === entry.filename) {
+            times[stateId] = entry.time;
+          }
+        }
+      });
+
+      disassembly = {
+        url: new URL(manifest.model, new URL(manifestUrl, document.baseURI)).href,
+        times: times
+      };
+      modelViewer.addEventListener('load', function() {
+        if (modelViewer.src !== disassembly.url) return;
+        modelViewer.pause();
+        modelViewer.currentTime = disassembly.times[currentState] || 0;
+      });
+      telemetryLoadStarted(currentState, disassembly.url);
+      modelViewer.src = disassembly.url;
+      console.log('[AR Module] Animation de demontage:', manifest.model);
+    })
+    .catch(function(e) {
+      console.warn('[AR Module] Manifest de demontage illisible, un GLB par etat:', e);
+    })
+    .then(done);
+}
+
+/**
+ * Deplace la tete de lecture vers `time` (vitesse naturelle de
+ * l'animation, transition plafonnee a DISASSEMBLY_CONFIG.maxTransition)
+ */
+function scrubDisassembly(modelViewer, time) {
+  if (time === undefined) return;
+  if (disassemblyTween) cancelAnimationFrame(disassemblyTween);
+
+  var from = modelViewer.currentTime || 0;
+  var duration = Math.min(Math.abs(time - from), DISASSEMBLY_CONFIG.maxTransition) * 1000;
+  var start = performance.now();
+
+  function tick(now) {
+    var progress = duration > 0 ? Math.min(1, (now - start) / duration) : 1;
+    modelViewer.currentTime = from + (time - from) * progress;
+    disassemblyTween = progress < 1 ? requestAnimationFrame(tick) : null;
+  }
+  disassemblyTween = requestAnimationFrame(tick);
+}
+
+/**
+ * CHARGEMENT PROGRESSIF : lecture du GLB en flux, affichage de la version
+ * grossiere (extras.progressive) puis du modele complet
+ */
+var progressiveLoad = null;   // { stateId, controller, coarseUrl }
+
+function isProgressiveEnabled(modelViewer) {
+  return PROGRESSIVE_CONFIG.enabled || modelViewer.hasAttribute('data-progressive');
+}
+
+/**
+ * Tampon de reception qui double de taille quand il deborde : chaque
+ * octet n'est recopie qu'un nombre borne de fois
+ */
+function createReceiveBuffer(initialSize) {
+  var buffer = {
+    bytes: new Uint8Array(Math.max(initialSize, 64 * 1024)),
+    length: 0
+  };
+  buffer.append = function(chunk) {
+    if (buffer.length + chunk.length > buffer.bytes.length) {
+      var size = buffer.bytes.length;
+      while (size < buffer.length + chunk.length) size *= 2;
+      var grown = new Uint8Array(size);
+      grown.set(buffer.bytes.subarray(0, buffer.length));
+      buffer.bytes = grown;
+    }
+    buffer.bytes.set(chunk, buffer.length);
+    buffer.length += chunk.length;
+  };
+  buffer.view = function() {
+    return buffer.bytes.subarray(0, buffer.length);
+  };
+  return buffer;
+}
+
+/**
+ * En-tete progressif (extras.progressive) des que le chunk JSON est
+ * arrive ; false si le fichier n'est pas progressif ; null s'il manque
+ * encore des octets. Le JSON n'est lu qu'une fois.
+ */
+function readProgressiveHeader(bytes) {
+  if (bytes.length < 20) return null;
+  var view = new DataView(bytes.buffer, bytes.byteOffset, bytes.byteLength);
+  var jsonLength = view.getUint32(12, true);
+  if (bytes.length < 20 + jsonLength) return null;
+
+  var gltf = JSON.parse(new TextDecoder().decode(bytes.subarray(20, 20 + jsonLength)));
+  var progressive = gltf.extras && gltf.extras.progressive;
+  if (!progressive) return false;
+
+  return {
+    coarse: progressive.coarse,
+    binStart: 20 + jsonLength + 8,
+    coarseLength: progressive.coarseByteLength
+  };
+}
+
+/**
+ * GLB grossier a partir de l'en-tete progressif et des octets recus
+ * (au moins binStart + coarseLength)
+ */
+function buildCoarseGlb(progressive, bytes) {
+  var coarseLength = progressive.coarseLength;
+
+  // Chunk JSON complete par des espaces (alignement sur 4 octets)
+  var encoded = new TextEncoder().encode(JSON.stringify(progressive.coarse));
+  var jsonBytes = new Uint8Array(Math.ceil(encoded.length / 4) * 4).fill(0x20);
+  jsonBytes.set(encoded);
+
+  var header = new DataView(new ArrayBuffer(20));
+  header.setUint32(0, 0x46546C67, true);   // "glTF"
+  header.setUint32(4, 2, true);
+  header.setUint32(8, 12 + 8 + jsonBytes.length + 8 + coarseLength, true);
+  header.setUint32(12, jsonBytes.length, true);
+  header.setUint32(16, 0x4E4F534A, true);  // "JSON"
+
+  var binHeader = new DataView(new ArrayBuffer(8));
+  binHeader.setUint32(0, coarseLength, true);
+  binHeader.setUint32(4, 0x004E4942, true); // "BIN\0"
+
+  return new Blob(
+    [header.buffer, jsonBytes, binHeader.buffer,
+     bytes.subarray(progressive.binStart, progressive.binStart + coarseLength)],
+    { type: 'model/gltf-binary' }
+  );
+}
+
+function loadProgressiveModel(modelViewer, stateId) {
+  if (progressiveLoad) {
+    if (progressiveLoad.stateId === stateId) return;
+    if (progressiveLoad.controller) progressiveLoad.controller.abort();
+    delete modelCachePending[progressiveLoad.stateId];
+  }
+
+  var src = STATES[stateId].src;
+  var load = {
+    stateId: stateId,
+    controller: window.AbortController ? new AbortController() : null,
+    coarseUrl: null
+  };
+  progressiveLoad = load;
+  modelCachePending[stateId] = true;
+  telemetryLoadStarted(stateId, src);
+
+  fetch(src, load.controller ? { signal: load.controller.signal } : {})
+    .then(function(response) {
+      if (!response.ok || !response.body) throw new Error('HTTP ' + response.status);
+
+      var reader = response.body.getReader();
+      var received = createReceiveBuffer(parseInt(response.headers.get('Content-Length'), 10) || 0);
+      var progressive = null;   // en-tete lu, false si non progressif
+      var coarseDone = false;
+
+      function pump() {
+        return reader.read().then(function(result) {
+          if (result.done) return;
+          received.append(result.value);
+
+          if (progressive === null) {
+            progressive = readProgressiveHeader(received.view());
+          }
+          if (progressive && !coarseDone &&
+              received.length >= progressive.binStart + progressive.coarseLength) {
+            coarseDone = true;
+            if (currentState === stateId) {
+              load.coarseUrl = URL.createObjectURL(buildCoarseGlb(progressive, received.view()));
+              telemetryLoadLevel(stateId, load.coarseUrl, 'coarse');
+              modelViewer.src = load.coarseUrl;
+              console.log('[AR Module] Version grossiere affichee:', stateId);
+            }
+          }
+          return pump();
+        });
+      }
+
+      return pump().then(function() {
+        return new Blob([received.view()], { type: 'model/gltf-binary' });
+      });
+    })
+    .then(function(blob) {
+      storeCachedModel(stateId, blob);
+      if (currentState === stateId) {
+        // Hors cache (trop gros) : l'URL reseau est servie par le cache HTTP
+        var fullUrl = getCachedModelUrl(stateId) || src;
+        telemetryLoadLevel(stateId, fullUrl, 'full');
+        modelViewer.src = fullUrl;
+      }
+    })
+    .catch(function(e) {
+      if (e.name === 'AbortError') return;
+      console.warn('[AR Module] Chargement progressif impossible:', stateId, e);
+      if (currentState === stateId) {
+        telemetryLoadLevel(stateId, src, 'full');
+        modelViewer.src = src;
+      }
+    })
+    .then(function() {
+      if (load.coarseUrl) URL.revokeObjectURL(load.coarseUrl);
+      if (progressiveLoad === load) {
+        progressiveLoad = null;
+        delete modelCachePending[stateId];
+      }
+    });
+}
+
+/**
+ * CACHE DES MODELES : GLB deja telecharges gardes en Blob object URLs
+ * (LRU plafonne a MODEL_CACHE_CONFIG.maxBytes, URL revoquee a l'eviction)
+ */
+var modelCache = {};      // stateId -> { url, bytes }
+var modelCacheOrder = []; // du moins au plus recemment utilise
+var modelCacheBytes = 0;
+var modelCachePending = {};
+
+function getCachedModelUrl(stateId) {
+  var entry = modelCache[stateId];
+  if (!entry) return null;
+
+  modelCacheOrder.splice(modelCacheOrder.indexOf(stateId), 1);
+  modelCacheOrder.push(stateId);
+  return entry.url;
+}
+
+function storeCachedModel(stateId, blob) {
+  if (modelCache[stateId] || blob.size > MODEL_CACHE_CONFIG.maxBytes) return;
+
+  evictCachedModels(MODEL_CACHE_CONFIG.maxBytes - blob.size);
+  if (modelCacheBytes + blob.size > MODEL_CACHE_CONFIG.maxBytes) return;
+
+  modelCache[stateId] = { url: URL.createObjectURL(blob), bytes: blob.size };
+  modelCacheOrder.push(stateId);
+  modelCacheBytes += blob.size;
+}
+
+/**
+ * Evince les entrees les moins recentes jusqu'a descendre sous maxBytes.
+ * Le modele affiche n'est jamais revoque (AR et rechargements en dependent).
+ */
+function evictCachedModels(maxBytes) {
+  var displayed = document.getElementById('moteur-hemi').src;
+
+  for (var i = 0; i < modelCacheOrder.length && modelCacheBytes > maxBytes;) {
+    var stateId = modelCacheOrder[i];
+    var entry = modelCache[stateId];
+    if (entry.url === displayed) {
+      i++;
+      continue;
+    }
+    URL.revokeObjectURL(entry.url);
+    modelCacheBytes -= entry.bytes;
+    modelCacheOrder.splice(i, 1);
+    delete modelCache[stateId];
+  }
+}
+
+function fetchModel(stateId) {
+  if (modelCache[stateId] || modelCachePending[stateId] || !window.fetch) return;
+
+  modelCachePending[stateId] = true;
+  telemetryMarkPrefetch(STATES[stateId].src);
+  fetch(STATES[stateId].src)
+    .then(function(response) {
+      if (!response.ok) throw new Error('HTTP ' + response.status);
+      return response.blob();
+    })
+    .then(function(blob) {
+      storeCachedModel(stateId, blob);
+    })
+    .catch(function(e) {
+      console.warn('[AR Module] Prechargement impossible:', stateId, e);
+    })
+    .then(function() {
+      delete modelCachePending[stateId];
+    });
+}
+
+/**
+ * Apres chaque chargement, pendant les temps morts : mise en cache de
+ * l'etat affiche (souvent servi par le cache HTTP) puis de celui de la
+ * phase suivante
+ */
+function scheduleModelPrefetch() {
+  if (!MODEL_CACHE_CONFIG.prefetch || disassembly) return;
+
+  var idle = window.requestIdleCallback || function(callback) {
+    return setTimeout(callback, 1);
+  };
+
+  idle(function() {
+    fetchModel(currentState);
+
+    var next = PHASES[currentPhase + 1];
+    if (next && next.state !== currentState) {
+      fetchModel(next.state);
+    }
+  }, { timeout: MODEL_CACHE_CONFIG.idleTimeout });
+}
+
+/**
+ * Mode AR retenu par le model-viewer : premier mode de ar-modes disponible
+ * sur l'appareil ('webxr', 'scene-viewer', 'quick-look' ou null)
+ */
+function resolveArMode(modelViewer) {
+  var modes = (modelViewer.getAttribute('ar-modes') || 'webxr scene-viewer quick-look').split(/\s+/);
+  var android = /Android/i.test(navigator.userAgent);
+  var ios = /iPhone|iPad|iPod/i.test(navigator.userAgent);
+  var webxr = navigator.xr && navigator.xr.isSessionSupported
+    ? navigator.xr.isSessionSupported('immersive-ar').catch(function() { return false; })
+    : Promise.resolve(false);
+
+  return webxr.then(function(webxrSupported) {
+    for (var i = 0; i < modes.length; i++) {
+      if (modes[i] === 'webxr' && webxrSupported) return 'webxr';
+      if (modes[i] === 'scene-viewer' && android) return 'scene-viewer';
+      if (modes[i] === 'quick-look' && ios) return 'quick-look';
+    }
+    return null;
+  });
+}
+
+/**
+ * Scene Viewer (AR Android) recoit l'URL du modele dans un intent : une
+ * Blob URL y est illisible, et le GLB de demontage y serait affiche au
+ * debut de l'animation (currentTime ignore). Avant l'activation AR, l'URL
+ * reseau du GLB de l'etat est remise. Inutile en WebXR (prioritaire dans
+ * ar-modes) et Quick Look, qui partent de la scene affichee.
+ */
+function initSceneViewerGuard(modelViewer) {
+  if (!/Android/i.test(navigator.userAgent)) return;
+
+  var arButton = modelViewer.querySelector('[slot="ar-button"]');
+  if (!arButton) return;
+
+  // Scene Viewer tant que la detection WebXR n'a pas repondu
+  var arMode = 'scene-viewer';
+  resolveArMode(modelViewer).then(function(mode) {
+    arMode = mode;
+  });
+
+  // Phase de capture : passe avant le gestionnaire du model-viewer
+  modelViewer.addEventListener('click', function(e) {
+    if (!arButton.contains(e.target) || arMode !== 'scene-viewer') return;
+    if ((modelViewer.src || '').indexOf('blob:') === 0 || disassembly) {
+      modelViewer.src = STATES[currentState].src;
+    }
+  }, true);
+}
+
+/**
+ * TELEMETRIE : mesures de chargement et de fluidite envoyees par lots
+ * (navigator.sendBeacon) au collecteur configure
+ */
+var telemetryQueue = [];
+var telemetryPendingLoad = null;
+var telemetrySampling = false;
+var telemetryPrefetches = []; // { url, start } des prechargements en cours
+var telemetrySession = Date.now().toString(36) + Math.random().toString(36).slice(2, 8);
+
+function initTelemetry(modelViewer) {
+  TELEMETRY_CONFIG.endpoint = modelViewer.getAttribute('data-telemetry-endpoint') || TELEMETRY_CONFIG.endpoint;
+  if (!TELEMETRY_CONFIG.endpoint) {
+    return;
+  }
+
+  // Chargement initial : mesure depuis le debut de navigation
+  telemetryPendingLoad = { state: currentState, url: null, level: 'full', start: 0 };
+
+  // Temps et volume de telechargement des GLB (Resource Timing)
+  if (window.PerformanceObserver) {
+    var observer = new PerformanceObserver(function(list) {
+      list.getEntries().forEach(function(entry) {
+        var stateId = stateIdFromUrl(entry.name);
+        if (!stateId) return;
+        telemetryRecord({
+          type: 'fetch',
+          state: stateId,
+          prefetch: telemetryTakePrefetch(entry),
+          duration: Math.round(entry.duration),
+          bytes: entry.transferSize || entry.encodedBodySize || 0
+        });
+      });
+    });
+    observer.observe({ type: 'resource', buffered: true });
+  }
+
+  // Fluidite pendant l'orbite et a l'entree en AR
+  modelViewer.addEventListener('camera-change', function(e) {
+    if (e.detail && e.detail.source === 'user-interaction') {
+      sampleFrameTimes('orbit');
+    }
+  });
+  modelViewer.addEventListener('ar-status', function(e) {
+    if (e.detail && e.detail.status === 'session-started') {
+      sampleFrameTimes('ar');
+    }
+  });
+
+  setInterval(flushTelemetry, TELEMETRY_CONFIG.flushInterval);
+  document.addEventListener('visibilitychange', function() {
+    if (document.visibilityState === 'hidden') {
+      flushTelemetry();
+    }
+  });
+}
+
+/**
+ * Les prechargements (fetchModel) partagent l'URL des chargements affiches :
+ * ils sont reconnus a leur instant de depart pour etre marques a part
+ */
+function telemetryMarkPrefetch(src) {
+  if (!TELEMETRY_CONFIG.endpoint) return;
+  telemetryPrefetches.push({ url: new URL(src, document.baseURI).href, start: performance.now() });
+}
+
+function telemetryTakePrefetch(entry) {
+  for (var i = 0; i < telemetryPrefetches.length; i++) {
+    var prefetch = telemetryPrefetches[i];
+    if (prefetch.url === entry.name && Math.abs(entry.startTime - prefetch.start) < 100) {
+      telemetryPrefetches.splice(i, 1);
+      return true;
+    }
+  }
+  return false;
+}
+
+function stateIdFromUrl(url) {
+  for (var stateId in STATES) {
+    if (url.indexOf(STATES[stateId].src) !== -1) {
+      return stateId;
+    }
+  }
+  return null;
+}
+
+/**
+ * Classe d'appareil approximative (regroupement des mesures)
+ */
+function getDeviceClass() {
+  var mobile = /Mobi|Android|iPhone|iPad/i.test(navigator.userAgent);
+  var cores = navigator.hardwareConcurrency || 0;
+  var memory = navigator.deviceMemory || 0;
+
+  if (!mobile) return 'desktop';
+  if ((memory && memory <= 2) || (cores && cores <= 4)) return 'mobile-low';
+  return 'mobile';
+}
+
+function telemetryRecord(event) {
+  if (!TELEMETRY_CONFIG.endpoint) return;
+
+  event.session = telemetrySession;
+  event.device = getDeviceClass();
+  event.phase = currentPhase;
+  event.state = event.state || currentState;
+  event.t = Date.now();
+  telemetryQueue.push(event);
+
+  if (telemetryQueue.length >= TELEMETRY_CONFIG.batchSize) {
+    flushTelemetry();
+  }
+}
+
+function flushTelemetry() {
+  if (!TELEMETRY_CONFIG.endpoint || telemetryQueue.length === 0) return;
+
+  var payload = JSON.stringify({ events: telemetryQueue });
+  if (navigator.sendBeacon && navigator.sendBeacon(TELEMETRY_CONFIG.endpoint, payload)) {
+    telemetryQueue = [];
+  }
+}
+
+/**
+ * Debut de chargement : changement de src du model-viewer
+ */
+function telemetryLoadStarted(stateId, url) {
+  // Premier modele (pas de src statique) : mesure depuis le debut de navigation
+  var initial = telemetryPendingLoad && !telemetryPendingLoad.url;
+  telemetryPendingLoad = {
+    state: stateId,
+    url: url,
+    level: 'full',
+    start: initial ? 0 : performance.now()
+  };
+}
+
+/**
+ * Chargement progressif : src passe a la version grossiere ('coarse') ou
+ * au modele complet ('full'), mesures depuis le meme debut de chargement
+ */
+function telemetryLoadLevel(stateId, url, level) {
+  if (!telemetryPendingLoad || telemetryPendingLoad.state !== stateId) return;
+  telemetryPendingLoad.url = url;
+  telemetryPendingLoad.level = level;
+}
+
+/**
+ * Fin de chargement : evenement 'load' du model-viewer. Apres la version
+ * grossiere, le modele complet reste attendu.
+ */
+function telemetryModelLoaded() {
+  if (!telemetryPendingLoad) return;
+
+  telemetryRecord({
+    type: 'load',
+    state: telemetryPendingLoad.state,
+    level: telemetryPendingLoad.level,
+    duration: Math.round(performance.now() - telemetryPendingLoad.start)
+  });
+  if (telemetryPendingLoad.level === 'coarse') {
+    telemetryPendingLoad.level = 'full';
+  } else {
+    telemetryPendingLoad = null;
+  }
+}
+
+/**
+ * Echantillonne les durees de frame pendant frameSampleDuration ms
+ */
+function sampleFrameTimes(kind) {
+  if (telemetrySampling || !TELEMETRY_CONFIG.endpoint) return;
+  telemetrySampling = true;
+
+  var frames = [];
+  var start = performance.now();
+  var last = start;
+
+  function tick(now) {
+    frames.push(now - last);
+    last = now;
+
+    if (now - start < TELEMETRY_CONFIG.frameSampleDuration) {
+      requestAnimationFrame(tick);
+      return;
+    }
+
+    frames.sort(function(a, b) { return a - b; });
+    telemetryRecord({
+      type: 'frames',
+      kind: kind,
+      count: frames.length,
+      p50: Math.round(frames[Math.floor(frames.length * 0.5)] * 10) / 10,
+      p95: Math.round(frames[Math.floor(frames.length * 0.95)] * 10) / 10,
+      max: Math.round(frames[frames.length - 1] * 10) / 10
+    });
+    telemetrySampling = false;
+  }
+
+  requestAnimationFrame(function(now) {
+    last = now;
+    start = now;
+    requestAnimationFrame(tick);
+  });
+}
+
 /**
  * MODE DEBUG : Double-cliquez sur le modele pour obtenir les coordonnees exactes
  * Activez avec : enableDebugMode() dans la console
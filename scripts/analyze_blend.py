@@ -4,14 +4,227 @@ Script d'analyse non-destructif pour fichier .blend
 Puis : Scripting > New > Coller ce script > Run Script
 
 Le rapport sera généré dans le même dossier que le fichier .blend
+
+Le rapport inclut une estimation du coût GPU (vertex/index buffers,
+textures, draw calls) par objet, par état (STATES_CONFIG de
+export_states.py) et au total, avant tout export.
 """
 
+import ast
 import bpy
 import mathutils
+import numpy as np
 import os
 import json
 from datetime import datetime
 
+# Estimation du coût GPU (disposition des attributs du GLB exporté)
+GPU_CONFIG = {
+    "position_bytes": 12,     # vec3 float32
+    "normal_bytes": 12,       # vec3 float32
+    "uv_bytes": 8,            # vec2 float32 par couche UV
+    "color_bytes": 16,        # vec4 float32 par attribut couleur
+    "texture_bytes_per_pixel": 4,   # RGBA8 après décodage PNG/JPEG
+    "mipmap_factor": 4 / 3,
+    # Part d'un budget au-delà de laquelle un objet est signalé
+    "dominant_share": 0.25,
+}
+
+# --- ESTIMATION DU COÛT GPU ---
+
+def literal_config_value(node, name):
+    """
+    Valeur littérale d'un nœud ast, ou None (avec avertissement) si elle
+    contient autre chose que des littéraux (nom, appel, expression).
+    """
+    try:
+        return ast.literal_eval(node)
+    except ValueError:
+        print(f"[ATTENTION] {name} non littéral dans export_states.py : ignoré")
+        return None
+
+
+def load_export_config():
+    """
+    Lit STATES_CONFIG et GLOBAL_CONFIG["exclude_always"] dans export_states.py
+    (par ast, sans exécuter le script) : seule la clé exclude_always de
+    GLOBAL_CONFIG est évaluée. Retourne ({}, []) s'il est introuvable.
+    """
+    # __file__ est absent quand le script est collé dans l'éditeur de texte
+    script_dir = os.path.dirname(os.path.abspath(globals().get("__file__", "")))
+    candidates = [
+        os.path.join(script_dir, "export_states.py"),
+        os.path.join(os.path.dirname(bpy.data.filepath), "scripts", "export_states.py"),
+    ]
+    for path in candidates:
+        if not os.path.exists(path):
+            continue
+        with open(path, encoding='utf-8') as f:
+            tree = ast.parse(f.read())
+        states_config = None
+        exclude_always = []
+        for node in tree.body:
+            if not isinstance(node, ast.Assign):
+                continue
+            names = {target.id for target in node.targets if isinstance(target, ast.Name)}
+            if "STATES_CONFIG" in names:
+                states_config = literal_config_value(node.value, "STATES_CONFIG")
+            if "GLOBAL_CONFIG" in names and isinstance(node.value, ast.Dict):
+                for key, value in zip(node.value.keys, node.value.values):
+                    if isinstance(key, ast.Constant) and key.value == "exclude_always":
+                        exclude_always = literal_config_value(
+                            value, 'GLOBAL_CONFIG["exclude_always"]'
+                        ) or []
+        if states_config is not None:
+            return states_config, exclude_always
+    return {}, []
+
+
+def material_images(material):
+    """Images utilisées par un matériau (groupes de nodes inclus)."""
+    images = set()
+    trees = [material.node_tree] if material and material.use_nodes and material.node_tree else []
+    seen = set()
+    while trees:
+        tree = trees.pop()
+        if tree.name in seen:
+            continue
+        seen.add(tree.name)
+        for node in tree.nodes:
+            if node.type == 'TEX_IMAGE' and node.image:
+                images.add(node.image)
+            elif node.type == 'GROUP' and node.node_tree:
+                trees.append(node.node_tree)
+    return images
+
+
+def image_gpu_bytes(image):
+    width, height = image.size
+    return int(width * height * GPU_CONFIG["texture_bytes_per_pixel"] * GPU_CONFIG["mipmap_factor"])
+
+
+def exported_vertex_count(mesh):
+    """
+    Vertices après découpage par l'exporteur glTF : un vertex par combinaison
+    distincte (vertex, UVs), et un par coin sur les faces non lissées.
+    """
+    loop_count = len(mesh.loops)
+    if loop_count == 0:
+        return 0
+
+    vertex_index = np.empty(loop_count, dtype=np.int64)
+    mesh.loops.foreach_get("vertex_index", vertex_index)
+    columns = [vertex_index.astype(np.float64)]
+
+    for uv_layer in mesh.uv_layers:
+        uvs = np.empty(loop_count * 2, dtype=np.float32)
+        uv_layer.data.foreach_get("uv", uvs)
+        columns += [uvs[0::2].astype(np.float64), uvs[1::2].astype(np.float64)]
+
+    # Faces non lissées : normale propre à chaque coin
+    smooth = np.empty(len(mesh.polygons), dtype=bool)
+    mesh.polygons.foreach_get("use_smooth", smooth)
+    loop_totals = np.empty(len(mesh.polygons), dtype=np.int64)
+    mesh.polygons.foreach_get("loop_total", loop_totals)
+    loop_smooth = np.repeat(smooth, loop_totals)
+    columns.append(np.where(loop_smooth, -1.0, np.arange(loop_count, dtype=np.float64)))
+
+    return len(np.unique(np.stack(columns, axis=1), axis=0))
+
+
+def estimate_object_cost(obj, depsgraph):
+    """Coût GPU d'un objet évalué (modifiers appliqués, courbes tessellées)."""
+    evaluated = obj.evaluated_get(depsgraph)
+    mesh = evaluated.to_mesh()
+    try:
+        vertices = exported_vertex_count(mesh)
+        triangles = sum(len(poly.vertices) - 2 for poly in mesh.polygons)
+
+        material_indices = np.empty(len(mesh.polygons), dtype=np.int64)
+        mesh.polygons.foreach_get("material_index", material_indices)
+        draw_calls = max(1, len(np.unique(material_indices))) if len(mesh.polygons) else 0
+
+        stride = GPU_CONFIG["position_bytes"] + GPU_CONFIG["normal_bytes"]
+        stride += GPU_CONFIG["uv_bytes"] * len(mesh.uv_layers)
+        stride += GPU_CONFIG["color_bytes"] * len(getattr(mesh, "color_attributes", []))
+    finally:
+        evaluated.to_mesh_clear()
+
+    images = set()
+    for slot in obj.material_slots:
+        images |= material_images(slot.material)
+
+    return {
+        "vertices_exportes": vertices,
+        "triangles": triangles,
+        "vertex_bytes": vertices * stride,
+        "index_bytes": triangles * 3 * (2 if vertices < 65536 else 4),
+        "textures": sorted(image.name for image in images),
+        "texture_bytes": sum(image_gpu_bytes(image) for image in images),
+        "draw_calls": draw_calls,
+    }
+
+
+def aggregate_costs(object_costs, names, image_bytes):
+    """Somme des coûts d'un ensemble d'objets (textures partagées comptées une fois)."""
+    textures = set()
+    totals = {"vertex_bytes": 0, "index_bytes": 0, "draw_calls": 0, "triangles": 0}
+    for name in names:
+        cost = object_costs[name]
+        for key in totals:
+            totals[key] += cost[key]
+        textures.update(cost["textures"])
+    totals["texture_bytes"] = sum(image_bytes[name] for name in textures)
+    totals["gpu_bytes"] = totals["vertex_bytes"] + totals["index_bytes"] + totals["texture_bytes"]
+    return totals
+
+
+def dominant_objects(object_costs, names):
+    """Objets dépassant GPU_CONFIG["dominant_share"] de chaque budget."""
+    dominants = {}
+    for key in ("vertex_bytes", "index_bytes", "texture_bytes", "draw_calls"):
+        total = sum(object_costs[name][key] for name in names)
+        if total == 0:
+            continue
+        ranked = sorted(names, key=lambda name: object_costs[name][key], reverse=True)
+        dominants[key] = [
+            {"objet": name, "part": round(object_costs[name][key] / total, 3)}
+            for name in ranked
+            if object_costs[name][key] / total >= GPU_CONFIG["dominant_share"]
+        ]
+    return dominants
+
+
+def estimate_gpu_costs():
+    """Coût GPU par objet, par état et au total (objets MESH et CURVE)."""
+    depsgraph = bpy.context.evaluated_depsgraph_get()
+    states_config, exclude_always = load_export_config()
+
+    candidates = [obj for obj in bpy.data.objects if obj.type in ('MESH', 'CURVE')]
+    object_costs = {obj.name: estimate_object_cost(obj, depsgraph) for obj in candidates}
+    image_bytes = {image.name: image_gpu_bytes(image) for image in bpy.data.images}
+
+    sets = {"total": list(object_costs)}
+    for state_name, state_config in states_config.items():
+        excluded = set(exclude_always) | set(state_config["exclude_objects"])
+        sets[state_name] = [name for name in object_costs if name not in excluded]
+
+    return {
+        "objets": object_costs,
+        "ensembles": {
+            name: {
+                **aggregate_costs(object_costs, names, image_bytes),
+                "dominants": dominant_objects(object_costs, names),
+            }
+            for name, names in sets.items()
+        },
+    }
+
+
+def format_bytes(value):
+    return f"{value / (1024 * 1024):.2f} Mo"
+
+
 def analyze_blend_file():
     """Analyse complète du fichier .blend ouvert"""
 
@@ -27,7 +240,8 @@ def analyze_blend_file():
         "textures": [],
         "collections": [],
         "animations": [],
-        "dimensions_scene": {}
+        "dimensions_scene": {},
+        "cout_gpu": {}
     }
 
     # --- STATISTIQUES GÉNÉRALES ---
@@ -129,6 +343,9 @@ def analyze_blend_file():
                 "unite": bpy.context.scene.unit_settings.length_unit
             }
 
+    # --- COÛT GPU ESTIMÉ ---
+    report["cout_gpu"] = estimate_gpu_costs()
+
     return report
 
 
@@ -200,6 +417,34 @@ def generate_report():
             for anim in report['animations']:
                 f.write(f"  {anim['nom']}: frames {anim['frame_range']}\n")
 
+        gpu = report['cout_gpu']
+        f.write("\n" + "-" * 40 + "\n")
+        f.write("COÛT GPU ESTIMÉ PAR OBJET\n")
+        f.write("-" * 40 + "\n")
+        ranked = sorted(gpu['objets'].items(),
+                        key=lambda item: item[1]['vertex_bytes'] + item[1]['index_bytes'] + item[1]['texture_bytes'],
+                        reverse=True)
+        for name, cost in ranked:
+            f.write(f"  {name:<20} VB {format_bytes(cost['vertex_bytes']):>10}"
+                    f"  IB {format_bytes(cost['index_bytes']):>10}"
+                    f"  Tex {format_bytes(cost['texture_bytes']):>10}"
+                    f"  Draw calls {cost['draw_calls']}\n")
+
+        f.write("\n" + "-" * 40 + "\n")
+        f.write("COÛT GPU PAR ÉTAT (textures dédupliquées)\n")
+        f.write("-" * 40 + "\n")
+        for name, totals in gpu['ensembles'].items():
+            f.write(f"\n  [{name}]\n")
+            f.write(f"    Vertex buffers : {format_bytes(totals['vertex_bytes'])}\n")
+            f.write(f"    Index buffers : {format_bytes(totals['index_bytes'])}\n")
+            f.write(f"    Textures (mipmaps) : {format_bytes(totals['texture_bytes'])}\n")
+            f.write(f"    Total GPU : {format_bytes(totals['gpu_bytes'])}\n")
+            f.write(f"    Draw calls : {totals['draw_calls']}\n")
+            for budget, objects in totals['dominants'].items():
+                if objects:
+                    names = ", ".join(f"{o['objet']} ({o['part']:.0%})" for o in objects)
+                    f.write(f"    Dominant {budget} : {names}\n")
+
         f.write("\n" + "=" * 60 + "\n")
         f.write("Rapport JSON complet : analyse_blend_report.json\n")
         f.write("=" * 60 + "\n")
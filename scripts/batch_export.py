@@ -0,0 +1,348 @@
+"""
+===============================================================================
+EXPORT PAR LOT D'UN CATALOGUE DE FICHIERS .BLEND
+===============================================================================
+
+Projet     : AR Pédagogique - Moteur Hemi
+Fichier    : batch_export.py
+Sortie     : <output_root>/<chemin relatif du blend>/*.glb
+
+PRINCIPE DE FONCTIONNEMENT :
+----------------------------
+1. Collecte les fichiers .blend (dossiers parcourus récursivement)
+2. Associe à chaque fichier sa configuration d'états :
+   <fichier>.states.json à côté du .blend, sinon STATES_CONFIG par défaut
+3. Lance export_states.py dans un pool borné de processus Blender
+4. Journalise chaque fichier (JSON lines) : une relance reprend là où
+   l'exécution précédente s'est arrêtée (--force : tout réexporter)
+5. Réessaie les fichiers en échec avec un délai croissant
+6. Termine par un rapport de débit (fichiers/min, Mo écrits)
+
+Ce script s'exécute avec Python standard (pas dans Blender).
+
+USAGE :
+-------
+python3 scripts/batch_export.py catalogue/ autre_moteur.blend \
+  --blender /Applications/Blender.app/Contents/MacOS/Blender \
+  --workers 8 --output-root exports/
+
+===============================================================================
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+BATCH_CONFIG = {
+    "blender": os.environ.get(
+        "BLENDER", "/Applications/Blender.app/Contents/MacOS/Blender"
+    ),
+    "workers": os.cpu_count() or 1,
+    "journal": "batch_export_journal.jsonl",
+    "output_root": "exports",
+    # Nombre total de tentatives par fichier
+    "max_attempts": 3,
+    # Délai avant la tentative n : backoff_base * 2^(n-1) secondes
+    "backoff_base": 5.0,
+    # Durée maximale d'un export (secondes)
+    "timeout": 3600,
+    "states_config_suffix": ".states.json",
+}
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+EXPORT_SCRIPT = os.path.join(SCRIPTS_DIR, "export_states.py")
+
+# Sources dont dépend l'export (GLOBAL_CONFIG compris) : les modifier
+# invalide le journal
+EXPORT_SOURCES = [
+    EXPORT_SCRIPT,
+    os.path.join(SCRIPTS_DIR, "curve_tessellation.py"),
+    os.path.join(SCRIPTS_DIR, "export_planner.py"),
+    os.path.join(SCRIPTS_DIR, "mesh_cleanup.py"),
+]
+
+
+# =============================================================================
+# FONCTIONS UTILITAIRES
+# =============================================================================
+
+_print_lock = threading.Lock()
+
+
+def log(message, level="INFO"):
+    prefix = {
+        "INFO": "[INFO]",
+        "WARN": "[ATTENTION]",
+        "ERROR": "[ERREUR]",
+        "OK": "[OK]",
+        "STEP": ">>>"
+    }.get(level, "[INFO]")
+    with _print_lock:
+        print(f"{prefix} {message}", flush=True)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Export par lot de fichiers .blend")
+    parser.add_argument("inputs", nargs="+", help="Fichiers .blend ou dossiers")
+    parser.add_argument("--blender", default=BATCH_CONFIG["blender"])
+    parser.add_argument("--workers", type=int, default=BATCH_CONFIG["workers"])
+    parser.add_argument("--journal", default=BATCH_CONFIG["journal"])
+    parser.add_argument("--output-root", default=BATCH_CONFIG["output_root"])
+    parser.add_argument("--max-attempts", type=int, default=BATCH_CONFIG["max_attempts"])
+    parser.add_argument("--timeout", type=int, default=BATCH_CONFIG["timeout"])
+    parser.add_argument("--force", action="store_true",
+                        help="Réexporter même les fichiers déjà à jour dans le journal")
+    parser.add_argument(
+        "--selective", action="store_true",
+        help="Chargement sélectif des objets (scène vide, voir export_states.py)",
+    )
+    return parser.parse_args()
+
+
+def collect_blend_files(inputs):
+    """
+    Retourne {chemin absolu du .blend : nom de sortie}, trié par chemin.
+    Le nom de sortie est le chemin relatif au dossier parcouru (sans
+    extension), pour que deux fichiers homonymes de sous-dossiers
+    différents n'écrivent pas dans le même dossier.
+    """
+    files = {}
+    for path in inputs:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                for name in names:
+                    if name.endswith(".blend"):
+                        blend_path = os.path.abspath(os.path.join(root, name))
+                        relative = os.path.relpath(blend_path, os.path.abspath(path))
+                        files.setdefault(blend_path, os.path.splitext(relative)[0])
+        elif path.endswith(".blend") and os.path.isfile(path):
+            blend_path = os.path.abspath(path)
+            files.setdefault(blend_path, os.path.splitext(os.path.basename(path))[0])
+        else:
+            log(f"Ignoré (pas un .blend) : {path}", "WARN")
+    return dict(sorted(files.items()))
+
+
+def get_states_config_path(blend_path):
+    """Configuration d'états propre au fichier, ou None (configuration par défaut)."""
+    candidate = os.path.splitext(blend_path)[0] + BATCH_CONFIG["states_config_suffix"]
+    return candidate if os.path.exists(candidate) else None
+
+
+def get_sources_digest():
+    """Empreinte des scripts d'export (code et GLOBAL_CONFIG)."""
+    digest = hashlib.sha1()
+    for path in EXPORT_SOURCES:
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def get_job_key(blend_path, states_config_path, sources_digest):
+    """
+    Identifie un export : chemin, date de modification du .blend, contenu
+    de la configuration d'états et empreinte des scripts d'export.
+    Tout changement invalide l'entrée du journal.
+    """
+    digest = hashlib.sha1()
+    digest.update(blend_path.encode("utf-8"))
+    digest.update(str(os.path.getmtime(blend_path)).encode("utf-8"))
+    digest.update(sources_digest.encode("utf-8"))
+    if states_config_path:
+        with open(states_config_path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+# =============================================================================
+# JOURNAL
+# =============================================================================
+
+class Journal:
+    """Journal append-only (une ligne JSON par tentative terminée)."""
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.done_keys = set()
+
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # Ligne tronquée par une interruption
+                        continue
+                    if entry.get("status") == "done":
+                        self.done_keys.add(entry["key"])
+
+    def is_done(self, key):
+        return key in self.done_keys
+
+    def record(self, entry):
+        with self.lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            if entry["status"] == "done":
+                self.done_keys.add(entry["key"])
+
+
+# =============================================================================
+# EXPORT D'UN FICHIER
+# =============================================================================
+
+def build_command(args, blend_path, states_config_path, output_dir, summary_path):
+    command = [args.blender, "--background"]
+    if args.selective:
+        command.append("--factory-startup")
+    else:
+        command.append(blend_path)
+    command += ["--python-exit-code", "1", "--python", EXPORT_SCRIPT, "--"]
+    if args.selective:
+        command += ["--source", blend_path]
+    if states_config_path:
+        command += ["--states-config", states_config_path]
+    command += ["--output-dir", output_dir, "--summary", summary_path]
+    return command
+
+
+def run_export(args, blend_path, output_name, states_config_path):
+    """Une tentative d'export. Retourne (succès, octets écrits, message)."""
+    name = os.path.splitext(os.path.basename(blend_path))[0]
+    output_dir = os.path.abspath(os.path.join(args.output_root, output_name))
+
+    fd, summary_path = tempfile.mkstemp(suffix=".json", prefix=f"{name}_")
+    os.close(fd)
+    try:
+        command = build_command(args, blend_path, states_config_path, output_dir, summary_path)
+        try:
+            process = subprocess.run(
+                command, capture_output=True, text=True, timeout=args.timeout
+            )
+        except subprocess.TimeoutExpired:
+            return False, 0, f"délai dépassé ({args.timeout} s)"
+
+        summary = []
+        if os.path.getsize(summary_path) > 0:
+            with open(summary_path, encoding="utf-8") as f:
+                summary = json.load(f)
+
+        written = sum(state["bytes"] for state in summary)
+        if process.returncode != 0:
+            tail = (process.stdout + process.stderr).strip().splitlines()[-5:]
+            return False, written, f"code {process.returncode} : {' | '.join(tail)}"
+        return True, written, f"{len(summary)} états"
+    finally:
+        os.remove(summary_path)
+
+
+def process_file(args, journal, blend_path, output_name, key):
+    """Exporte un fichier avec reprises (backoff exponentiel)."""
+    states_config_path = get_states_config_path(blend_path)
+
+    for attempt in range(1, args.max_attempts + 1):
+        if attempt > 1:
+            delay = BATCH_CONFIG["backoff_base"] * 2 ** (attempt - 2)
+            log(f"Nouvelle tentative dans {delay:.0f} s : {blend_path}", "WARN")
+            time.sleep(delay)
+
+        start = time.perf_counter()
+        success, written, message = run_export(args, blend_path, output_name, states_config_path)
+        duration = time.perf_counter() - start
+
+        journal.record({
+            "key": key,
+            "file": blend_path,
+            "status": "done" if success else "failed",
+            "attempt": attempt,
+            "bytes": written,
+            "duration_s": round(duration, 2),
+            "message": message,
+            "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        })
+
+        if success:
+            log(f"{blend_path} : {written / (1024 * 1024):.2f} Mo ({duration:.1f} s)", "OK")
+            return True, written
+        log(f"{blend_path} (tentative {attempt}/{args.max_attempts}) : {message}", "ERROR")
+
+    return False, 0
+
+
+# =============================================================================
+# MAIN
+# =============================================================================
+
+def main():
+    args = parse_args()
+
+    print("\n" + "=" * 60)
+    print("EXPORT PAR LOT - CATALOGUE .BLEND")
+    print("=" * 60)
+
+    files = collect_blend_files(args.inputs)
+    journal = Journal(args.journal)
+    sources_digest = get_sources_digest()
+
+    keys = {
+        path: get_job_key(path, get_states_config_path(path), sources_digest)
+        for path in files
+    }
+    pending = [path for path in files if args.force or not journal.is_done(keys[path])]
+    skipped = len(files) - len(pending)
+
+    log(f"Fichiers : {len(files)} (déjà exportés : {skipped}, à traiter : {len(pending)})", "INFO")
+    log(f"Processus Blender en parallèle : {args.workers}", "INFO")
+
+    start = time.perf_counter()
+    done = failed = 0
+    total_bytes = 0
+
+    with ThreadPoolExecutor(max_workers=max(1, args.workers)) as pool:
+        futures = {
+            pool.submit(process_file, args, journal, path, files[path], keys[path]): path
+            for path in pending
+        }
+        for future in as_completed(futures):
+            success, written = future.result()
+            if success:
+                done += 1
+                total_bytes += written
+            else:
+                failed += 1
+
+    elapsed = time.perf_counter() - start
+    minutes = elapsed / 60 if elapsed > 0 else 0
+    total_mb = total_bytes / (1024 * 1024)
+
+    print("\n" + "=" * 60)
+    print("RAPPORT D'EXPORT PAR LOT")
+    print("=" * 60)
+    print(f"  Exportés      : {done}")
+    print(f"  En échec      : {failed}")
+    print(f"  Déjà à jour   : {skipped}")
+    print(f"  Durée         : {elapsed:.1f} s")
+    print(f"  Débit         : {done / minutes if minutes else 0:.2f} fichiers/min")
+    print(f"  Données       : {total_mb:.2f} Mo ({total_mb / minutes if minutes else 0:.2f} Mo/min)")
+    print(f"  Journal       : {args.journal}")
+    print("=" * 60 + "\n")
+
+    return 0 if failed == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
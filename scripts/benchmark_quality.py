@@ -0,0 +1,334 @@
+"""
+===============================================================================
+BENCHMARK QUALITÉ / TAILLE DE LA DÉCIMATION
+===============================================================================
+
+Projet     : AR Pédagogique - Moteur Hemi
+Fichier    : benchmark_quality.py
+Sortie     : benchmarks/quality.csv, benchmarks/quality.json
+
+PRINCIPE DE FONCTIONNEMENT :
+----------------------------
+1. Pour chaque cible de vertices (et seuil de décimation) du balayage,
+   et pour chaque état de STATES_CONFIG, exécute les étapes de
+   export_states.py : ratios, duplication, nettoyage, décimation, export GLB
+2. Pour chaque objet, mesure l'écart entre la géométrie d'origine et la
+   copie décimée (coordonnées monde, avant mise à l'échelle) :
+   - distance de Hausdorff symétrique (estimée sur échantillons)
+   - distance moyenne à la surface (moyenne des deux sens)
+   par requêtes du point de surface le plus proche (BVHTree), les
+   échantillons étant tirés sur chaque surface au prorata de l'aire des
+   triangles (graine fixe), plus les vertices (coins et arêtes vives)
+3. Écrit un CSV prêt à tracer (erreur en fonction des vertices, des
+   octets et du temps d'export) et affiche un tableau par état
+
+Les distances sont en unités de la scène ; la colonne *_mm les convertit
+en millimètres du modèle AR (× export_scale).
+
+USAGE :
+-------
+/Applications/Blender.app/Contents/MacOS/Blender hemi_engine.blend --background \
+  --python scripts/benchmark_quality.py -- --targets 20000,40000,65000,100000
+
+===============================================================================
+"""
+
+import argparse
+import csv
+import itertools
+import json
+import os
+import sys
+import tempfile
+import time
+
+import bpy
+import numpy as np
+from mathutils.bvhtree import BVHTree
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+if SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, SCRIPTS_DIR)
+
+import curve_tessellation
+import export_states
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+BENCH_CONFIG = {
+    "output_dir": "benchmarks",
+    "targets": [20000, 40000, 65000, 100000],
+    "thresholds": [export_states.GLOBAL_CONFIG["decimation_threshold"]],
+    # Points tirés sur chaque surface (répartis selon l'aire), graine fixe
+    "surface_samples": 10000,
+    "seed": 0,
+}
+
+
+# =============================================================================
+# FONCTIONS UTILITAIRES
+# =============================================================================
+
+log = export_states.log
+
+
+def get_script_args():
+    if "--" in sys.argv:
+        return sys.argv[sys.argv.index("--") + 1:]
+    return []
+
+
+def int_list(value):
+    return [int(float(v)) for v in value.split(",") if v]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark qualité / taille de la décimation")
+    parser.add_argument("--targets", type=int_list, default=BENCH_CONFIG["targets"],
+                        help="Cibles de vertices (target_vertices)")
+    parser.add_argument("--thresholds", type=int_list, default=BENCH_CONFIG["thresholds"],
+                        help="Seuils de décimation (decimation_threshold)")
+    parser.add_argument("--states", help="États à mesurer (noms séparés par des virgules)")
+    parser.add_argument("--output-dir", default=BENCH_CONFIG["output_dir"])
+    return parser.parse_args(get_script_args())
+
+
+# =============================================================================
+# MESURE DE L'ERREUR GÉOMÉTRIQUE
+# =============================================================================
+
+def world_geometry(obj):
+    """
+    Géométrie évaluée de `obj` en coordonnées monde.
+    Retourne (vertices Nx3, triangles Mx3).
+    """
+    depsgraph = bpy.context.evaluated_depsgraph_get()
+    evaluated = obj.evaluated_get(depsgraph)
+    mesh = evaluated.to_mesh()
+    try:
+        coords = np.empty(len(mesh.vertices) * 3, dtype=np.float64)
+        mesh.vertices.foreach_get("co", coords)
+        mesh.calc_loop_triangles()
+        triangles = np.empty(len(mesh.loop_triangles) * 3, dtype=np.int32)
+        mesh.loop_triangles.foreach_get("vertices", triangles)
+    finally:
+        evaluated.to_mesh_clear()
+
+    matrix = np.array(obj.matrix_world)
+    coords = coords.reshape(-1, 3) @ matrix[:3, :3].T + matrix[:3, 3]
+    return coords, triangles.reshape(-1, 3)
+
+
+def sample_surface(vertices, triangles, count, rng):
+    """
+    `count` points tirés uniformément sur la surface (triangles choisis au
+    prorata de leur aire), plus les vertices eux-mêmes.
+    """
+    p0, p1, p2 = (vertices[triangles[:, i]] for i in range(3))
+    areas = np.linalg.norm(np.cross(p1 - p0, p2 - p0), axis=1)
+    if areas.sum() <= 0:
+        return vertices
+
+    chosen = rng.choice(len(triangles), size=count, p=areas / areas.sum())
+    r1 = np.sqrt(rng.random(count))[:, None]
+    r2 = rng.random(count)[:, None]
+    points = (1 - r1) * p0[chosen] + r1 * (1 - r2) * p1[chosen] + r1 * r2 * p2[chosen]
+    return np.concatenate([vertices, points])
+
+
+def directed_distances(samples, tree):
+    """Distance de chaque échantillon à la surface la plus proche de `tree`."""
+    distances = np.empty(len(samples))
+    for index, point in enumerate(samples):
+        nearest = tree.find_nearest(point)
+        distances[index] = nearest[3] if nearest[0] is not None else np.inf
+    return distances
+
+
+def surface_error(original, decimated):
+    """
+    Hausdorff symétrique et distance moyenne entre deux objets, estimés sur
+    des échantillons de surface répartis selon l'aire.
+    Retourne (hausdorff, moyenne, vertices évalués de l'original).
+    """
+    verts_a, tris_a = world_geometry(original)
+    verts_b, tris_b = world_geometry(decimated)
+    if not len(tris_a) or not len(tris_b):
+        return None, None, len(verts_a)
+
+    tree_a = BVHTree.FromPolygons(verts_a.tolist(), tris_a.tolist())
+    tree_b = BVHTree.FromPolygons(verts_b.tolist(), tris_b.tolist())
+
+    # Même graine pour chaque objet : mesures comparables d'un balayage à l'autre
+    rng = np.random.default_rng(BENCH_CONFIG["seed"])
+    count = BENCH_CONFIG["surface_samples"]
+    a_to_b = directed_distances(sample_surface(verts_a, tris_a, count, rng), tree_b)
+    b_to_a = directed_distances(sample_surface(verts_b, tris_b, count, rng), tree_a)
+
+    hausdorff = max(a_to_b.max(), b_to_a.max())
+    mean = (a_to_b.mean() + b_to_a.mean()) / 2
+    return float(hausdorff), float(mean), len(verts_a)
+
+
+# =============================================================================
+# BALAYAGE
+# =============================================================================
+
+def measure_state(state_config, export_path):
+    """
+    Décime et exporte un état avec la configuration courante.
+    Retourne (lignes par objet, synthèse de l'état).
+    """
+    config = export_states.GLOBAL_CONFIG
+    exportable = export_states.get_exportable_objects(state_config["exclude_objects"])
+
+    try:
+        start = time.perf_counter()
+        ratios = export_states.calculate_decimation_ratios(exportable, config["target_vertices"])
+        temp_collection = export_states.create_temp_collection()
+        copies = export_states.duplicate_objects(exportable, temp_collection)
+        ratios = export_states.prepare_copies(copies, ratios)
+        export_states.apply_decimation(copies, ratios)
+        if config["tessellate_curves"]:
+            curve_tessellation.convert_curves_to_meshes(copies, temp_collection, config)
+        decimation_seconds = time.perf_counter() - start
+
+        object_rows = []
+        for obj in exportable:
+            copy = copies.get(obj.name)
+            if copy is None or copy.type != 'MESH':
+                continue
+            hausdorff, mean, vertices_before = surface_error(obj, copy)
+            object_rows.append({
+                "object": obj.name,
+                "ratio": ratios.get(obj.name, 1.0),
+                "vertices_before": vertices_before,
+                "vertices": len(copy.data.vertices),
+                "hausdorff": hausdorff,
+                "mean_distance": mean,
+            })
+
+        # L'export mesure la taille et le temps réels
+        export_states.apply_scale(copies, config["export_scale"])
+        start = time.perf_counter()
+        export_states.export_glb(copies, export_path)
+        export_seconds = time.perf_counter() - start
+    finally:
+        export_states.cleanup_temp_collection()
+
+    errors = [row for row in object_rows if row["hausdorff"] is not None]
+    summary = {
+        "vertices": sum(row["vertices"] for row in object_rows),
+        "bytes": os.path.getsize(export_path) if os.path.exists(export_path) else 0,
+        "decimation_seconds": decimation_seconds,
+        "export_seconds": export_seconds,
+        "hausdorff": max((row["hausdorff"] for row in errors), default=None),
+        # Moyenne pondérée par le nombre de vertices d'origine
+        "mean_distance": (
+            sum(row["mean_distance"] * row["vertices_before"] for row in errors)
+            / max(1, sum(row["vertices_before"] for row in errors))
+        ) if errors else None,
+    }
+    return object_rows, summary
+
+
+def to_mm(value):
+    if value is None:
+        return None
+    return value * export_states.GLOBAL_CONFIG["export_scale"] * 1000
+
+
+# =============================================================================
+# MAIN
+# =============================================================================
+
+def main():
+    args = parse_args()
+
+    print("\n" + "=" * 60)
+    print("BENCHMARK QUALITÉ / TAILLE - DÉCIMATION")
+    print("=" * 60)
+
+    if not bpy.data.filepath:
+        log("Ouvrir le fichier .blend à mesurer (Blender fichier.blend --python ...)", "ERROR")
+        return False
+
+    states = export_states.STATES_CONFIG
+    if args.states:
+        states = {name: states[name] for name in args.states.split(",") if name in states}
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    export_dir = tempfile.mkdtemp(prefix="bench_quality_")
+    saved = {key: export_states.GLOBAL_CONFIG[key]
+             for key in ("target_vertices", "decimation_threshold")}
+
+    rows = []
+    try:
+        for target, threshold in itertools.product(args.targets, args.thresholds):
+            export_states.GLOBAL_CONFIG["target_vertices"] = target
+            export_states.GLOBAL_CONFIG["decimation_threshold"] = threshold
+
+            for state_name, state_config in states.items():
+                log(f"Cible {target:,} / seuil {threshold} : {state_name}", "STEP")
+                export_path = os.path.join(export_dir, state_config["filename"])
+                object_rows, summary = measure_state(state_config, export_path)
+
+                base = {"target_vertices": target, "decimation_threshold": threshold,
+                        "state": state_name}
+                for row in object_rows:
+                    rows.append({**base, **row,
+                                 "hausdorff_mm": to_mm(row["hausdorff"]),
+                                 "mean_distance_mm": to_mm(row["mean_distance"]),
+                                 "bytes": None, "export_seconds": None})
+                # Ligne de synthèse de l'état (object = "*")
+                rows.append({**base, "object": "*", "ratio": None,
+                             "vertices_before": sum(r["vertices_before"] for r in object_rows),
+                             "vertices": summary["vertices"],
+                             "hausdorff": summary["hausdorff"],
+                             "mean_distance": summary["mean_distance"],
+                             "hausdorff_mm": to_mm(summary["hausdorff"]),
+                             "mean_distance_mm": to_mm(summary["mean_distance"]),
+                             "bytes": summary["bytes"],
+                             "export_seconds": summary["decimation_seconds"] + summary["export_seconds"]})
+    finally:
+        export_states.GLOBAL_CONFIG.update(saved)
+
+    if not rows:
+        log("Aucune mesure", "ERROR")
+        return False
+
+    csv_path = os.path.join(args.output_dir, "quality.csv")
+    with open(csv_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+        writer.writeheader()
+        writer.writerows(rows)
+
+    json_path = os.path.join(args.output_dir, "quality.json")
+    with open(json_path, "w", encoding="utf-8") as f:
+        json.dump({"rows": rows}, f, indent=2)
+
+    print("\n" + "=" * 86)
+    print(f"Distances estimées sur {BENCH_CONFIG['surface_samples']:,} points de surface "
+          f"par objet (tirage selon l'aire) + vertices")
+    print(f"{'cible':>8} {'seuil':>6} {'état':<20} {'vertices':>9} {'Mo':>7} {'s':>7}"
+          f" {'Hausdorff mm':>13} {'moyenne mm':>11}")
+    print("-" * 86)
+    for row in rows:
+        if row["object"] != "*":
+            continue
+        hausdorff = f"{row['hausdorff_mm']:.3f}" if row["hausdorff_mm"] is not None else "n/d"
+        mean = f"{row['mean_distance_mm']:.4f}" if row["mean_distance_mm"] is not None else "n/d"
+        print(f"{row['target_vertices']:>8} {row['decimation_threshold']:>6} {row['state']:<20}"
+              f" {row['vertices']:>9,} {row['bytes'] / (1024 * 1024):>7.2f}"
+              f" {row['export_seconds']:>7.2f} {hausdorff:>13} {mean:>11}")
+
+    print(f"\nCSV  : {csv_path}")
+    print(f"JSON : {json_path}")
+    print("=" * 86 + "\n")
+    return True
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,305 @@
+"""
+===============================================================================
+BENCHMARK DE PASSAGE À L'ÉCHELLE DU PIPELINE D'EXPORT
+===============================================================================
+
+Projet     : AR Pédagogique - Moteur Hemi
+Fichier    : benchmark_scaling.py
+Sortie     : benchmarks/scaling.csv, benchmarks/scaling.json
+
+PRINCIPE DE FONCTIONNEMENT :
+----------------------------
+1. Génère des scènes synthétiques (scène vide, aucun .blend requis) :
+   nombre d'objets, vertices totaux, matériaux, taux de répétition
+   (part des objets qui partagent le mesh d'un autre objet)
+2. Exécute les étapes de export_states.py sur chaque scène :
+   get_exportable_objects, calculate_decimation_ratios, duplicate_objects,
+   prepare_copies (nettoyage), apply_decimation, apply_scale, export_glb (option), nettoyage
+3. Mesure durée et mémoire (RSS) de chaque étape
+4. Écrit les courbes en CSV/JSON et signale les étapes super-linéaires
+   (pente log-log de la durée en fonction de la taille > seuil)
+
+USAGE :
+-------
+/Applications/Blender.app/Contents/MacOS/Blender --background --factory-startup \
+  --python scripts/benchmark_scaling.py -- \
+  --objects 10,100,1000 --vertices 100000,1000000 --materials 4 --repetition 0,0.5
+
+===============================================================================
+"""
+
+import argparse
+import csv
+import itertools
+import json
+import math
+import os
+import sys
+import tempfile
+import time
+
+import bpy
+import numpy as np
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+if SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, SCRIPTS_DIR)
+
+import export_states
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+BENCH_CONFIG = {
+    "output_dir": "benchmarks",
+    "objects": [10, 100],
+    "vertices": [100000],
+    "materials": [4],
+    "repetition": [0.0],
+    # Pente log-log au-delà de laquelle une étape est signalée
+    "superlinear_slope": 1.2,
+    # Amplitude du relief des grilles (donne du travail au décimateur)
+    "relief": 0.2,
+}
+
+
+# =============================================================================
+# FONCTIONS UTILITAIRES
+# =============================================================================
+
+log = export_states.log
+
+
+def get_script_args():
+    if "--" in sys.argv:
+        return sys.argv[sys.argv.index("--") + 1:]
+    return []
+
+
+def int_list(value):
+    return [int(float(v)) for v in value.split(",") if v]
+
+
+def float_list(value):
+    return [float(v) for v in value.split(",") if v]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark de passage à l'échelle de l'export")
+    parser.add_argument("--objects", type=int_list, default=BENCH_CONFIG["objects"])
+    parser.add_argument("--vertices", type=int_list, default=BENCH_CONFIG["vertices"],
+                        help="Vertices totaux de la scène")
+    parser.add_argument("--materials", type=int_list, default=BENCH_CONFIG["materials"])
+    parser.add_argument("--repetition", type=float_list, default=BENCH_CONFIG["repetition"],
+                        help="Part des objets partageant un mesh existant (0 à 1)")
+    parser.add_argument("--export", action="store_true", help="Inclure l'écriture du GLB")
+    parser.add_argument("--output-dir", default=BENCH_CONFIG["output_dir"])
+    return parser.parse_args(get_script_args())
+
+
+# =============================================================================
+# GÉNÉRATION DE SCÈNES
+# =============================================================================
+
+def build_grid_mesh(name, vertex_count, seed):
+    """Grille de quads ondulée d'environ `vertex_count` vertices (foreach_set)."""
+    side = max(2, int(math.ceil(math.sqrt(vertex_count))))
+    u, v = np.meshgrid(np.linspace(0, 1, side), np.linspace(0, 1, side))
+    phase = seed * 0.37
+    z = BENCH_CONFIG["relief"] * np.sin(6 * u + phase) * np.cos(6 * v + phase)
+    coords = np.stack([u, v, z], axis=-1).reshape(-1, 3).astype(np.float32)
+
+    rows = np.arange(side - 1)
+    i, j = np.meshgrid(rows, rows)
+    a = (i * side + j).ravel()
+    quads = np.stack([a, a + 1, a + side + 1, a + side], axis=-1).astype(np.int32)
+
+    mesh = bpy.data.meshes.new(name)
+    mesh.vertices.add(len(coords))
+    mesh.vertices.foreach_set("co", coords.ravel())
+    mesh.loops.add(quads.size)
+    mesh.loops.foreach_set("vertex_index", quads.ravel())
+    mesh.polygons.add(len(quads))
+    mesh.polygons.foreach_set("loop_start", np.arange(0, quads.size, 4, dtype=np.int32))
+    if bpy.app.version < (4, 0, 0):
+        # loop_total est dérivé de loop_start depuis Blender 4.0
+        mesh.polygons.foreach_set("loop_total", np.full(len(quads), 4, dtype=np.int32))
+    mesh.update(calc_edges=True)
+    return mesh
+
+
+def generate_scene(object_count, total_vertices, material_count, repetition):
+    """Remplace la scène courante par une scène synthétique."""
+    bpy.ops.wm.read_factory_settings(use_empty=True)
+
+    materials = [bpy.data.materials.new(f"bench_mat_{i}") for i in range(material_count)]
+    unique_count = max(1, int(round(object_count * (1.0 - repetition))))
+    vertices_per_mesh = max(4, total_vertices // object_count)
+
+    meshes = []
+    for index in range(unique_count):
+        mesh = build_grid_mesh(f"bench_mesh_{index}", vertices_per_mesh, index)
+        if materials:
+            mesh.materials.append(materials[index % material_count])
+        meshes.append(mesh)
+
+    columns = int(math.ceil(math.sqrt(object_count)))
+    collection = bpy.context.scene.collection
+    scene_vertices = 0
+    for index in range(object_count):
+        mesh = meshes[index % unique_count]
+        obj = bpy.data.objects.new(f"bench_{index:05d}", mesh)
+        obj.location = (1.2 * (index % columns), 1.2 * (index // columns), 0.0)
+        collection.objects.link(obj)
+        scene_vertices += len(mesh.vertices)
+
+    return scene_vertices
+
+
+# =============================================================================
+# MESURE DES ÉTAPES
+# =============================================================================
+
+class StageTimer:
+    """Chronomètre les étapes et relève la mémoire après chacune."""
+
+    def __init__(self):
+        self.stages = {}
+
+    def run(self, name, function, *args):
+        rss_before, _ = export_states.get_memory_usage()
+        start = time.perf_counter()
+        result = function(*args)
+        duration = time.perf_counter() - start
+        rss_after, peak = export_states.get_memory_usage()
+
+        self.stages[name] = {
+            "seconds": duration,
+            "rss_mb": rss_after,
+            "rss_delta_mb": (rss_after - rss_before) if rss_after is not None else None,
+            "peak_mb": peak,
+        }
+        log(f"  {name:<28} {duration:8.3f} s", "INFO")
+        return result
+
+
+def run_pipeline(export_path):
+    """Exécute les étapes de export_states.py sur la scène courante."""
+    timer = StageTimer()
+
+    exportable = timer.run("get_exportable_objects", export_states.get_exportable_objects, [])
+    ratios = timer.run(
+        "calculate_decimation_ratios", export_states.calculate_decimation_ratios,
+        exportable, export_states.GLOBAL_CONFIG["target_vertices"],
+    )
+    temp_collection = timer.run("create_temp_collection", export_states.create_temp_collection)
+    copies = timer.run("duplicate_objects", export_states.duplicate_objects, exportable, temp_collection)
+    ratios = timer.run("prepare_copies", export_states.prepare_copies, copies, ratios)
+    timer.run("apply_decimation", export_states.apply_decimation, copies, ratios)
+    timer.run("apply_scale", export_states.apply_scale, copies, export_states.GLOBAL_CONFIG["export_scale"])
+    if export_path:
+        timer.run("export_glb", export_states.export_glb, copies, export_path)
+    timer.run("cleanup_temp_collection", export_states.cleanup_temp_collection)
+
+    return timer.stages
+
+
+def loglog_slope(points):
+    """Pente de la régression log(durée) = a·log(taille) + b."""
+    points = [(x, y) for x, y in points if x > 0 and y > 0]
+    if len(set(x for x, _ in points)) < 2:
+        return None
+    xs = np.log([x for x, _ in points])
+    ys = np.log([y for _, y in points])
+    return float(np.polyfit(xs, ys, 1)[0])
+
+
+def worst_slope(stage_rows, axis, fixed_keys):
+    """
+    Pente selon `axis`, les autres paramètres étant fixés : calculée pour
+    chaque combinaison de `fixed_keys`, la plus forte est retenue.
+    """
+    groups = {}
+    for row in stage_rows:
+        groups.setdefault(tuple(row[k] for k in fixed_keys), []).append((row[axis], row["seconds"]))
+    slopes = [s for s in (loglog_slope(points) for points in groups.values()) if s is not None]
+    return max(slopes) if slopes else None
+
+
+# =============================================================================
+# MAIN
+# =============================================================================
+
+def main():
+    args = parse_args()
+
+    print("\n" + "=" * 60)
+    print("BENCHMARK DE PASSAGE À L'ÉCHELLE - EXPORT")
+    print("=" * 60)
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    export_dir = tempfile.mkdtemp(prefix="bench_export_")
+
+    rows = []
+    grid = itertools.product(args.objects, args.vertices, args.materials, args.repetition)
+    for object_count, total_vertices, material_count, repetition in grid:
+        log(f"Scène : {object_count} objets, {total_vertices:,} vertices, "
+            f"{material_count} matériaux, répétition {repetition:.0%}", "STEP")
+
+        actual_vertices = generate_scene(object_count, total_vertices, material_count, repetition)
+        export_path = os.path.join(export_dir, "bench.glb") if args.export else None
+        stages = run_pipeline(export_path)
+
+        for stage, metrics in stages.items():
+            rows.append({
+                "objects": object_count,
+                "requested_vertices": total_vertices,
+                "vertices": actual_vertices,
+                "materials": material_count,
+                "repetition": repetition,
+                "stage": stage,
+                **metrics,
+            })
+
+    csv_path = os.path.join(args.output_dir, "scaling.csv")
+    with open(csv_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+        writer.writeheader()
+        writer.writerows(rows)
+
+    # Pentes log-log par étape, en fonction du nombre d'objets et des vertices
+    slopes = {}
+    for stage in dict.fromkeys(row["stage"] for row in rows):
+        stage_rows = [row for row in rows if row["stage"] == stage]
+        slopes[stage] = {
+            "objects": worst_slope(
+                stage_rows, "objects", ["requested_vertices", "materials", "repetition"]),
+            "vertices": worst_slope(
+                stage_rows, "vertices", ["objects", "materials", "repetition"]),
+        }
+
+    json_path = os.path.join(args.output_dir, "scaling.json")
+    with open(json_path, "w", encoding="utf-8") as f:
+        json.dump({"rows": rows, "slopes": slopes}, f, indent=2)
+
+    print("\n" + "=" * 60)
+    print("PENTES LOG-LOG (1.0 = linéaire)")
+    print("=" * 60)
+    for stage, values in slopes.items():
+        cells = []
+        for axis, slope in values.items():
+            if slope is None:
+                cells.append(f"{axis}: n/d")
+                continue
+            flag = " SUPER-LINÉAIRE" if slope > BENCH_CONFIG["superlinear_slope"] else ""
+            cells.append(f"{axis}: {slope:.2f}{flag}")
+        print(f"  {stage:<28} " + " | ".join(cells))
+
+    print(f"\nCSV  : {csv_path}")
+    print(f"JSON : {json_path}")
+    print("=" * 60 + "\n")
+
+
+if __name__ == "__main__":
+    main()
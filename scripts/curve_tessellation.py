@@ -0,0 +1,225 @@
+"""
+===============================================================================
+TESSELLATION ADAPTATIVE DES COURBES
+===============================================================================
+
+Projet     : AR Pédagogique - Moteur Hemi
+Fichier    : curve_tessellation.py
+
+Fonctions communes à export_states.py et export_glb.py pour les câbles
+(BezierCurve) exportés en mesh :
+- résolution de chaque spline selon la courbure de ses segments
+- section du biseau réduite pour tenir dans config["curve_vertex_budget"]
+- réglages appliqués temporairement puis restaurés (mode sans copie,
+  planification), ou copies converties en meshes
+
+Les paramètres (curve_vertex_budget, curve_max_segment_angle,
+curve_max_resolution, tessellate_curves) sont lus dans la configuration
+passée par l'appelant.
+
+===============================================================================
+"""
+
+import math
+
+import bpy
+
+
+def log(message, level="INFO"):
+    prefix = {
+        "INFO": "[INFO]",
+        "WARN": "[ATTENTION]",
+        "ERROR": "[ERREUR]",
+        "OK": "[OK]",
+        "STEP": ">>>"
+    }.get(level, "[INFO]")
+    print(f"{prefix} {message}")
+
+
+def bezier_segment_angle(p0, h0, h1, p1):
+    """Courbure d'un segment de Bézier : rotation du polygone de contrôle (radians)."""
+    legs = [leg for leg in (h0 - p0, h1 - h0, p1 - h1) if leg.length > 1e-9]
+    return sum(a.angle(b) for a, b in zip(legs, legs[1:]))
+
+
+def spline_point_count(curve):
+    """Points d'une courbe une fois tessellée (profil d'un objet de biseau)."""
+    total = 0
+    for spline in curve.splines:
+        if spline.type == 'BEZIER':
+            count = len(spline.bezier_points)
+            segments = count if spline.use_cyclic_u else count - 1
+            total += segments * spline.resolution_u + (0 if spline.use_cyclic_u else 1)
+        elif spline.type == 'NURBS':
+            total += len(spline.points) * spline.resolution_u
+        else:
+            total += len(spline.points)
+    return max(total, 1)
+
+
+def bevel_profile_points(curve, bevel_resolution):
+    """
+    Nombre de points de la section : objet de biseau (ses points tessellés),
+    biseau rond (4 + 2 x résolution sur un tour complet), extrusion ou fil.
+    """
+    # bevel_mode n'existe qu'à partir de Blender 2.91 (objet de biseau seul avant)
+    bevel_mode = getattr(curve, "bevel_mode", 'OBJECT')
+    bevel_object = curve.bevel_object
+    if bevel_mode == 'OBJECT' and bevel_object and bevel_object.type == 'CURVE':
+        return spline_point_count(bevel_object.data)
+    if curve.bevel_depth > 0:
+        points = 4 + 2 * bevel_resolution
+        return points if curve.fill_mode == 'FULL' else points // 2 + 1
+    if curve.extrude > 0:
+        return 2
+    return 1
+
+
+def plan_curve_tessellation(curve, config):
+    """
+    Calcule, sans modifier la courbe, la résolution de chaque spline (selon
+    la courbure de ses segments) et la résolution du biseau qui tient dans
+    config["curve_vertex_budget"].
+    Retourne {"resolutions", "bevel_resolution", "vertices"}.
+    """
+    max_angle = math.radians(config["curve_max_segment_angle"])
+    max_resolution = config["curve_max_resolution"]
+    budget = config["curve_vertex_budget"]
+
+    resolutions = []
+    segments = []
+    for spline in curve.splines:
+        if spline.type == 'BEZIER':
+            points = spline.bezier_points
+            count = len(points) if spline.use_cyclic_u else len(points) - 1
+            needed = 1
+            for i in range(count):
+                a, b = points[i], points[(i + 1) % len(points)]
+                angle = bezier_segment_angle(a.co, a.handle_right, b.handle_left, b.co)
+                needed = max(needed, math.ceil(angle / max_angle))
+            resolutions.append(min(max_resolution, needed))
+        else:
+            count = len(spline.points) if spline.use_cyclic_u else len(spline.points) - 1
+            resolutions.append(min(max_resolution, spline.resolution_u))
+        segments.append((max(count, 0), spline.use_cyclic_u))
+
+    def ring_count(resolutions):
+        return sum(
+            count * res + (0 if cyclic else 1)
+            for (count, cyclic), res in zip(segments, resolutions)
+        )
+
+    # Section la plus fine possible dans le budget, sans dépasser l'original
+    bevel_resolution = curve.bevel_resolution
+    rings = ring_count(resolutions)
+    while bevel_resolution > 0 and rings * bevel_profile_points(curve, bevel_resolution) > budget:
+        bevel_resolution -= 1
+
+    # Si la section minimale dépasse encore le budget, réduire le long des courbes
+    profile = bevel_profile_points(curve, bevel_resolution)
+    if rings * profile > budget and rings > 0:
+        factor = budget / (rings * profile)
+        resolutions = [max(1, int(res * factor)) for res in resolutions]
+        rings = ring_count(resolutions)
+
+    return {
+        "resolutions": resolutions,
+        "bevel_resolution": bevel_resolution,
+        "vertices": rings * profile,
+    }
+
+
+def apply_curve_tessellation(curve, config):
+    """
+    Applique le plan de tessellation aux données de la courbe.
+    Retourne les réglages d'origine (pour restore_curve_tessellation).
+    """
+    plan = plan_curve_tessellation(curve, config)
+    saved = {
+        "resolution_u": curve.resolution_u,
+        "bevel_resolution": curve.bevel_resolution,
+        "splines": [spline.resolution_u for spline in curve.splines],
+    }
+    for spline, resolution in zip(curve.splines, plan["resolutions"]):
+        spline.resolution_u = resolution
+    curve.bevel_resolution = plan["bevel_resolution"]
+    return saved
+
+
+def restore_curve_tessellation(curve, saved):
+    curve.resolution_u = saved["resolution_u"]
+    curve.bevel_resolution = saved["bevel_resolution"]
+    for spline, resolution in zip(curve.splines, saved["splines"]):
+        spline.resolution_u = resolution
+
+
+def apply_object_tessellation(objects, config, saved):
+    """
+    Applique le plan de tessellation aux courbes de `objects`, une seule
+    fois par datablock (courbe partagée entre plusieurs objets : un second
+    relevé enregistrerait des réglages déjà modifiés). Les réglages
+    d'origine sont ajoutés à `saved` au fur et à mesure.
+    """
+    seen = set()
+    for obj in objects:
+        if obj.type != 'CURVE' or obj.data.as_pointer() in seen:
+            continue
+        seen.add(obj.data.as_pointer())
+        saved.append((obj.data, apply_curve_tessellation(obj.data, config)))
+
+
+def restore_object_tessellation(saved):
+    """Restaure les réglages relevés par apply_object_tessellation (ordre inverse)."""
+    for curve, settings in reversed(saved):
+        restore_curve_tessellation(curve, settings)
+    saved.clear()
+
+
+def count_curve_vertices(obj, config):
+    """
+    Vertices réels d'une courbe (évaluation depsgraph : biseau, objet de
+    biseau, taper compris), plan de tessellation appliqué temporairement
+    si config["tessellate_curves"].
+    """
+    saved = apply_curve_tessellation(obj.data, config) if config["tessellate_curves"] else None
+    try:
+        evaluated = obj.evaluated_get(bpy.context.evaluated_depsgraph_get())
+        mesh = evaluated.to_mesh()
+        count = len(mesh.vertices) if mesh else 0
+        evaluated.to_mesh_clear()
+    finally:
+        if saved is not None:
+            restore_curve_tessellation(obj.data, saved)
+    return count
+
+
+def convert_curves_to_meshes(copies, target_collection, config):
+    """
+    Remplace les copies de courbes par des meshes tessellés selon leur plan.
+    Les copies étant indépendantes, les courbes d'origine ne sont pas touchées.
+    """
+    for original_name, obj_copy in list(copies.items()):
+        if obj_copy.type != 'CURVE':
+            continue
+
+        planned = plan_curve_tessellation(obj_copy.data, config)["vertices"]
+        apply_curve_tessellation(obj_copy.data, config)
+        depsgraph = bpy.context.evaluated_depsgraph_get()
+        mesh = bpy.data.meshes.new_from_object(obj_copy.evaluated_get(depsgraph))
+        if abs(len(mesh.vertices) - planned) > 0.1 * max(planned, 1):
+            log(f"Tessellation de {original_name} : {len(mesh.vertices)} vertices "
+                f"pour {planned} prévus", "WARN")
+
+        mesh_obj = bpy.data.objects.new(f"{original_name}_export_mesh", mesh)
+        mesh_obj.parent = obj_copy.parent
+        mesh_obj.matrix_parent_inverse = obj_copy.matrix_parent_inverse.copy()
+        mesh_obj.matrix_basis = obj_copy.matrix_basis.copy()
+        target_collection.objects.link(mesh_obj)
+
+        curve_data = obj_copy.data
+        bpy.data.objects.remove(obj_copy, do_unlink=True)
+        bpy.data.curves.remove(curve_data)
+        mesh_obj.name = f"{original_name}_export"
+
+        copies[original_name] = mesh_obj
+        log(f"Courbe tessellée : {original_name} ({len(mesh.vertices)} vertices)", "INFO")
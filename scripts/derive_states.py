@@ -0,0 +1,213 @@
+"""
+===============================================================================
+DÉRIVATION DES ÉTATS B/C DEPUIS LE GLB DE L'ÉTAT A (SANS BLENDER)
+===============================================================================
+
+Projet     : AR Pédagogique - Moteur Hemi
+Fichier    : derive_states.py
+Entrée     : assets/models/hemi_state_a_full.glb
+Sortie     : assets/models/hemi_state_*.glb (états dérivés)
+
+PRINCIPE DE FONCTIONNEMENT :
+----------------------------
+Les états B et C sont définis comme "état A moins certains objets".
+Au lieu de relancer Blender (duplication, décimation, export), ce script :
+1. Lit le GLB de l'état de référence (celui sans exclusion)
+2. Supprime les nœuds des objets exclus (noms Blender, avec ou sans
+   le suffixe "_export" des copies)
+3. Supprime meshes, matériaux, textures et accessors devenus inutiles
+4. Recopie uniquement les bufferViews encore référencées (aucun décodage
+   ni réencodage de la géométrie)
+
+Un état qui garde un objet exclu de la référence, ou qui exclut un objet
+absent du GLB de référence, est une erreur (GLB et configuration
+désaccordés). Une référence progressive (progressive_glb.py) donne des
+états non progressifs : la version grossière est retirée.
+
+Les états sont lus dans STATES_CONFIG de export_states.py (sans importer
+bpy), ou dans un fichier JSON (--states-config).
+
+USAGE :
+-------
+python3 scripts/derive_states.py
+python3 scripts/derive_states.py --input assets/models/hemi_state_a_full.glb --output-dir assets/models
+
+Un GLB compressé avec Draco est accepté (les données ne sont pas
+décodées). Limite : un seul buffer (celui du GLB).
+
+===============================================================================
+"""
+
+import argparse
+import ast
+import json
+import os
+import sys
+import time
+
+import glb_utils
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+CONFIG = {
+    "export_script": os.path.join(SCRIPTS_DIR, "export_states.py"),
+    "models_dir": os.path.join(SCRIPTS_DIR, "..", "assets", "models"),
+    # Suffixe des copies créées par les exporteurs (duplicate_objects)
+    "copy_suffix": "_export",
+}
+
+
+# =============================================================================
+# FONCTIONS UTILITAIRES
+# =============================================================================
+
+def log(message, level="INFO"):
+    prefix = {
+        "INFO": "[INFO]",
+        "WARN": "[ATTENTION]",
+        "ERROR": "[ERREUR]",
+        "OK": "[OK]",
+        "STEP": ">>>"
+    }.get(level, "[INFO]")
+    print(f"{prefix} {message}")
+
+
+def load_states_config(path=None):
+    """
+    Charge la définition des états : fichier JSON si fourni, sinon le
+    dictionnaire littéral STATES_CONFIG de export_states.py (lu par ast,
+    sans dépendre de Blender).
+    """
+    if path:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    with open(CONFIG["export_script"], encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(
+            isinstance(target, ast.Name) and target.id == "STATES_CONFIG"
+            for target in node.targets
+        ):
+            return ast.literal_eval(node.value)
+
+    raise ValueError("STATES_CONFIG introuvable dans export_states.py")
+
+
+def find_reference_state(states_config):
+    """L'état de référence est celui qui exclut le moins d'objets."""
+    return min(states_config, key=lambda name: len(states_config[name]["exclude_objects"]))
+
+
+def node_matches(node_name, object_name):
+    """Un nœud GLB correspond à un objet Blender (original ou copie d'export)."""
+    return node_name == object_name or node_name.startswith(object_name + CONFIG["copy_suffix"])
+
+
+# =============================================================================
+# DÉRIVATION
+# =============================================================================
+
+def derive_state(gltf, binary, excluded_names):
+    """
+    Retire les nœuds des objets exclus de `gltf` (modifié sur place).
+    Retourne (buffer compacté, nombre de nœuds retirés).
+    Lève ValueError si un objet exclu est absent du GLB de référence.
+    """
+    nodes = gltf.get("nodes", [])
+    missing = [
+        name for name in excluded_names
+        if not any(node_matches(node.get("name", ""), name) for node in nodes)
+    ]
+    if missing:
+        raise ValueError(f"Objets absents du GLB de référence : {', '.join(missing)}")
+
+    to_remove = [
+        index for index, node in enumerate(nodes)
+        if any(node_matches(node.get("name", ""), name) for name in excluded_names)
+    ]
+
+    # La version grossière décrit tous les nœuds et pointe dans le début du
+    # buffer, que compact_buffers ne conserve pas : elle est retirée
+    extras = gltf.get("extras", {})
+    if extras.pop("progressive", None) is not None:
+        log("Référence progressive : version grossière retirée "
+            "(relancer progressive_glb.py sur l'état dérivé)", "WARN")
+        if not extras:
+            del gltf["extras"]
+
+    removed = glb_utils.remove_nodes(gltf, to_remove)
+    glb_utils.prune_unused(gltf)
+    return glb_utils.compact_buffers(gltf, binary), removed
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Dérive les états depuis le GLB de référence")
+    parser.add_argument("--input", help="GLB de l'état de référence")
+    parser.add_argument("--output-dir", default=CONFIG["models_dir"])
+    parser.add_argument("--states-config", help="Fichier JSON remplaçant STATES_CONFIG")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    print("\n" + "=" * 60)
+    print("DÉRIVATION DES ÉTATS - SANS BLENDER")
+    print("=" * 60)
+
+    start = time.perf_counter()
+    states = load_states_config(args.states_config)
+    reference = find_reference_state(states)
+    reference_excluded = set(states[reference]["exclude_objects"])
+
+    input_path = args.input or os.path.join(CONFIG["models_dir"], states[reference]["filename"])
+    if not os.path.exists(input_path):
+        log(f"GLB de référence introuvable : {input_path}", "ERROR")
+        return 1
+
+    with open(input_path, "rb") as f:
+        source = f.read()
+    glb_utils.check_supported(glb_utils.parse_glb(source)[0], allow_compressed=True)
+    log(f"Référence : {reference} ({input_path})", "INFO")
+
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    for state_name, state_config in states.items():
+        if state_name == reference:
+            continue
+
+        # Objets exclus de la référence mais gardés par cet état : impossible
+        # à reconstruire sans Blender
+        unavailable = sorted(reference_excluded - set(state_config["exclude_objects"]))
+        if unavailable:
+            log(f"{state_name} : objets absents de la référence "
+                f"{reference} : {', '.join(unavailable)}", "ERROR")
+            return 1
+
+        excluded = [n for n in state_config["exclude_objects"] if n not in reference_excluded]
+
+        # Chaque état repart d'un JSON neuf (la dérivation le modifie)
+        gltf, binary = glb_utils.parse_glb(source)
+        try:
+            binary, removed = derive_state(gltf, binary, excluded)
+        except ValueError as e:
+            log(f"{state_name} : {e}", "ERROR")
+            return 1
+
+        output_path = os.path.join(args.output_dir, state_config["filename"])
+        size = glb_utils.write_glb(output_path, gltf, binary)
+        log(f"{state_name} : {removed} nœuds retirés -> {output_path} "
+            f"({size / (1024 * 1024):.2f} Mo)", "OK")
+
+    log(f"Durée totale : {(time.perf_counter() - start) * 1000:.0f} ms", "INFO")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -15,13 +15,39 @@ PRINCIPE DE FONCTIONNEMENT :
 4. Supprime la collection temporaire
 5. Le fichier .blend original reste INTACT
 
+MODE SANS COPIE (CONFIG["copy_free"] = True) :
+----------------------------------------------
+- Aucune duplication : un modifier Decimate temporaire est ajouté aux originaux
+- L'échelle est portée par un objet racine temporaire
+- L'exporteur évalue le tout (export_apply=True), puis modifiers et racine
+  sont retirés : même résultat sans doubler la mémoire des meshes
+
 OBJETS EXCLUS DE L'EXPORT :
 ---------------------------
 - Plane (sol)
 - Camera
 - Lamp, Lamp.001, Lamp.002
-- engine.009 (mesh vide, 0 vertices)
-- BezierCurve (câbles décoratifs, optionnel)
+
+Les meshes vides ou entièrement dégénérés (ex. engine.009) sont ignorés
+automatiquement, sans liste à tenir à jour.
+
+NETTOYAGE AVANT DÉCIMATION (CONFIG["clean_meshes"]) :
+----------------------------------------------------
+- Détection vectorisée (foreach_get + NumPy) des doublons, faces
+  dégénérées, arêtes et vertices isolés sur les copies
+- Reconstruction vectorisée (foreach_set) : seuls les doublons détectés
+  sont soudés, défauts présents supprimés, bilan par objet ; les copies
+  avec groupes de vertices ou clés de forme ne sont pas reconstruites
+- Code commun dans mesh_cleanup.py, à garder à côté de ce script
+- Ratios de décimation recalculés sur la géométrie nettoyée
+
+COURBES (câbles BezierCurve) :
+------------------------------
+- Exportées en mesh avec une tessellation adaptative : résolution de chaque
+  spline selon sa courbure, section du biseau réduite pour tenir dans
+  CONFIG["curve_vertex_budget"] (CONFIG["tessellate_curves"] = False pour
+  revenir au comportement de l'exporteur)
+- Code commun dans curve_tessellation.py, à garder à côté de ce script
 
 STRATÉGIE DE DÉCIMATION :
 -------------------------
@@ -30,12 +56,31 @@ STRATÉGIE DE DÉCIMATION :
 - Préserve les détails relatifs de chaque composant
 - Cible globale : 50-80k vertices
 
+PLANIFICATION (CONFIG["dry_run"] ou "-- --dry-run") :
+-----------------------------------------------------
+- Aucune copie ni export : objets, ratios, vertices et triangles prévus,
+  taille du GLB (avec et sans Draco) et durée estimée
+- Le modèle de coût est recalé à chaque export réel
+  (benchmarks/export_calibration.json, partagé avec export_states.py)
+- Calcul commun dans export_planner.py, à garder à côté de ce script
+
 ===============================================================================
 """
 
 import bpy
 import os
-import math
+import sys
+import time
+
+import numpy as np
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+if SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, SCRIPTS_DIR)
+
+import curve_tessellation
+import export_planner
+import mesh_cleanup
 
 # =============================================================================
 # CONFIGURATION
@@ -57,14 +102,25 @@ CONFIG = {
         "Lamp",
         "Lamp.001",
         "Lamp.002",
-        "engine.009",    # Mesh vide (0 vertices)
-        "BezierCurve",   # Câbles décoratifs
     ],
 
     # Seuil minimum de vertices pour appliquer la décimation
     # Les objets sous ce seuil ne seront pas décimés
     "decimation_threshold": 500,
 
+    # Nettoyage des copies avant décimation (doublons, faces dégénérées,
+    # arêtes et vertices isolés) ; les meshes vides sont ignorés d'office
+    "clean_meshes": True,
+    "merge_distance": 1e-5,            # Distance de fusion des doublons
+    "min_face_area": 1e-12,            # Aire sous laquelle une face est dégénérée
+
+    # Tessellation adaptative des courbes (câbles BezierCurve) :
+    # résolution selon la courbure, section selon un budget de vertices
+    "tessellate_curves": True,
+    "curve_vertex_budget": 400,        # Vertices max par objet courbe
+    "curve_max_segment_angle": 12.0,   # Degrés de courbure par segment
+    "curve_max_resolution": 12,
+
     # Nom de la collection temporaire pour l'export
     "temp_collection_name": "__EXPORT_TEMP__",
 
@@ -73,6 +129,24 @@ CONFIG = {
     # Cette échelle sera APPLIQUÉE à la géométrie avant export
     "export_scale": 0.05,
 
+    # Mode sans copie : décimation et échelle évaluées par l'exporteur
+    # directement depuis les originaux (pas de duplication des meshes)
+    "copy_free": False,
+    "root_name": "hemi_root",
+
+    # Planification sans export (ou argument "--dry-run" après "--")
+    "dry_run": False,
+    # Modèle de coût de la planification, recalé sur les exports réels
+    # enregistrés dans calibration_file (relatif au .blend)
+    "calibration_file": "benchmarks/export_calibration.json",
+    "calibration_samples": 50,
+    "cost_model": {
+        "seconds": [1.0, 2e-5, 1e-5],   # fixe, par vertex source, par vertex exporté
+        "bytes_factor": 1.0,            # octets réels / octets estimés
+        "vertex_split": 1.3,            # vertices glTF / vertices Blender (coutures)
+        "draco_ratio": 0.15,            # géométrie compressée / non compressée
+    },
+
     # Activer la compression Draco
     "use_draco": True,
     "draco_compression_level": 6,
@@ -95,6 +169,14 @@ def log(message, level="INFO"):
     print(f"{prefix} {message}")
 
 
+def get_blend_dir():
+    return os.path.dirname(bpy.data.filepath) or os.getcwd()
+
+
+def get_output_path():
+    return os.path.join(get_blend_dir(), CONFIG["output_filename"])
+
+
 def count_vertices(objects):
     """Compte le nombre total de vertices dans une liste d'objets mesh."""
     total = 0
@@ -113,6 +195,9 @@ def get_exportable_objects():
         if obj.name in excluded_names:
             log(f"Exclu : {obj.name}", "WARN")
             continue
+        if obj.type == 'MESH' and mesh_cleanup.is_empty_mesh(obj.data, CONFIG):
+            log(f"Ignoré : {obj.name} (mesh vide ou dégénéré)", "WARN")
+            continue
         if obj.type in ['MESH', 'CURVE']:
             exportable.append(obj)
 
@@ -133,6 +218,10 @@ def calculate_decimation_ratios(objects, target_vertices):
     non_decimatable_vertices = 0
 
     for obj in objects:
+        if obj.type == 'CURVE' and CONFIG["tessellate_curves"]:
+            # Les courbes ont leur propre budget et ne sont pas décimées
+            non_decimatable_vertices += count_curve_vertices(obj)
+            continue
         if obj.type != 'MESH' or not obj.data:
             continue
         v_count = len(obj.data.vertices)
@@ -298,6 +387,101 @@ def apply_scale_to_geometry(copies, scale_factor):
     log(f"Échelle {scale_factor} appliquée à {len(copies)} objets depuis l'origine", "OK")
 
 
+def prepare_copies(copies, ratios):
+    """
+    Nettoyage des copies puis ratios de décimation recalculés sur la
+    géométrie nettoyée (clés : noms des originaux).
+    """
+    if not CONFIG["clean_meshes"]:
+        return ratios
+    log("Nettoyage des meshes...", "STEP")
+    mesh_cleanup.clean_copies(copies, CONFIG)
+    copy_ratios = calculate_decimation_ratios(list(copies.values()), CONFIG["target_vertices"])
+    return {name: copy_ratios.get(obj_copy.name, 1.0) for name, obj_copy in copies.items()}
+
+
+def count_curve_vertices(obj):
+    """Vertices réels d'une courbe après tessellation (voir curve_tessellation)."""
+    return curve_tessellation.count_curve_vertices(obj, CONFIG)
+
+
+def add_decimation_modifiers(objects, ratios):
+    """
+    Mode sans copie : ajoute un modifier Decimate NON appliqué aux originaux.
+    L'exporteur l'évalue (export_apply=True), il est retiré ensuite.
+    """
+    log("Ajout des modifiers de décimation temporaires...", "STEP")
+
+    for obj in objects:
+        if obj.type != 'MESH':
+            continue
+
+        ratio = ratios.get(obj.name, 1.0)
+        if ratio >= 0.99:
+            continue
+
+        decimate = obj.modifiers.new(name="Decimate_Export", type='DECIMATE')
+        decimate.decimate_type = 'COLLAPSE'
+        decimate.ratio = ratio
+        decimate.use_collapse_triangulate = False
+
+    depsgraph = bpy.context.evaluated_depsgraph_get()
+    vertices = sum(
+        len(obj.evaluated_get(depsgraph).data.vertices)
+        for obj in objects if obj.type == 'MESH' and obj.data
+    )
+    log(f"Vertices évalués après décimation : {vertices:,}", "OK")
+
+
+def remove_decimation_modifiers(objects):
+    """Retire les modifiers temporaires ajoutés par add_decimation_modifiers."""
+    for obj in objects:
+        if obj.type != 'MESH':
+            continue
+        decimate = obj.modifiers.get("Decimate_Export")
+        if decimate:
+            obj.modifiers.remove(decimate)
+
+
+def attach_scale_root(objects, scale_factor, target_collection, saved_links):
+    """
+    Mode sans copie : crée un objet racine portant l'échelle depuis l'origine
+    et y rattache les objets de premier niveau.
+    Chaque lien d'origine est ajouté à `saved_links` avant d'être modifié :
+    l'appelant restaure avec detach_scale_root (dans un finally), même si
+    le rattachement échoue en cours de route. Retourne la racine.
+    """
+    log(f"Échelle {scale_factor} portée par l'objet racine...", "STEP")
+
+    root = bpy.data.objects.new(CONFIG["root_name"], None)
+    root.scale = (scale_factor, scale_factor, scale_factor)
+    target_collection.objects.link(root)
+
+    exported = set(objects)
+
+    for obj in objects:
+        if obj.parent in exported:
+            continue
+
+        saved_links.append((obj, obj.parent, obj.matrix_parent_inverse.copy()))
+        world = obj.matrix_world.copy()
+        obj.parent = root
+        # Monde final = échelle racine @ ancien monde
+        obj.matrix_parent_inverse = world @ obj.matrix_basis.inverted()
+
+    bpy.context.view_layer.update()
+    return root
+
+
+def detach_scale_root(saved_links):
+    """Restaure les parents d'origine (avant suppression de la racine)."""
+    for obj, parent, parent_inverse in saved_links:
+        obj.parent = parent
+        obj.matrix_parent_inverse = parent_inverse
+
+    bpy.context.view_layer.update()
+
+
 def hide_original_objects(objects):
     """Cache les objets originaux pour l'export."""
     for obj in objects:
@@ -312,16 +496,17 @@ def show_original_objects(objects):
         obj.hide_render = False
 
 
-def export_glb(copies):
-    """Exporte les copies en GLB avec compression Draco."""
+def export_glb(copies, require_apply=False):
+    """
+    Exporte les copies en GLB avec compression Draco.
+    `require_apply` (mode sans copie) : échoue plutôt que d'exporter sans
+    export_apply, qui laisserait les originaux non décimés.
+    Retourne True si le fichier a été écrit.
+    """
     log("Export GLB en cours...", "STEP")
 
     # Chemin de sortie
-    blend_dir = os.path.dirname(bpy.data.filepath)
-    if not blend_dir:
-        blend_dir = os.getcwd()
-
-    output_path = os.path.join(blend_dir, CONFIG["output_filename"])
+    output_path = get_output_path()
 
     # Créer le dossier assets si nécessaire
     output_dir = os.path.dirname(output_path)
@@ -349,6 +534,10 @@ def export_glb(copies):
             export_apply=True
         )
     except TypeError as e:
+        if require_apply:
+            log(f"Exporteur incompatible avec export_apply ({e}) : "
+                f"export sans copie impossible", "ERROR")
+            return False
         # Fallback pour versions différentes de l'API
         log(f"Tentative avec paramètres alternatifs...", "WARN")
         bpy.ops.export_scene.gltf(
@@ -362,8 +551,10 @@ def export_glb(copies):
         file_size = os.path.getsize(output_path) / (1024 * 1024)  # Mo
         log(f"Export réussi : {output_path}", "OK")
         log(f"Taille du fichier : {file_size:.2f} Mo", "INFO")
-    else:
-        log(f"Échec de l'export : fichier non créé", "ERROR")
+        return True
+
+    log(f"Échec de l'export : fichier non créé", "ERROR")
+    return False
 
 
 def cleanup_temp_collection():
@@ -392,6 +583,96 @@ def cleanup_temp_collection():
     log("Collection temporaire nettoyée", "OK")
 
 
+def export_copy_free(exportable_objects, ratios, temp_collection):
+    """Variante sans copie des étapes 4 à 10 (originaux restaurés à la fin)."""
+    saved_links = []
+    saved_curves = []
+
+    try:
+        # ÉTAPE 4 : Décimation non destructive sur les originaux
+        add_decimation_modifiers(exportable_objects, ratios)
+        if CONFIG["tessellate_curves"]:
+            # Réglages temporaires, restaurés après l'export
+            curve_tessellation.apply_object_tessellation(exportable_objects, CONFIG, saved_curves)
+
+        # ÉTAPE 5 : Échelle portée par un objet racine
+        root = attach_scale_root(
+            exportable_objects, CONFIG["export_scale"], temp_collection, saved_links
+        )
+
+        # ÉTAPE 6 : Exporter (modifiers évalués par l'exporteur)
+        selection = {obj.name: obj for obj in exportable_objects}
+        selection[root.name] = root
+        success = export_glb(selection, require_apply=True)
+    finally:
+        # ÉTAPE 7 : Restaurer les originaux et nettoyer
+        log("Nettoyage...", "STEP")
+        detach_scale_root(saved_links)
+        remove_decimation_modifiers(exportable_objects)
+        curve_tessellation.restore_object_tessellation(saved_curves)
+        cleanup_temp_collection()
+
+    if not success:
+        return False
+
+    print("\n" + "=" * 60)
+    print("EXPORT SANS COPIE TERMINÉ AVEC SUCCÈS")
+    print("Le fichier .blend original n'a PAS été modifié.")
+    print("=" * 60 + "\n")
+
+    return True
+
+
+# =============================================================================
+# PLANIFICATION (DRY RUN)
+# =============================================================================
+
+def get_calibration_path():
+    return os.path.join(get_blend_dir(), CONFIG["calibration_file"])
+
+
+def record_export(plan, start):
+    """Enregistre la mesure d'un export réel pour recaler le modèle de coût."""
+    output_path = get_output_path()
+    if not os.path.exists(output_path):
+        return
+    export_planner.record_calibration_sample(get_calibration_path(), {
+        "source_vertices": plan["source_vertices"],
+        "vertices": plan["vertices"],
+        "raw_bytes": plan["raw_bytes"],
+        "bytes": os.path.getsize(output_path),
+        "seconds": time.perf_counter() - start,
+    }, CONFIG["calibration_samples"])
+
+
+def print_plan(plan):
+    """Affiche le plan d'export et signale une cible hors [min, max]."""
+    print("\n" + "-" * 60)
+    print("PLAN D'EXPORT (aucun fichier écrit)")
+    print("-" * 60)
+    for obj in plan["objects"]:
+        print(f"  {obj['name']:<20} ratio {obj['ratio']:>5.0%}  "
+              f"{obj['source_vertices']:>9,} -> {obj['vertices']:>8,} vertices, "
+              f"{obj['triangles']:>8,} triangles")
+    print(f"  Vertices : {plan['source_vertices']:,} -> {plan['vertices']:,} "
+          f"({plan['triangles']:,} triangles)")
+    print(f"  Taille : {plan['bytes'] / (1024 * 1024):.2f} Mo "
+          f"(Draco : {plan['draco_bytes'] / (1024 * 1024):.2f} Mo)")
+    print(f"  Durée estimée : {plan['seconds']:.1f} s")
+
+    if plan["vertices"] < CONFIG["target_vertices_min"]:
+        log(f"Attention : sous la cible minimale ({CONFIG['target_vertices_min']:,})", "WARN")
+    elif plan["vertices"] > CONFIG["target_vertices_max"]:
+        log(f"Attention : au-dessus de la cible maximale ({CONFIG['target_vertices_max']:,})", "WARN")
+    else:
+        log(f"Cible atteinte : {plan['vertices']:,} vertices prévus", "OK")
+
+
+def is_dry_run():
+    args = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    return CONFIG["dry_run"] or "--dry-run" in args
+
+
 # =============================================================================
 # POINT D'ENTRÉE PRINCIPAL
 # =============================================================================
@@ -427,16 +708,41 @@ def main():
         log("Calcul des ratios de décimation...", "STEP")
         ratios = calculate_decimation_ratios(exportable_objects, CONFIG["target_vertices"])
 
+        if is_dry_run():
+            calibration = export_planner.load_calibration(get_calibration_path())
+            model = export_planner.fit_cost_model(calibration["samples"], CONFIG["cost_model"])
+            log(f"Modèle de coût : {model['samples']} mesure(s) d'export réel", "INFO")
+            print_plan(export_planner.plan_export(exportable_objects, ratios, model,
+                                                  count_curve_vertices))
+            return True
+
+        # Prévision non recalée, comparée ensuite à la mesure réelle
+        plan = export_planner.plan_export(exportable_objects, ratios, CONFIG["cost_model"],
+                                          count_curve_vertices)
+        start = time.perf_counter()
+
         # ÉTAPE 3 : Créer la collection temporaire
         temp_collection = create_temp_collection()
 
+        if CONFIG["copy_free"]:
+            success = export_copy_free(exportable_objects, ratios, temp_collection)
+            if success:
+                record_export(plan, start)
+            return success
+
         # ÉTAPE 4 : Dupliquer les objets
         log("Duplication des objets...", "STEP")
         copies = duplicate_objects_to_collection(exportable_objects, temp_collection)
 
-        # ÉTAPE 5 : Appliquer la décimation sur les copies
+        # ÉTAPE 5 : Nettoyer puis décimer les copies (ratios recalculés)
+        ratios = prepare_copies(copies, ratios)
         apply_decimation(copies, ratios)
 
+        # Courbes -> meshes (tessellation adaptative)
+        if CONFIG["tessellate_curves"]:
+            log("Tessellation des courbes...", "STEP")
+            curve_tessellation.convert_curves_to_meshes(copies, temp_collection, CONFIG)
+
         # Compter les vertices après
         vertices_after = count_vertices(list(copies.values()))
         reduction_total = (1 - vertices_after / vertices_before) * 100
@@ -457,7 +763,7 @@ def main():
         hide_original_objects(exportable_objects)
 
         # ÉTAPE 8 : Exporter en GLB
-        export_glb(copies)
+        exported = export_glb(copies)
 
         # ÉTAPE 9 : Restaurer les originaux
         show_original_objects(exportable_objects)
@@ -465,6 +771,9 @@ def main():
         # ÉTAPE 10 : Nettoyer
         log("Nettoyage...", "STEP")
         cleanup_temp_collection()
+        if not exported:
+            return False
+        record_export(plan, start)
 
         print("\n" + "=" * 60)
         print("EXPORT TERMINÉ AVEC SUCCÈS")
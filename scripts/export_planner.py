@@ -0,0 +1,167 @@
+"""
+===============================================================================
+PLANIFICATION DES EXPORTS (MODÈLE DE COÛT ET CALIBRATION)
+===============================================================================
+
+Projet     : AR Pédagogique - Moteur Hemi
+Fichier    : export_planner.py
+
+Fonctions communes à export_states.py et export_glb.py (mode --dry-run) :
+- prévision par objet et par export (vertices, triangles, taille du GLB
+  avec et sans Draco, durée)
+- modèle de coût recalé sur les mesures d'exports réels
+- lecture et écriture du fichier de calibration (écriture atomique ; une
+  erreur d'écriture n'interrompt jamais un export)
+
+Les paramètres (modèle par défaut, nombre de mesures gardées) sont passés
+par l'appelant, depuis sa propre configuration.
+
+===============================================================================
+"""
+
+import json
+import os
+import tempfile
+
+import bpy
+import numpy as np
+
+
+def log(message, level="INFO"):
+    prefix = {
+        "INFO": "[INFO]",
+        "WARN": "[ATTENTION]",
+        "ERROR": "[ERREUR]",
+        "OK": "[OK]",
+        "STEP": ">>>"
+    }.get(level, "[INFO]")
+    print(f"{prefix} {message}")
+
+
+# =============================================================================
+# CALIBRATION
+# =============================================================================
+
+def load_calibration(path):
+    """Mesures d'exports réels ; aucune si le fichier est absent ou illisible."""
+    if not os.path.exists(path):
+        return {"samples": []}
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        log(f"Calibration illisible, ignorée ({path}) : {e}", "WARN")
+        return {"samples": []}
+
+
+def record_calibration_sample(path, sample, max_samples):
+    """
+    Ajoute la mesure d'un export réel (les plus anciennes sont oubliées).
+    Écriture dans un fichier temporaire puis os.replace : un export
+    interrompu ou concurrent ne laisse jamais de fichier tronqué.
+    """
+    calibration = load_calibration(path)
+    calibration["samples"] = (calibration.get("samples", []) + [sample])[-max_samples:]
+    temp_path = None
+    try:
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(prefix=".calibration_", suffix=".json", dir=directory)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(calibration, f, indent=2)
+        os.replace(temp_path, path)
+    except OSError as e:
+        log(f"Calibration non enregistrée ({path}) : {e}", "WARN")
+        if temp_path and os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def fit_cost_model(samples, default_model):
+    """
+    Durée = a + b·vertices source + c·vertices exportés (moindres carrés),
+    facteur de taille = médiane(octets réels / octets estimés). Valeurs de
+    `default_model` tant que les mesures manquent.
+    """
+    model = dict(default_model)
+    if len(samples) >= 3:
+        features = np.array([[1.0, s["source_vertices"], s["vertices"]] for s in samples])
+        seconds = np.array([s["seconds"] for s in samples])
+        coefficients = np.linalg.lstsq(features, seconds, rcond=None)[0]
+        if (coefficients >= 0).all():
+            model["seconds"] = coefficients.tolist()
+    factors = [s["bytes"] / s["raw_bytes"] for s in samples if s.get("raw_bytes")]
+    if factors:
+        model["bytes_factor"] = float(np.median(factors))
+    model["samples"] = len(samples)
+    return model
+
+
+# =============================================================================
+# PRÉVISION
+# =============================================================================
+
+def get_image_file_bytes(image):
+    """Taille de l'image telle qu'elle sera embarquée dans le GLB."""
+    if image.packed_file:
+        return image.packed_file.size
+    path = bpy.path.abspath(image.filepath)
+    if path and os.path.exists(path):
+        return os.path.getsize(path)
+    width, height = image.size
+    return width * height * 3 // 4  # Ordre de grandeur d'un JPEG
+
+
+def plan_object(obj, ratio, count_curve_vertices):
+    """
+    Vertices, triangles et octets par vertex prévus pour un objet.
+    `count_curve_vertices(obj)` : vertices d'une courbe après la
+    tessellation de l'exporteur appelant.
+    """
+    if obj.type == 'CURVE':
+        vertices = count_curve_vertices(obj)
+        return {"source_vertices": vertices, "vertices": vertices,
+                "triangles": 2 * vertices, "stride": 32}
+
+    mesh = obj.data
+    totals = np.empty(len(mesh.polygons), dtype=np.int64)
+    mesh.polygons.foreach_get("loop_total", totals)
+    triangles = int((totals - 2).sum())
+    return {
+        "source_vertices": len(mesh.vertices),
+        "vertices": int(round(len(mesh.vertices) * ratio)),
+        "triangles": int(round(triangles * ratio)),
+        "stride": 24 + 8 * len(mesh.uv_layers),
+    }
+
+
+def plan_export(exportable, ratios, model, count_curve_vertices):
+    """Prévision pour une liste d'objets (ratios déjà calculés)."""
+    objects = []
+    images = set()
+    geometry_bytes = 0
+    for obj in exportable:
+        ratio = ratios.get(obj.name, 1.0)
+        planned = plan_object(obj, ratio, count_curve_vertices)
+        exported_vertices = planned["vertices"] * model["vertex_split"]
+        index_size = 2 if exported_vertices < 65536 else 4
+        geometry_bytes += exported_vertices * planned["stride"] + planned["triangles"] * 3 * index_size
+        for slot in obj.material_slots:
+            if slot.material and slot.material.use_nodes and slot.material.node_tree:
+                images.update(node.image for node in slot.material.node_tree.nodes
+                              if node.type == 'TEX_IMAGE' and node.image)
+        objects.append({"name": obj.name, "ratio": ratio, **planned})
+
+    texture_bytes = sum(get_image_file_bytes(image) for image in images)
+    source_vertices = sum(o["source_vertices"] for o in objects)
+    vertices = sum(o["vertices"] for o in objects)
+    a, b, c = model["seconds"]
+    return {
+        "objects": objects,
+        "source_vertices": source_vertices,
+        "vertices": vertices,
+        "triangles": sum(o["triangles"] for o in objects),
+        "raw_bytes": int(geometry_bytes + texture_bytes),
+        "bytes": int((geometry_bytes + texture_bytes) * model["bytes_factor"]),
+        "draco_bytes": int((geometry_bytes * model["draco_ratio"] + texture_bytes) * model["bytes_factor"]),
+        "seconds": a + b * source_vertices + c * vertices,
+    }
@@ -17,11 +17,59 @@ USAGE :
 -------
 /Applications/Blender.app/Contents/MacOS/Blender hemi_engine.blend --background --python scripts/export_states.py
 
+ANIMATION DE DÉMONTAGE (--disassembly) : un seul GLB où les pièces
+exclues par chaque état s'écartent successivement (direction saisie dans
+la propriété "explode_dir" de l'objet, sinon depuis le centre du moteur).
+Les temps de chaque état sont écrits dans un fichier JSON voisin, lu par
+app.js pour passer d'un état à l'autre sans changer de modèle.
+
+DÉCOUPAGE SPATIAL (--chunk) : les gros meshes sont découpés en blocs
+compacts ("<nom>_export_chunkN"), chacun avec ses bornes, pour que le
+viewer ne dessine que les blocs visibles en vue rapprochée.
+
+PLANIFICATION (--dry-run) : aucune copie ni export. Affiche, par état,
+les objets exportés, les ratios, les vertices/triangles prévus, la taille
+du GLB (avec et sans Draco) et la durée, selon un modèle de coût recalé
+à chaque export réel (benchmarks/export_calibration.json, voir
+export_planner.py).
+
+CHARGEMENT SÉLECTIF (scène vide, seuls les objets exportés sont chargés) :
+/Applications/Blender.app/Contents/MacOS/Blender --background --factory-startup \
+  --python scripts/export_states.py -- --source hemi_engine.blend
+
 ===============================================================================
 """
 
+import argparse
 import bpy
+import json
+import math
 import os
+import sys
+import time
+
+import numpy as np
+from mathutils import Matrix, Vector
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+if SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, SCRIPTS_DIR)
+
+import curve_tessellation
+import export_planner
+import mesh_cleanup
+
+try:
+    import resource
+except ImportError:
+    # Module indisponible sous Windows
+    resource = None
+
+try:
+    import psutil
+except ImportError:
+    # Optionnel : RSS courant hors Linux
+    psutil = None
 
 # =============================================================================
 # CONFIGURATION DES ÉTATS
@@ -57,13 +105,62 @@ GLOBAL_CONFIG = {
         "Plane",
         "Camera",
         "Lamp", "Lamp.001", "Lamp.002",
-        "engine.009",  # Mesh vide
-        "BezierCurve",
     ],
     "target_vertices": 65000,
+    "target_vertices_min": 50000,
+    "target_vertices_max": 80000,
     "decimation_threshold": 500,
     "export_scale": 0.05,
     "temp_collection_name": "__EXPORT_TEMP__",
+    # Nettoyage des copies avant décimation (doublons, faces dégénérées,
+    # arêtes et vertices isolés) ; les meshes vides sont ignorés d'office
+    "clean_meshes": True,
+    "merge_distance": 1e-5,            # Distance de fusion des doublons
+    "min_face_area": 1e-12,            # Aire sous laquelle une face est dégénérée
+    # Tessellation adaptative des courbes (câbles BezierCurve) :
+    # résolution selon la courbure, section selon un budget de vertices
+    "tessellate_curves": True,
+    "curve_vertex_budget": 400,        # Vertices max par objet courbe
+    "curve_max_segment_angle": 12.0,   # Degrés de courbure par segment
+    "curve_max_resolution": 12,
+    # Découpage spatial des gros meshes (frustum culling en vue rapprochée)
+    "chunk_meshes": False,
+    "chunk_threshold": 20000,          # Vertices au-delà desquels un mesh est découpé
+    "chunk_target_vertices": 8000,     # Taille visée d'un bloc
+    "max_chunks": 8,                   # Blocs max par objet (draw calls)
+    # Animation de démontage (un seul GLB pour tous les états)
+    "disassembly_animation": False,
+    "disassembly_filename": "hemi_disassembly.glb",
+    "disassembly_frames": 30,          # Durée d'une transition entre états
+    "disassembly_distance": 0.6,       # Écartement, relatif à la taille du moteur
+    "disassembly_tolerance": 0.01,     # Erreur max de la simplification (relative)
+    # Modèle de coût de la planification (--dry-run), recalé sur les
+    # exports réels enregistrés dans calibration_file (relatif au .blend)
+    "calibration_file": "benchmarks/export_calibration.json",
+    "calibration_samples": 50,
+    "cost_model": {
+        "seconds": [1.0, 2e-5, 1e-5],   # fixe, par vertex source, par vertex exporté
+        "bytes_factor": 1.0,            # octets réels / octets estimés
+        "vertex_split": 1.3,            # vertices glTF / vertices Blender (coutures)
+        "draco_ratio": 0.15,            # géométrie compressée / non compressée
+    },
+    # Mode sans copie : modifiers non destructifs sur les originaux,
+    # échelle portée par un objet racine, évaluée à l'export
+    "copy_free": False,
+    "root_name": "hemi_root",
+    # Fichier source chargé sélectivement (None = fichier .blend ouvert)
+    "source_blend": None,
+    # Types de données suivis pour vérifier le retour à l'état initial
+    "tracked_datablocks": [
+        "objects", "meshes", "curves", "materials", "images",
+        "textures", "node_groups", "collections", "actions",
+    ],
+    # Types de données créés par l'export et supprimés au nettoyage
+    # (seulement ceux apparus depuis create_temp_collection et sans utilisateur)
+    "purged_datablocks": [
+        "meshes", "curves", "materials", "images",
+        "textures", "node_groups", "actions",
+    ],
 }
 
 
@@ -82,6 +179,61 @@ def log(message, level="INFO"):
     print(f"{prefix} {message}")
 
 
+def get_script_args():
+    """Retourne les arguments placés après '--' (convention Blender)."""
+    if "--" in sys.argv:
+        return sys.argv[sys.argv.index("--") + 1:]
+    return []
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Export multi-états GLB")
+    parser.add_argument(
+        "--source",
+        help="Fichier .blend à charger sélectivement dans une scène vide",
+    )
+    parser.add_argument(
+        "--states-config",
+        help="Fichier JSON remplaçant STATES_CONFIG",
+    )
+    parser.add_argument(
+        "--output-dir",
+        help="Dossier de sortie (remplace GLOBAL_CONFIG['output_dir'])",
+    )
+    parser.add_argument(
+        "--copy-free", action="store_true",
+        help="Export sans copie des meshes (modifiers évalués à l'export)",
+    )
+    parser.add_argument(
+        "--chunk", action="store_true",
+        help="Découper les gros meshes en blocs spatiaux (mode avec copies)",
+    )
+    parser.add_argument(
+        "--disassembly", action="store_true",
+        help="Exporter aussi un GLB unique animé (démontage état par état)",
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true",
+        help="Planifier sans exporter (objets, ratios, vertices, taille, durée)",
+    )
+    parser.add_argument(
+        "--summary",
+        help="Fichier JSON de synthèse (états, fichiers, tailles)",
+    )
+    return parser.parse_args(get_script_args())
+
+
+def get_blend_dir():
+    """Dossier de référence pour les sorties (fichier source ou ouvert)."""
+    blend_path = GLOBAL_CONFIG["source_blend"] or bpy.data.filepath
+    return os.path.dirname(os.path.abspath(blend_path)) if blend_path else os.getcwd()
+
+
+def get_output_path(state_config):
+    output_dir = os.path.join(get_blend_dir(), GLOBAL_CONFIG["output_dir"])
+    return os.path.join(output_dir, state_config["filename"])
+
+
 def count_vertices(objects):
     total = 0
     for obj in objects:
@@ -90,6 +242,59 @@ def count_vertices(objects):
     return total
 
 
+def get_datablock_counts():
+    """Nombre de datablocks par type (voir GLOBAL_CONFIG['tracked_datablocks'])."""
+    return {
+        name: len(getattr(bpy.data, name))
+        for name in GLOBAL_CONFIG["tracked_datablocks"]
+    }
+
+
+def get_memory_usage():
+    """
+    Retourne (rss_mo, pic_rss_mo) du processus Blender.
+    RSS courant : /proc (Linux), sinon psutil s'il est installé, sinon le
+    pic (borne haute). Valeurs à None si rien ne permet de les lire.
+    """
+    rss_mb = None
+    peak_mb = None
+
+    try:
+        with open("/proc/self/statm") as f:
+            rss_pages = int(f.read().split()[1])
+        rss_mb = rss_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        if psutil is not None:
+            rss_mb = psutil.Process().memory_info().rss / (1024 * 1024)
+
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss est en octets sous macOS, en Ko sous Linux
+        peak_mb = peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+    if rss_mb is None:
+        rss_mb = peak_mb
+
+    return rss_mb, peak_mb
+
+
+def log_memory(label):
+    rss_mb, peak_mb = get_memory_usage()
+    rss = f"{rss_mb:.0f} Mo" if rss_mb is not None else "n/d"
+    peak = f"{peak_mb:.0f} Mo" if peak_mb is not None else "n/d"
+    log(f"Mémoire {label} : RSS {rss}, pic {peak}", "INFO")
+
+
+def count_evaluated_vertices(objects):
+    """Compte les vertices après évaluation des modifiers (mode sans copie)."""
+    depsgraph = bpy.context.evaluated_depsgraph_get()
+    total = 0
+    for obj in objects:
+        if obj.type == 'MESH' and obj.data:
+            total += len(obj.evaluated_get(depsgraph).data.vertices)
+    return total
+
+
 def get_exportable_objects(state_exclude_list):
     """Retourne les objets à exporter pour un état donné."""
     exportable = []
@@ -98,6 +303,9 @@ def get_exportable_objects(state_exclude_list):
     for obj in bpy.data.objects:
         if obj.name in excluded:
             continue
+        if obj.type == 'MESH' and mesh_cleanup.is_empty_mesh(obj.data, GLOBAL_CONFIG):
+            log(f"Ignoré : {obj.name} (mesh vide ou dégénéré)", "WARN")
+            continue
         if obj.type in ['MESH', 'CURVE']:
             exportable.append(obj)
 
@@ -109,6 +317,10 @@ def calculate_decimation_ratios(objects, target_vertices):
     non_decimatable_vertices = 0
 
     for obj in objects:
+        if obj.type == 'CURVE' and GLOBAL_CONFIG["tessellate_curves"]:
+            # Les courbes ont leur propre budget et ne sont pas décimées
+            non_decimatable_vertices += count_curve_vertices(obj)
+            continue
         if obj.type != 'MESH' or not obj.data:
             continue
         v_count = len(obj.data.vertices)
@@ -140,11 +352,91 @@ def calculate_decimation_ratios(objects, target_vertices):
     return ratios
 
 
+# =============================================================================
+# NETTOYAGE DES MESHES
+# =============================================================================
+
+def prepare_copies(copies, ratios):
+    """
+    Nettoyage des copies puis ratios de décimation recalculés sur la
+    géométrie nettoyée (clés : noms des originaux).
+    """
+    if not GLOBAL_CONFIG["clean_meshes"]:
+        return ratios
+    mesh_cleanup.clean_copies(copies, GLOBAL_CONFIG)
+    copy_ratios = calculate_decimation_ratios(list(copies.values()), GLOBAL_CONFIG["target_vertices"])
+    return {name: copy_ratios.get(obj_copy.name, 1.0) for name, obj_copy in copies.items()}
+
+
+# =============================================================================
+# TESSELLATION ADAPTATIVE DES COURBES
+# =============================================================================
+
+def count_curve_vertices(obj):
+    """Vertices réels d'une courbe après tessellation (voir curve_tessellation)."""
+    return curve_tessellation.count_curve_vertices(obj, GLOBAL_CONFIG)
+
+
+# =============================================================================
+# CHARGEMENT SÉLECTIF
+# =============================================================================
+
+def get_required_object_names(available_names):
+    """Objets nécessaires à au moins un état (union des états)."""
+    required = []
+    for name in available_names:
+        if name in GLOBAL_CONFIG["exclude_always"]:
+            continue
+        if all(name in cfg["exclude_objects"] for cfg in STATES_CONFIG.values()):
+            continue
+        required.append(name)
+    return required
+
+
+def load_objects_selectively(blend_path):
+    """
+    Ouvre une scène vide et n'ajoute que les objets requis par les états.
+    Les meshes, matériaux et images sont tirés par dépendance : ceux des
+    objets exclus ne sont jamais chargés.
+    """
+    start = time.perf_counter()
+    bpy.ops.wm.read_factory_settings(use_empty=True)
+
+    with bpy.data.libraries.load(blend_path, link=False) as (data_from, data_to):
+        data_to.objects = get_required_object_names(data_from.objects)
+
+    scene_collection = bpy.context.scene.collection
+    loaded = 0
+    for obj in data_to.objects:
+        if obj is None:
+            continue
+        scene_collection.objects.link(obj)
+        loaded += 1
+
+    log(f"Chargement sélectif : {loaded} objets, {len(bpy.data.meshes)} meshes, "
+        f"{len(bpy.data.materials)} matériaux, {len(bpy.data.images)} images "
+        f"({time.perf_counter() - start:.2f} s)", "OK")
+    return loaded
+
+
 # =============================================================================
 # FONCTIONS D'EXPORT
 # =============================================================================
 
+# Datablocks présents avant l'export (pointeurs par type), relevés par
+# create_temp_collection : le nettoyage ne supprime que les autres
+_datablock_snapshot = None
+
+
+def snapshot_datablocks():
+    return {
+        name: {datablock.as_pointer() for datablock in getattr(bpy.data, name)}
+        for name in GLOBAL_CONFIG["purged_datablocks"]
+    }
+
+
 def create_temp_collection():
+    global _datablock_snapshot
     temp_name = GLOBAL_CONFIG["temp_collection_name"]
 
     if temp_name in bpy.data.collections:
@@ -153,6 +445,9 @@ def create_temp_collection():
             bpy.data.objects.remove(obj, do_unlink=True)
         bpy.data.collections.remove(old_collection)
 
+    if _datablock_snapshot is None:
+        _datablock_snapshot = snapshot_datablocks()
+
     temp_collection = bpy.data.collections.new(temp_name)
     bpy.context.scene.collection.children.link(temp_collection)
     return temp_collection
@@ -190,6 +485,111 @@ def apply_decimation(copies, ratios):
         bpy.ops.object.modifier_apply(modifier="Decimate_Export")
 
 
+def kd_partition(centers, cluster_count):
+    """
+    Partition k-d des faces : le plus gros bloc est coupé à la médiane de
+    son axe le plus étendu, jusqu'à obtenir `cluster_count` blocs.
+    Retourne une liste de tableaux d'indices de faces.
+    """
+    clusters = [np.arange(len(centers))]
+    while len(clusters) < cluster_count:
+        largest = max(range(len(clusters)), key=lambda i: len(clusters[i]))
+        if len(clusters[largest]) < 2:
+            break
+        indices = clusters.pop(largest)
+        points = centers[indices]
+        axis = int(np.argmax(points.max(axis=0) - points.min(axis=0)))
+        order = np.argsort(points[:, axis], kind='stable')
+        half = len(indices) // 2
+        clusters += [indices[order[:half]], indices[order[half:]]]
+    return clusters
+
+
+def build_chunk(obj_copy, source, face_indices, name):
+    """
+    Copie de `obj_copy` ne gardant que les faces `face_indices`, construite
+    directement à partir des tableaux de `source` (voir
+    mesh_cleanup.read_mesh_arrays).
+    Les normales par coin d'origine sont conservées : pas de couture
+    d'ombrage le long des découpes.
+    """
+    face_indices = np.sort(face_indices)
+    loops, totals = mesh_cleanup.face_loops(
+        source["loop_start"], source["loop_total"], face_indices
+    )
+    mesh = mesh_cleanup.build_mesh(name, obj_copy.data.materials, source,
+                                   face_indices, loops, totals, source["loop_vertex"][loops])
+
+    chunk = obj_copy.copy()
+    chunk.data = mesh
+    chunk.name = name
+    return chunk
+
+
+def apply_modifiers(obj_copy):
+    """Remplace le mesh d'une copie par son mesh évalué, sans modifiers."""
+    depsgraph = bpy.context.evaluated_depsgraph_get()
+    evaluated = bpy.data.meshes.new_from_object(obj_copy.evaluated_get(depsgraph))
+    mesh = obj_copy.data
+    for modifier in list(obj_copy.modifiers):
+        obj_copy.modifiers.remove(modifier)
+    obj_copy.data = evaluated
+    name = mesh.name
+    if mesh.users == 0:
+        bpy.data.meshes.remove(mesh)
+    evaluated.name = name
+
+
+def chunk_large_meshes(copies, target_collection):
+    """
+    Remplace les copies de plus de GLOBAL_CONFIG["chunk_threshold"] vertices
+    (après modifiers) par des blocs spatialement compacts (matériaux
+    conservés, bornes propres à chaque bloc, au plus
+    GLOBAL_CONFIG["max_chunks"] blocs par objet). Les modifiers restants
+    sont appliqués avant le découpage : les blocs n'en ont plus. Les copies
+    avec groupes de vertices ou clés de forme ne sont pas découpées.
+    """
+    for original_name, obj_copy in list(copies.items()):
+        if obj_copy.type != 'MESH':
+            continue
+        mesh = obj_copy.data
+        if obj_copy.modifiers:
+            v_count = count_evaluated_vertices([obj_copy])
+        else:
+            v_count = len(mesh.vertices)
+        if v_count <= GLOBAL_CONFIG["chunk_threshold"] or len(mesh.polygons) < 2:
+            continue
+
+        cluster_count = min(
+            GLOBAL_CONFIG["max_chunks"],
+            math.ceil(v_count / GLOBAL_CONFIG["chunk_target_vertices"]),
+        )
+        if cluster_count < 2:
+            continue
+
+        blockers = mesh_cleanup.rebuild_blockers(obj_copy)
+        if blockers:
+            log(f"Non découpé : {original_name} ({', '.join(blockers)} à conserver)", "WARN")
+            continue
+        if obj_copy.modifiers:
+            # Évalués par bloc, Bevel, Mirror, Solidify... marqueraient les découpes
+            apply_modifiers(obj_copy)
+            mesh = obj_copy.data
+
+        source = mesh_cleanup.read_mesh_arrays(mesh)
+        clusters = kd_partition(source["centers"], cluster_count)
+
+        for index, face_indices in enumerate(clusters):
+            chunk = build_chunk(obj_copy, source, face_indices, f"{original_name}_export_chunk{index}")
+            target_collection.objects.link(chunk)
+            copies[f"{original_name}_chunk{index}"] = chunk
+
+        del copies[original_name]
+        bpy.data.objects.remove(obj_copy, do_unlink=True)
+        bpy.data.meshes.remove(mesh)
+        log(f"Découpé : {original_name} ({v_count:,} vertices) -> {len(clusters)} blocs", "INFO")
+
+
 def apply_scale(copies, scale_factor):
     if not copies:
         return
@@ -213,30 +613,48 @@ def apply_scale(copies, scale_factor):
     bpy.context.scene.tool_settings.transform_pivot_point = original_pivot
 
 
-def export_glb(copies, output_path):
+def export_glb(copies, output_path, animation=False, require_apply=False):
+    """
+    Exporte les objets de `copies` (copies, ou originaux en mode sans copie).
+    `animation` : exporte l'animation de la scène telle que saisie
+    (images clés conservées, sans rééchantillonnage).
+    `require_apply` : échoue si l'exporteur refuse export_apply (mode sans
+    copie : sans lui, les originaux partiraient non décimés).
+    """
     bpy.ops.object.select_all(action='DESELECT')
     for obj_copy in copies.values():
         obj_copy.select_set(True)
 
-    try:
-        bpy.ops.export_scene.gltf(
-            filepath=output_path,
-            use_selection=True,
-            export_format='GLB',
-            export_texcoords=True,
-            export_normals=True,
-            export_materials='EXPORT',
-            export_cameras=False,
-            export_lights=False,
-            export_apply=True
-        )
-    except TypeError:
-        bpy.ops.export_scene.gltf(
-            filepath=output_path,
-            use_selection=True,
-            export_format='GLB'
+    options = {
+        "use_selection": True,
+        "export_format": 'GLB',
+        "export_texcoords": True,
+        "export_normals": True,
+        "export_materials": 'EXPORT',
+        "export_cameras": False,
+        "export_lights": False,
+        "export_apply": True,
+    }
+    if animation:
+        options.update(
+            export_animations=True,
+            export_animation_mode='SCENE',
+            export_force_sampling=False,
+            export_frame_range=True,
         )
 
+    try:
+        bpy.ops.export_scene.gltf(filepath=output_path, **options)
+    except TypeError as e:
+        if require_apply:
+            log(f"Exporteur incompatible avec export_apply ({e}) : "
+                f"export sans copie impossible", "ERROR")
+            return False
+        fallback = {"use_selection": True, "export_format": 'GLB'}
+        if animation:
+            fallback.update(export_animations=True, export_force_sampling=False)
+        bpy.ops.export_scene.gltf(filepath=output_path, **fallback)
+
     if os.path.exists(output_path):
         file_size = os.path.getsize(output_path) / (1024 * 1024)
         log(f"Exporté : {output_path} ({file_size:.2f} Mo)", "OK")
@@ -244,24 +662,167 @@ def export_glb(copies, output_path):
     return False
 
 
+# =============================================================================
+# MODE SANS COPIE
+# =============================================================================
+
+def add_decimation_modifiers(objects, ratios):
+    """
+    Ajoute un modifier Decimate non appliqué sur les originaux.
+    Il est évalué par l'exporteur (export_apply=True) puis retiré.
+    """
+    for obj in objects:
+        if obj.type != 'MESH':
+            continue
+
+        ratio = ratios.get(obj.name, 1.0)
+        if ratio >= 0.99:
+            continue
+
+        decimate = obj.modifiers.new(name="Decimate_Export", type='DECIMATE')
+        decimate.decimate_type = 'COLLAPSE'
+        decimate.ratio = ratio
+
+
+def remove_decimation_modifiers(objects):
+    for obj in objects:
+        if obj.type != 'MESH':
+            continue
+        decimate = obj.modifiers.get("Decimate_Export")
+        if decimate:
+            obj.modifiers.remove(decimate)
+
+
+def attach_scale_root(objects, scale_factor, target_collection, saved_links):
+    """
+    Crée un objet racine à l'origine portant l'échelle d'export et y rattache
+    les objets de premier niveau en conservant leur placement relatif.
+    Chaque lien d'origine est ajouté à `saved_links` avant d'être modifié,
+    pour que detach_scale_root (appelé dans un finally) restaure aussi un
+    rattachement interrompu. Retourne la racine.
+    """
+    root = bpy.data.objects.new(GLOBAL_CONFIG["root_name"], None)
+    root.scale = (scale_factor, scale_factor, scale_factor)
+    target_collection.objects.link(root)
+
+    exported = set(objects)
+
+    for obj in objects:
+        if obj.parent in exported:
+            continue
+
+        saved_links.append((obj, obj.parent, obj.matrix_parent_inverse.copy()))
+        world = obj.matrix_world.copy()
+        obj.parent = root
+        # Monde final = échelle racine @ ancien monde
+        obj.matrix_parent_inverse = world @ obj.matrix_basis.inverted()
+
+    bpy.context.view_layer.update()
+    return root
+
+
+def detach_scale_root(saved_links):
+    """Restaure les parents d'origine (à faire avant de supprimer la racine)."""
+    for obj, parent, parent_inverse in saved_links:
+        obj.parent = parent
+        obj.matrix_parent_inverse = parent_inverse
+
+    bpy.context.view_layer.update()
+
+
+def export_state_copy_free(exportable, ratios, output_path):
+    """Exporte les originaux en évaluant décimation et échelle à l'export."""
+    temp_collection = create_temp_collection()
+    saved_links = []
+    saved_curves = []
+
+    try:
+        add_decimation_modifiers(exportable, ratios)
+        if GLOBAL_CONFIG["tessellate_curves"]:
+            # Réglages temporaires, restaurés après l'export
+            curve_tessellation.apply_object_tessellation(exportable, GLOBAL_CONFIG, saved_curves)
+        root = attach_scale_root(
+            exportable, GLOBAL_CONFIG["export_scale"], temp_collection, saved_links
+        )
+
+        log(f"Vertices évalués : {count_evaluated_vertices(exportable):,}", "INFO")
+
+        selection = {obj.name: obj for obj in exportable}
+        selection[root.name] = root
+
+        log_memory("avant export")
+        return export_glb(selection, output_path, require_apply=True)
+    finally:
+        detach_scale_root(saved_links)
+        remove_decimation_modifiers(exportable)
+        curve_tessellation.restore_object_tessellation(saved_curves)
+
+
+def remove_created_datablocks(snapshot):
+    """
+    Supprime les datablocks apparus depuis `snapshot` et sans utilisateur
+    (matériaux, images, etc. créés pendant l'export). Les orphelins déjà
+    présents avant l'export ne sont pas touchés. Plusieurs passes : retirer
+    un matériau peut libérer ses images et groupes de nodes.
+    """
+    removed = True
+    while removed:
+        removed = False
+        for name in GLOBAL_CONFIG["purged_datablocks"]:
+            collection = getattr(bpy.data, name)
+            created = [
+                datablock for datablock in collection
+                if datablock.users == 0 and datablock.as_pointer() not in snapshot[name]
+            ]
+            for datablock in created:
+                collection.remove(datablock)
+            removed = removed or bool(created)
+
+
 def cleanup_temp_collection():
+    """
+    Supprime la collection temporaire, les copies et leurs données, puis
+    les datablocks créés pendant l'export (voir remove_created_datablocks).
+    """
+    global _datablock_snapshot
     temp_name = GLOBAL_CONFIG["temp_collection_name"]
 
-    if temp_name not in bpy.data.collections:
-        return
-
-    temp_collection = bpy.data.collections[temp_name]
+    if temp_name in bpy.data.collections:
+        temp_collection = bpy.data.collections[temp_name]
 
-    for obj in list(temp_collection.objects):
-        if obj.data and obj.data.users == 1:
-            if obj.type == 'MESH':
-                bpy.data.meshes.remove(obj.data)
-            elif obj.type == 'CURVE':
-                bpy.data.curves.remove(obj.data)
-        else:
+        for obj in list(temp_collection.objects):
+            data = obj.data
             bpy.data.objects.remove(obj, do_unlink=True)
-
-    bpy.data.collections.remove(temp_collection)
+            if data is None or data.users > 0:
+                continue
+            if isinstance(data, bpy.types.Mesh):
+                bpy.data.meshes.remove(data)
+            elif isinstance(data, bpy.types.Curve):
+                bpy.data.curves.remove(data)
+
+        bpy.data.collections.remove(temp_collection)
+
+    if _datablock_snapshot is not None:
+        remove_created_datablocks(_datablock_snapshot)
+        _datablock_snapshot = None
+
+
+def check_datablock_baseline(baseline):
+    """
+    Signale les types de datablocks qui ne sont pas revenus à leur niveau
+    initial : au-dessus (non libérés) ou en dessous (données perdues).
+    """
+    changed = {
+        name: (baseline[name], count)
+        for name, count in get_datablock_counts().items()
+        if count != baseline[name]
+    }
+    for name, (before, after) in changed.items():
+        if after > before:
+            log(f"Datablocks '{name}' non libérés : {before} -> {after}", "WARN")
+        else:
+            log(f"Datablocks '{name}' perdus : {before} -> {after}", "WARN")
+    return not changed
 
 
 def hide_objects(objects):
@@ -280,6 +841,46 @@ def show_objects(objects):
 # EXPORT D'UN ÉTAT
 # =============================================================================
 
+def export_state_with_copies(exportable, ratios, output_path):
+    """Exporte des copies décimées et mises à l'échelle (originaux intacts)."""
+    vertices_before = count_vertices(exportable)
+
+    # Collection temporaire
+    temp_collection = create_temp_collection()
+
+    # Dupliquer
+    copies = duplicate_objects(exportable, temp_collection)
+
+    # Nettoyer, puis décimer selon la géométrie nettoyée
+    ratios = prepare_copies(copies, ratios)
+    apply_decimation(copies, ratios)
+
+    # Courbes -> meshes (tessellation adaptative)
+    if GLOBAL_CONFIG["tessellate_curves"]:
+        curve_tessellation.convert_curves_to_meshes(copies, temp_collection, GLOBAL_CONFIG)
+
+    # Découpage spatial des gros meshes
+    if GLOBAL_CONFIG["chunk_meshes"]:
+        chunk_large_meshes(copies, temp_collection)
+
+    vertices_after = count_vertices(list(copies.values()))
+    log(f"Vertices : {vertices_before:,} -> {vertices_after:,}", "INFO")
+
+    # Échelle
+    apply_scale(copies, GLOBAL_CONFIG["export_scale"])
+
+    # Cacher originaux
+    hide_objects(exportable)
+
+    try:
+        # Export
+        log_memory("avant export")
+        return export_glb(copies, output_path)
+    finally:
+        # Restaurer
+        show_objects(exportable)
+
+
 def export_state(state_name, state_config):
     """Exporte un état pédagogique en GLB."""
 
@@ -297,44 +898,312 @@ def export_state(state_name, state_config):
 
     log(f"Objets à exporter : {len(exportable)}", "OK")
 
-    vertices_before = count_vertices(exportable)
-
     # Calcul décimation
     ratios = calculate_decimation_ratios(exportable, GLOBAL_CONFIG["target_vertices"])
 
-    # Collection temporaire
-    temp_collection = create_temp_collection()
+    output_path = get_output_path(state_config)
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
 
-    # Dupliquer
-    copies = duplicate_objects(exportable, temp_collection)
+    baseline = get_datablock_counts()
+    plan = export_planner.plan_export(exportable, ratios, GLOBAL_CONFIG["cost_model"],
+                                      count_curve_vertices)
+    start = time.perf_counter()
 
-    # Décimer
-    apply_decimation(copies, ratios)
+    try:
+        if GLOBAL_CONFIG["copy_free"]:
+            success = export_state_copy_free(exportable, ratios, output_path)
+        else:
+            success = export_state_with_copies(exportable, ratios, output_path)
+    finally:
+        # Nettoyer, même en cas d'erreur
+        cleanup_temp_collection()
+
+    check_datablock_baseline(baseline)
+    log_memory("après nettoyage")
+
+    # Mesure réelle pour recaler le modèle de coût de --dry-run
+    if success:
+        export_planner.record_calibration_sample(get_calibration_path(), {
+            "source_vertices": plan["source_vertices"],
+            "vertices": plan["vertices"],
+            "raw_bytes": plan["raw_bytes"],
+            "bytes": os.path.getsize(output_path),
+            "seconds": time.perf_counter() - start,
+        }, GLOBAL_CONFIG["calibration_samples"])
 
-    vertices_after = count_vertices(list(copies.values()))
-    log(f"Vertices : {vertices_before:,} -> {vertices_after:,}", "INFO")
+    return success
 
-    # Échelle
-    apply_scale(copies, GLOBAL_CONFIG["export_scale"])
 
-    # Cacher originaux
-    hide_objects(exportable)
+# =============================================================================
+# PLANIFICATION (--dry-run)
+# =============================================================================
 
-    # Export
-    blend_dir = os.path.dirname(bpy.data.filepath) or os.getcwd()
-    output_dir = os.path.join(blend_dir, GLOBAL_CONFIG["output_dir"])
-    os.makedirs(output_dir, exist_ok=True)
+def get_calibration_path():
+    return os.path.join(get_blend_dir(), GLOBAL_CONFIG["calibration_file"])
 
-    output_path = os.path.join(output_dir, state_config["filename"])
-    success = export_glb(copies, output_path)
 
-    # Restaurer
-    show_objects(exportable)
+def check_vertex_targets(vertices):
+    """Message d'avertissement si `vertices` sort de [min, max], sinon None."""
+    if vertices < GLOBAL_CONFIG["target_vertices_min"]:
+        return f"sous la cible minimale ({GLOBAL_CONFIG['target_vertices_min']:,})"
+    if vertices > GLOBAL_CONFIG["target_vertices_max"]:
+        return f"au-dessus de la cible maximale ({GLOBAL_CONFIG['target_vertices_max']:,})"
+    return None
 
-    # Nettoyer
-    cleanup_temp_collection()
 
-    return success
+def dry_run():
+    """Affiche le plan d'export de chaque état, sans rien modifier."""
+    calibration = export_planner.load_calibration(get_calibration_path())
+    model = export_planner.fit_cost_model(calibration["samples"], GLOBAL_CONFIG["cost_model"])
+    log(f"Modèle de coût : {model['samples']} mesure(s) d'export réel", "INFO")
+
+    plans = {}
+    for state_name, state_config in STATES_CONFIG.items():
+        exportable = get_exportable_objects(state_config["exclude_objects"])
+        ratios = calculate_decimation_ratios(exportable, GLOBAL_CONFIG["target_vertices"])
+        plan = export_planner.plan_export(exportable, ratios, model, count_curve_vertices)
+        plans[state_name] = plan
+
+        print("\n" + "-" * 60)
+        print(f"{state_name} -> {state_config['filename']}")
+        print("-" * 60)
+        for obj in plan["objects"]:
+            print(f"  {obj['name']:<20} ratio {obj['ratio']:>5.0%}  "
+                  f"{obj['source_vertices']:>9,} -> {obj['vertices']:>8,} vertices, "
+                  f"{obj['triangles']:>8,} triangles")
+        print(f"  Vertices : {plan['source_vertices']:,} -> {plan['vertices']:,} "
+              f"({plan['triangles']:,} triangles)")
+        print(f"  Taille : {plan['bytes'] / (1024 * 1024):.2f} Mo "
+              f"(Draco : {plan['draco_bytes'] / (1024 * 1024):.2f} Mo)")
+        print(f"  Durée estimée : {plan['seconds']:.1f} s")
+
+        warning = check_vertex_targets(plan["vertices"])
+        if warning:
+            log(f"{state_name} : {warning}", "WARN")
+
+    return plans
+
+
+# =============================================================================
+# ANIMATION DE DÉMONTAGE
+# =============================================================================
+
+def disassembly_steps():
+    """
+    États triés du plus complet au plus démonté, avec l'image de chacun et
+    les objets qui disparaissent en y arrivant : [(nom, image, objets)].
+    """
+    ordered = sorted(STATES_CONFIG, key=lambda name: len(STATES_CONFIG[name]["exclude_objects"]))
+    steps = []
+    previous = set(STATES_CONFIG[ordered[0]]["exclude_objects"])
+    for index, state_name in enumerate(ordered):
+        excluded = set(STATES_CONFIG[state_name]["exclude_objects"])
+        steps.append((state_name, index * GLOBAL_CONFIG["disassembly_frames"], sorted(excluded - previous)))
+        previous |= excluded
+    return steps
+
+
+def world_bounds_center(objects):
+    """Centre et diagonale de la boîte englobante monde de `objects`."""
+    corners = [obj.matrix_world @ Vector(corner) for obj in objects for corner in obj.bound_box]
+    low = Vector([min(c[i] for c in corners) for i in range(3)])
+    high = Vector([max(c[i] for c in corners) for i in range(3)])
+    return (low + high) / 2, (high - low).length
+
+
+def explode_direction(obj, model_center):
+    """Direction saisie ("explode_dir") ou radiale depuis le centre du moteur."""
+    if "explode_dir" in obj.keys():
+        direction = Vector(obj["explode_dir"])
+    else:
+        direction = world_bounds_center([obj])[0] - model_center
+    return direction.normalized() if direction.length > 1e-6 else Vector((0.0, 0.0, 1.0))
+
+
+def simplify_keyframes(points, tolerance):
+    """
+    Ramer-Douglas-Peucker sur une trajectoire échantillonnée à chaque image :
+    garde les images nécessaires pour que l'interpolation linéaire reste à
+    moins de `tolerance` de la trajectoire. Retourne les indices conservés.
+    """
+    points = np.asarray(points, dtype=np.float64)
+    keep = {0, len(points) - 1}
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        t = np.linspace(0.0, 1.0, last - first + 1)[1:-1, None]
+        interpolated = points[first] + t * (points[last] - points[first])
+        errors = np.linalg.norm(points[first + 1:last] - interpolated, axis=1)
+        worst = int(np.argmax(errors))
+        if errors[worst] > tolerance:
+            split = first + 1 + worst
+            keep.add(split)
+            stack += [(first, split), (split, last)]
+    return sorted(keep)
+
+
+def link_copy_hierarchy(copies):
+    """
+    Rattache chaque copie à la copie de son parent d'origine (placement
+    monde conservé) : les enfants d'une pièce démontée la suivent. Un
+    parent découpé en blocs est représenté par son premier bloc.
+    """
+    for obj_copy in copies.values():
+        parent = obj_copy.parent
+        if parent is None:
+            continue
+        parent_copy = copies.get(parent.name) or copies.get(f"{parent.name}_chunk0")
+        if parent_copy is None or parent_copy is obj_copy:
+            continue
+
+        world = obj_copy.matrix_world.copy()
+        obj_copy.parent = parent_copy
+        obj_copy.matrix_parent_inverse = (
+            parent_copy.matrix_world.inverted() @ world @ obj_copy.matrix_basis.inverted()
+        )
+
+    bpy.context.view_layer.update()
+
+
+def animate_disassembly(copies, directions, steps, distance):
+    """
+    Ajoute à chaque copie d'un objet démonté un déplacement adouci entre
+    l'état précédent et l'état où il disparaît. Les déplacements sont en
+    coordonnées monde (convertis dans le repère du parent) ; une copie dont
+    un ancêtre part à la même étape le suit sans déplacement propre.
+    Retourne le nombre d'images clés.
+    """
+    frames = GLOBAL_CONFIG["disassembly_frames"]
+    tolerance = GLOBAL_CONFIG["disassembly_tolerance"] * distance
+    edit_prefs = bpy.context.preferences.edit
+    saved_interpolation = edit_prefs.keyframe_new_interpolation_type
+    edit_prefs.keyframe_new_interpolation_type = 'LINEAR'
+
+    keyframe_count = 0
+    try:
+        for _, end_frame, leaving in steps:
+            start_frame = end_frame - frames
+            t = np.linspace(0.0, 1.0, frames + 1)
+            ease = t * t * (3 - 2 * t)
+
+            moving = {
+                name: [obj_copy for key, obj_copy in copies.items()
+                       if key == name or key.startswith(name + "_chunk")]
+                for name in leaving
+            }
+            leaving_copies = {obj_copy for group in moving.values() for obj_copy in group}
+
+            for name in leaving:
+                offsets = ease[:, None] * np.array(directions[name]) * distance
+                keys = simplify_keyframes(offsets, tolerance)
+                for obj_copy in moving[name]:
+                    ancestor = obj_copy.parent
+                    while ancestor is not None and ancestor not in leaving_copies:
+                        ancestor = ancestor.parent
+                    if ancestor is not None:
+                        continue
+
+                    # Monde -> repère dans lequel s'exprime location
+                    to_local = Matrix.Identity(3)
+                    if obj_copy.parent is not None:
+                        frame = obj_copy.parent.matrix_world @ obj_copy.matrix_parent_inverse
+                        to_local = frame.to_3x3().inverted()
+
+                    origin = obj_copy.location.copy()
+                    for index in keys:
+                        obj_copy.location = origin + to_local @ Vector(offsets[index])
+                        obj_copy.keyframe_insert("location", frame=start_frame + index)
+                    keyframe_count += len(keys)
+                log(f"  {name} : {len(keys)}/{frames + 1} images clés", "INFO")
+    finally:
+        edit_prefs.keyframe_new_interpolation_type = saved_interpolation
+
+    return keyframe_count
+
+
+def export_disassembly(output_path):
+    """
+    Exporte un seul GLB contenant toutes les pièces et l'animation de
+    démontage, puis le fichier JSON des temps de chaque état.
+    """
+    log(f"\n{'='*50}", "INFO")
+    log("EXPORT ANIMATION DE DÉMONTAGE", "STEP")
+    log(f"{'='*50}", "INFO")
+
+    steps = disassembly_steps()
+    exportable = get_exportable_objects(STATES_CONFIG[steps[0][0]]["exclude_objects"])
+    if not exportable or len(steps) < 2:
+        log("Rien à animer", "ERROR")
+        return False
+
+    model_center, model_size = world_bounds_center(exportable)
+    by_name = {obj.name: obj for obj in exportable}
+    directions = {
+        name: explode_direction(by_name[name], model_center)
+        for _, _, leaving in steps for name in leaving if name in by_name
+    }
+    steps = [(state, frame, [n for n in leaving if n in by_name]) for state, frame, leaving in steps]
+
+    ratios = calculate_decimation_ratios(exportable, GLOBAL_CONFIG["target_vertices"])
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+
+    scene = bpy.context.scene
+    saved_range = (scene.frame_start, scene.frame_end, scene.frame_current)
+    baseline = get_datablock_counts()
+
+    try:
+        temp_collection = create_temp_collection()
+        copies = duplicate_objects(exportable, temp_collection)
+        ratios = prepare_copies(copies, ratios)
+        apply_decimation(copies, ratios)
+        if GLOBAL_CONFIG["tessellate_curves"]:
+            curve_tessellation.convert_curves_to_meshes(copies, temp_collection, GLOBAL_CONFIG)
+        if GLOBAL_CONFIG["chunk_meshes"]:
+            chunk_large_meshes(copies, temp_collection)
+        apply_scale(copies, GLOBAL_CONFIG["export_scale"])
+        link_copy_hierarchy(copies)
+
+        distance = GLOBAL_CONFIG["disassembly_distance"] * model_size * GLOBAL_CONFIG["export_scale"]
+        keyframes = animate_disassembly(copies, directions, steps, distance)
+
+        scene.frame_start = 0
+        scene.frame_end = steps[-1][1]
+        hide_objects(exportable)
+        try:
+            success = export_glb(copies, output_path, animation=True)
+        finally:
+            show_objects(exportable)
+    finally:
+        scene.frame_start, scene.frame_end = saved_range[0], saved_range[1]
+        scene.frame_set(saved_range[2])
+        cleanup_temp_collection()
+
+    check_datablock_baseline(baseline)
+    if not success:
+        return False
+
+    fps = scene.render.fps / scene.render.fps_base
+    manifest = {
+        "model": os.path.basename(output_path),
+        "fps": fps,
+        "states": [
+            {
+                "name": state_name,
+                "filename": STATES_CONFIG[state_name]["filename"],
+                "frame": frame,
+                "time": frame / fps,
+            }
+            for state_name, frame, _ in steps
+        ],
+    }
+    manifest_path = os.path.splitext(output_path)[0] + ".json"
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+
+    log(f"Animation : {keyframes} images clés -> {manifest_path}", "OK")
+    return True
 
 
 # =============================================================================
@@ -346,24 +1215,106 @@ def main():
     print("EXPORT MULTI-ÉTATS - MOTEUR HEMI")
     print("=" * 60)
 
-    if not bpy.data.filepath:
+    args = parse_args()
+
+    if args.states_config:
+        with open(args.states_config, encoding='utf-8') as f:
+            states = json.load(f)
+        STATES_CONFIG.clear()
+        STATES_CONFIG.update(states)
+        log(f"Configuration des états : {args.states_config}", "INFO")
+
+    if args.output_dir:
+        GLOBAL_CONFIG["output_dir"] = args.output_dir
+
+    if args.copy_free:
+        GLOBAL_CONFIG["copy_free"] = True
+        log("Mode sans copie : décimation et échelle évaluées à l'export", "INFO")
+
+    if args.chunk:
+        GLOBAL_CONFIG["chunk_meshes"] = True
+
+    if args.disassembly:
+        GLOBAL_CONFIG["disassembly_animation"] = True
+
+    if GLOBAL_CONFIG["copy_free"] and GLOBAL_CONFIG["chunk_meshes"]:
+        # Le découpage crée des meshes : seule l'animation (sur copies) en profite
+        if GLOBAL_CONFIG["disassembly_animation"]:
+            log("Découpage spatial limité à l'animation de démontage en mode sans copie", "WARN")
+        else:
+            log("Découpage spatial ignoré en mode sans copie (il crée des meshes)", "WARN")
+            GLOBAL_CONFIG["chunk_meshes"] = False
+
+    if args.source:
+        if not os.path.exists(args.source):
+            log(f"Fichier source introuvable : {args.source}", "ERROR")
+            return False
+        GLOBAL_CONFIG["source_blend"] = os.path.abspath(args.source)
+        load_objects_selectively(GLOBAL_CONFIG["source_blend"])
+    elif not bpy.data.filepath:
         log("Le fichier .blend doit être sauvegardé", "ERROR")
-        return
+        return False
+
+    if args.dry_run:
+        dry_run()
+        print("\n" + "=" * 60)
+        print("PLANIFICATION TERMINÉE (aucun fichier écrit)")
+        print("=" * 60 + "\n")
+        return True
 
     success_count = 0
+    summary = []
 
     for state_name, state_config in STATES_CONFIG.items():
+        success = False
         try:
-            if export_state(state_name, state_config):
-                success_count += 1
+            success = export_state(state_name, state_config)
         except Exception as e:
             log(f"Erreur état {state_name}: {e}", "ERROR")
             cleanup_temp_collection()
 
+        output_path = get_output_path(state_config)
+        summary.append({
+            "state": state_name,
+            "success": bool(success),
+            "output": output_path,
+            "bytes": os.path.getsize(output_path) if success else 0,
+        })
+        if success:
+            success_count += 1
+
+    disassembly_ok = True
+    if GLOBAL_CONFIG["disassembly_animation"]:
+        output_path = os.path.join(get_blend_dir(), GLOBAL_CONFIG["output_dir"],
+                                   GLOBAL_CONFIG["disassembly_filename"])
+        try:
+            disassembly_ok = export_disassembly(output_path)
+        except Exception as e:
+            log(f"Erreur animation de démontage : {e}", "ERROR")
+            cleanup_temp_collection()
+            disassembly_ok = False
+        summary.append({
+            "state": "disassembly",
+            "success": bool(disassembly_ok),
+            "output": output_path,
+            "bytes": os.path.getsize(output_path) if disassembly_ok else 0,
+        })
+
+    log_memory("fin d'export")
+
+    if args.summary:
+        with open(args.summary, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2, ensure_ascii=False)
+
     print("\n" + "=" * 60)
     print(f"EXPORT TERMINÉ : {success_count}/{len(STATES_CONFIG)} états")
     print("=" * 60 + "\n")
 
+    return success_count == len(STATES_CONFIG) and disassembly_ok
+
 
 if __name__ == "__main__":
-    main()
+    ok = main()
+    # Code de sortie exploitable par les scripts de lot (mode --background)
+    if bpy.app.background:
+        sys.exit(0 if ok else 1)
@@ -0,0 +1,319 @@
+"""
+===============================================================================
+WORKER D'EXPORT PERSISTANT
+===============================================================================
+
+Projet     : AR Pédagogique - Moteur Hemi
+Fichier    : export_worker.py
+Sortie     : assets/models/hemi_state_*.glb (via export_states.py)
+
+PRINCIPE DE FONCTIONNEMENT :
+----------------------------
+1. Blender est lancé une seule fois et garde hemi_engine.blend chargé
+2. Le worker écoute sur un socket local (127.0.0.1 uniquement)
+3. Chaque ligne reçue est une requête JSON, chaque réponse une ligne JSON
+4. Le .blend n'est rechargé que si sa date de modification a changé
+5. Les réponses contiennent les résultats et les durées de chaque étape
+
+REQUÊTES ACCEPTÉES :
+--------------------
+{"action": "ping"}
+{"action": "export", "states": "A,C", "target_vertices": 40000}
+{"action": "analyze"}
+{"action": "reload"}
+{"action": "shutdown"}
+
+USAGE :
+-------
+# Démarrer le worker (reste actif)
+/Applications/Blender.app/Contents/MacOS/Blender hemi_engine.blend --background \
+  --python scripts/export_worker.py -- --port 8765
+
+# Envoyer une requête (Python standard, sans Blender)
+python3 scripts/export_worker.py --port 8765 \
+  --send '{"action": "export", "states": "A,C", "target_vertices": 40000}'
+
+===============================================================================
+"""
+
+import argparse
+import json
+import os
+import socket
+import sys
+import time
+
+try:
+    import bpy
+except ImportError:
+    # Mode client : exécuté hors de Blender
+    bpy = None
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+WORKER_CONFIG = {
+    "host": "127.0.0.1",
+    "port": 8765,
+    # Clés de GLOBAL_CONFIG modifiables par requête
+    "overridable_keys": [
+        "target_vertices",
+        "decimation_threshold",
+        "export_scale",
+        "output_dir",
+        "copy_free",
+        "chunk_meshes",
+    ],
+}
+
+
+# =============================================================================
+# FONCTIONS UTILITAIRES
+# =============================================================================
+
+def log(message, level="INFO"):
+    prefix = {
+        "INFO": "[INFO]",
+        "WARN": "[ATTENTION]",
+        "ERROR": "[ERREUR]",
+        "OK": "[OK]",
+        "STEP": ">>>"
+    }.get(level, "[INFO]")
+    print(f"{prefix} {message}", flush=True)
+
+
+def get_script_args():
+    """Retourne les arguments placés après '--' (convention Blender)."""
+    if "--" in sys.argv:
+        return sys.argv[sys.argv.index("--") + 1:]
+    if bpy is None:
+        return sys.argv[1:]
+    return []
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Worker d'export persistant")
+    parser.add_argument("--host", default=WORKER_CONFIG["host"])
+    parser.add_argument("--port", type=int, default=WORKER_CONFIG["port"])
+    parser.add_argument("--send", help="Requête JSON à envoyer (mode client)")
+    return parser.parse_args(get_script_args())
+
+
+def import_pipeline_modules():
+    """Importe export_states et analyze_blend depuis le dossier scripts/."""
+    scripts_dir = os.path.dirname(os.path.abspath(__file__))
+    if scripts_dir not in sys.path:
+        sys.path.insert(0, scripts_dir)
+
+    import export_states
+    import analyze_blend
+    return export_states, analyze_blend
+
+
+# =============================================================================
+# GESTION DU FICHIER .BLEND
+# =============================================================================
+
+class BlendState:
+    """Suit le fichier .blend chargé et sa date de modification."""
+
+    def __init__(self, filepath):
+        self.filepath = filepath
+        self.mtime = os.path.getmtime(filepath)
+
+    def reload_if_changed(self, force=False):
+        """Recharge le .blend si modifié sur disque. Retourne la durée (s) ou None."""
+        mtime = os.path.getmtime(self.filepath)
+        if not force and mtime == self.mtime:
+            return None
+
+        start = time.perf_counter()
+        bpy.ops.wm.open_mainfile(filepath=self.filepath)
+        self.mtime = mtime
+        duration = time.perf_counter() - start
+        log(f"Fichier rechargé : {self.filepath} ({duration:.2f} s)", "OK")
+        return duration
+
+
+# =============================================================================
+# TRAITEMENT DES REQUÊTES
+# =============================================================================
+
+def resolve_states(states_config, requested):
+    """
+    Résout une liste d'états demandés en clés de STATES_CONFIG.
+    Accepte les clés complètes ("state_b_no_blower") ou les lettres ("A,C").
+    """
+    if not requested:
+        return list(states_config.keys())
+
+    if isinstance(requested, str):
+        requested = [s.strip() for s in requested.split(",") if s.strip()]
+
+    resolved = []
+    for name in requested:
+        if name in states_config:
+            resolved.append(name)
+            continue
+        prefix = f"state_{name.lower()}_"
+        matches = [key for key in states_config if key.startswith(prefix)]
+        if not matches:
+            raise ValueError(f"État inconnu : {name}")
+        resolved.extend(matches)
+
+    return resolved
+
+
+def handle_export(request, export_states):
+    overrides = {
+        key: request[key]
+        for key in WORKER_CONFIG["overridable_keys"]
+        if key in request
+    }
+    state_names = resolve_states(export_states.STATES_CONFIG, request.get("states"))
+
+    # Surcharge temporaire de la configuration globale
+    saved_config = dict(export_states.GLOBAL_CONFIG)
+    export_states.GLOBAL_CONFIG.update(overrides)
+
+    results = []
+    try:
+        for state_name in state_names:
+            state_config = export_states.STATES_CONFIG[state_name]
+            output_path = export_states.get_output_path(state_config)
+
+            start = time.perf_counter()
+            try:
+                success = export_states.export_state(state_name, state_config)
+                error = None
+            except Exception as e:
+                export_states.cleanup_temp_collection()
+                success = False
+                error = str(e)
+
+            results.append({
+                "state": state_name,
+                "success": bool(success),
+                "error": error,
+                "output": output_path,
+                "bytes": os.path.getsize(output_path) if success else 0,
+                "duration_s": round(time.perf_counter() - start, 3),
+            })
+    finally:
+        export_states.GLOBAL_CONFIG.clear()
+        export_states.GLOBAL_CONFIG.update(saved_config)
+
+    return {"overrides": overrides, "states": results}
+
+
+def handle_analyze(analyze_blend):
+    report = analyze_blend.generate_report()
+    return {"statistiques": report["statistiques"]}
+
+
+def handle_request(request, blend_state, modules):
+    """Exécute une requête et retourne la réponse (dict sérialisable)."""
+    export_states, analyze_blend = modules
+    action = request.get("action")
+    start = time.perf_counter()
+    timings = {}
+
+    if action == "ping":
+        result = {"filepath": blend_state.filepath}
+    elif action == "shutdown":
+        result = {}
+    else:
+        reload_duration = blend_state.reload_if_changed(force=(action == "reload"))
+        if reload_duration is not None:
+            timings["reload_s"] = round(reload_duration, 3)
+
+        if action == "reload":
+            result = {"filepath": blend_state.filepath}
+        elif action == "export":
+            result = handle_export(request, export_states)
+        elif action == "analyze":
+            result = handle_analyze(analyze_blend)
+        else:
+            raise ValueError(f"Action inconnue : {action}")
+
+    timings["total_s"] = round(time.perf_counter() - start, 3)
+    return {"ok": True, "action": action, "result": result, "timings": timings}
+
+
+def serve(host, port):
+    """Boucle principale : une connexion, une ou plusieurs requêtes JSON."""
+    blend_state = BlendState(bpy.data.filepath)
+    modules = import_pipeline_modules()
+
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    server.bind((host, port))
+    server.listen(1)
+
+    log(f"Worker prêt sur {host}:{port} ({blend_state.filepath})", "OK")
+
+    running = True
+    while running:
+        conn, _ = server.accept()
+        with conn, conn.makefile("rw", encoding="utf-8") as stream:
+            for line in stream:
+                if not line.strip():
+                    continue
+                try:
+                    request = json.loads(line)
+                    log(f"Requête : {request}", "STEP")
+                    response = handle_request(request, blend_state, modules)
+                except Exception as e:
+                    log(f"Erreur requête : {e}", "ERROR")
+                    response = {"ok": False, "error": str(e)}
+
+                stream.write(json.dumps(response, ensure_ascii=False) + "\n")
+                stream.flush()
+
+                if response.get("action") == "shutdown":
+                    running = False
+                    break
+
+    server.close()
+    log("Worker arrêté", "OK")
+
+
+# =============================================================================
+# MODE CLIENT
+# =============================================================================
+
+def send_request(request, host=WORKER_CONFIG["host"], port=WORKER_CONFIG["port"]):
+    """Envoie une requête au worker et retourne la réponse décodée."""
+    with socket.create_connection((host, port)) as conn:
+        with conn.makefile("rw", encoding="utf-8") as stream:
+            stream.write(json.dumps(request) + "\n")
+            stream.flush()
+            return json.loads(stream.readline())
+
+
+# =============================================================================
+# MAIN
+# =============================================================================
+
+def main():
+    args = parse_args()
+
+    if bpy is None:
+        if not args.send:
+            print("Hors de Blender, utiliser --send '<requête JSON>'")
+            return 1
+        response = send_request(json.loads(args.send), args.host, args.port)
+        print(json.dumps(response, indent=2, ensure_ascii=False))
+        return 0 if response.get("ok") else 1
+
+    if not bpy.data.filepath:
+        log("Le fichier .blend doit être sauvegardé", "ERROR")
+        return 1
+
+    serve(args.host, args.port)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,434 @@
+"""
+===============================================================================
+DÉCIMATION GLB SANS BLENDER (QUADRIC ERROR METRICS, NUMPY)
+===============================================================================
+
+Projet     : AR Pédagogique - Moteur Hemi
+Fichier    : glb_decimate.py
+Sortie     : GLB simplifié (chemin donné en argument)
+
+PRINCIPE DE FONCTIONNEMENT :
+----------------------------
+1. Lit le GLB et extrait chaque primitive (triangles indexés)
+2. Calcule les quadriques d'erreur (Garland-Heckbert) par vertex
+3. Effondre les arêtes par passes : à chaque passe, un ensemble d'arêtes
+   indépendantes (aucun vertex partagé) parmi les moins coûteuses est
+   effondré d'un bloc, en opérations vectorisées
+4. Effondrement "demi-arête" : le vertex conservé garde ses UV et normales
+5. Les primitives sont traitées en parallèle (pool de processus)
+6. Écrit un nouveau GLB (buffer compacté)
+
+PRÉSERVATION :
+--------------
+- Coutures UV / normales : les vertices dupliqués à la même position
+  sont soudés en groupes ; les effondrements sont choisis entre groupes,
+  et une arête de couture n'est effondrée que si chaque vertex du groupe
+  source a un voisin dans le groupe cible (les deux côtés de la couture
+  bougent ensemble, sans fissure)
+- Bords (de la surface soudée) : verrouillés si CONFIG["lock_borders"]
+- Les effondrements qui retournent une face sont rejetés
+
+USAGE :
+-------
+python3 scripts/glb_decimate.py entree.glb sortie.glb --ratio 0.5
+
+Dépendance : NumPy. Les GLB compressés (Draco, meshopt) ne sont pas supportés.
+
+===============================================================================
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import glb_utils
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+CONFIG = {
+    # Part des vertices conservés par primitive
+    "ratio": 0.5,
+    # Les primitives sous ce seuil ne sont pas décimées
+    "decimation_threshold": 500,
+    # Verrouiller les vertices de bord (arêtes à une seule face)
+    "lock_borders": True,
+    # Tolérance de soudure des coutures (vertices à la même position)
+    "seam_tolerance": 1e-6,
+    # Part maximale des arêtes candidates effondrées par passe
+    "pass_fraction": 0.25,
+    "max_passes": 200,
+    # Cosinus minimal entre normales avant/après d'une face (rejet des retournements)
+    "min_normal_cosine": 0.2,
+    "workers": os.cpu_count() or 1,
+}
+
+
+# =============================================================================
+# FONCTIONS UTILITAIRES
+# =============================================================================
+
+def log(message, level="INFO"):
+    prefix = {
+        "INFO": "[INFO]",
+        "WARN": "[ATTENTION]",
+        "ERROR": "[ERREUR]",
+        "OK": "[OK]",
+        "STEP": ">>>"
+    }.get(level, "[INFO]")
+    print(f"{prefix} {message}", flush=True)
+
+
+def face_normals(positions, triangles):
+    """Normales non normalisées (norme = 2 x aire) des triangles."""
+    p0 = positions[triangles[:, 0]]
+    return np.cross(positions[triangles[:, 1]] - p0, positions[triangles[:, 2]] - p0)
+
+
+def compute_quadrics(positions, triangles):
+    """Quadrique 4x4 par vertex : somme des plans des faces, pondérés par l'aire."""
+    normals = face_normals(positions, triangles)
+    lengths = np.linalg.norm(normals, axis=1)
+    valid = lengths > 0
+
+    planes = np.zeros((len(triangles), 4))
+    planes[valid, :3] = normals[valid] / lengths[valid, None]
+    planes[:, 3] = -np.einsum("ij,ij->i", planes[:, :3], positions[triangles[:, 0]])
+
+    face_quadrics = np.einsum("fi,fj->fij", planes, planes) * (lengths / 2)[:, None, None]
+
+    quadrics = np.zeros((len(positions), 4, 4))
+    for corner in range(3):
+        np.add.at(quadrics, triangles[:, corner], face_quadrics)
+    return quadrics
+
+
+def unique_edges(triangles):
+    """Arêtes non orientées (E, 2) et nombre de faces par arête."""
+    edges = np.concatenate([triangles[:, [0, 1]], triangles[:, [1, 2]], triangles[:, [2, 0]]])
+    edges.sort(axis=1)
+    return np.unique(edges, axis=0, return_counts=True)
+
+
+def weld_positions(positions, seam_tolerance):
+    """
+    Groupes de vertices à la même position (coutures).
+    Retourne (groupe de chaque vertex, position de chaque groupe).
+    """
+    keys = np.round(positions / seam_tolerance).astype(np.int64)
+    _, group = np.unique(keys, axis=0, return_inverse=True)
+    group = group.ravel()
+    group_positions = np.zeros((group.max() + 1 if len(group) else 0, 3))
+    group_positions[group] = positions
+    return group, group_positions
+
+
+def find_locked_vertices(group_count, welded_triangles, lock_borders):
+    """Groupes non-manifold et éventuellement de bord (surface soudée)."""
+    locked = np.zeros(group_count, dtype=bool)
+
+    edges, face_counts = unique_edges(welded_triangles)
+    special = face_counts > 2
+    if lock_borders:
+        special |= face_counts == 1
+    locked[edges[special].ravel()] = True
+
+    return locked
+
+
+def follow_seams(triangles, group, src_groups, dst_groups):
+    """
+    Traduit les effondrements de groupes en effondrements de vertices :
+    chaque vertex d'un groupe source suit une arête vers un vertex du
+    groupe cible (même côté de la couture). Les groupes dont un vertex n'a
+    pas de tel voisin sont rejetés.
+    Retourne (groupes source, groupes cible, vertices source, vertices cible).
+    """
+    target = np.full(group.max() + 1, -1)
+    target[src_groups] = dst_groups
+
+    edges, _ = unique_edges(triangles)
+    a = np.concatenate([edges[:, 0], edges[:, 1]])
+    b = np.concatenate([edges[:, 1], edges[:, 0]])
+    follows = target[group[a]] == group[b]
+
+    vertex_dst = np.full(len(group), -1)
+    vertex_dst[a[follows]] = b[follows]
+
+    used = np.unique(triangles)
+    moving = used[target[group[used]] >= 0]
+    stranded = np.unique(group[moving[vertex_dst[moving] < 0]])
+
+    keep = ~np.isin(src_groups, stranded)
+    moving = moving[~np.isin(group[moving], stranded)]
+    return src_groups[keep], dst_groups[keep], moving, vertex_dst[moving]
+
+
+# =============================================================================
+# SIMPLIFICATION D'UNE PRIMITIVE
+# =============================================================================
+
+def select_collapses(positions, triangles, quadrics, locked, budget, pass_fraction):
+    """
+    Choisit un ensemble d'effondrements indépendants (src -> dst) parmi les
+    arêtes les moins coûteuses. Retourne (src, dst).
+    """
+    edges, _ = unique_edges(triangles)
+    a, b = edges[:, 0], edges[:, 1]
+
+    homogeneous = np.hstack([positions, np.ones((len(positions), 1))])
+    q_sum = quadrics[a] + quadrics[b]
+    cost_a_to_b = np.einsum("ei,eij,ej->e", homogeneous[b], q_sum, homogeneous[b])
+    cost_b_to_a = np.einsum("ei,eij,ej->e", homogeneous[a], q_sum, homogeneous[a])
+    cost_a_to_b[locked[a]] = np.inf
+    cost_b_to_a[locked[b]] = np.inf
+
+    a_to_b = cost_a_to_b <= cost_b_to_a
+    src = np.where(a_to_b, a, b)
+    dst = np.where(a_to_b, b, a)
+    cost = np.minimum(cost_a_to_b, cost_b_to_a)
+
+    candidates = np.isfinite(cost)
+    src, dst, cost = src[candidates], dst[candidates], cost[candidates]
+    if not len(cost):
+        return src, dst
+
+    limit = max(1, min(budget, int(len(cost) * pass_fraction)))
+    order = np.argsort(cost, kind="stable")[:limit]
+    src, dst = src[order], dst[order]
+
+    # Indépendance : une arête est retenue si elle est la moins chère
+    # parmi toutes les arêtes candidates touchant ses deux sommets
+    rank = np.arange(len(order))
+    best = np.full(len(positions), len(order))
+    np.minimum.at(best, src, rank)
+    np.minimum.at(best, dst, rank)
+    independent = (best[src] == rank) & (best[dst] == rank)
+
+    return src[independent], dst[independent]
+
+
+def reject_flips(positions, triangles, src, dst, min_cosine):
+    """Retire les effondrements qui retournent ou écrasent une face voisine."""
+    for _ in range(3):
+        remap = np.arange(len(positions))
+        remap[src] = dst
+        moved = np.isin(triangles, src).any(axis=1)
+
+        before = triangles[moved]
+        after = remap[before]
+        alive = (after[:, 0] != after[:, 1]) & (after[:, 1] != after[:, 2]) & (after[:, 2] != after[:, 0])
+
+        n_before = face_normals(positions, before[alive])
+        n_after = face_normals(positions, after[alive])
+        dot = np.einsum("ij,ij->i", n_before, n_after)
+        norms = np.linalg.norm(n_before, axis=1) * np.linalg.norm(n_after, axis=1)
+        bad = dot <= min_cosine * norms
+
+        if not bad.any():
+            break
+
+        culprits = np.unique(before[alive][bad])
+        keep = ~np.isin(src, culprits)
+        src, dst = src[keep], dst[keep]
+
+    return src, dst
+
+
+def simplify(positions, triangles, target_vertices, lock_borders=True,
+             seam_tolerance=1e-6, pass_fraction=0.25, max_passes=200, min_normal_cosine=0.2):
+    """
+    Simplifie un maillage triangulé par effondrement d'arêtes (QEM).
+    Les décisions sont prises sur la surface soudée (groupes de position),
+    puis appliquées à chaque vertex dupliqué d'une couture.
+    Retourne (triangles, vertices_conservés) : triangles réindexés sur les
+    vertices conservés, et index d'origine de ces vertices (pour les attributs).
+    """
+    positions = positions.astype(np.float64)
+    triangles = triangles.astype(np.int64)
+
+    group, group_positions = weld_positions(positions, seam_tolerance)
+    welded = group[triangles]
+    quadrics = compute_quadrics(group_positions, welded)
+    locked = find_locked_vertices(len(group_positions), welded, lock_borders)
+
+    for _ in range(max_passes):
+        vertex_count = len(np.unique(triangles))
+        if vertex_count <= target_vertices:
+            break
+
+        candidates, dst = select_collapses(
+            group_positions, welded, quadrics, locked, vertex_count - target_vertices, pass_fraction
+        )
+        if not len(candidates):
+            break
+        src, dst, vertex_src, vertex_dst = follow_seams(triangles, group, candidates, dst)
+        src, dst = reject_flips(group_positions, welded, src, dst, min_normal_cosine)
+        # Sources rejetées écartées des passes suivantes (sinon, étant les
+        # moins coûteuses, elles seraient choisies à nouveau indéfiniment)
+        locked[candidates[~np.isin(candidates, src)]] = True
+        if not len(src):
+            continue
+        flipped = ~np.isin(group[vertex_src], src)
+        vertex_src, vertex_dst = vertex_src[~flipped], vertex_dst[~flipped]
+
+        remap = np.arange(len(positions))
+        remap[vertex_src] = vertex_dst
+        np.add.at(quadrics, dst, quadrics[src])
+
+        # Faces dégénérées sur la surface soudée (y compris de part et
+        # d'autre d'une couture) supprimées
+        triangles = remap[triangles]
+        welded = group[triangles]
+        alive = (welded[:, 0] != welded[:, 1]) & (welded[:, 1] != welded[:, 2]) \
+            & (welded[:, 2] != welded[:, 0])
+        triangles, welded = triangles[alive], welded[alive]
+
+    kept, triangles = np.unique(triangles, return_inverse=True)
+    return triangles.reshape(-1, 3), kept
+
+
+def simplify_task(task):
+    """Point d'entrée du pool de processus (une primitive)."""
+    key, positions, triangles, target, options = task
+    start = time.perf_counter()
+    new_triangles, kept = simplify(positions, triangles, target, **options)
+    return key, new_triangles, kept, time.perf_counter() - start
+
+
+# =============================================================================
+# TRAITEMENT DU GLB
+# =============================================================================
+
+def collect_tasks(gltf, binary, ratio, threshold, options):
+    """Prépare une tâche par primitive triangulée à décimer."""
+    tasks = []
+    for mesh_index, mesh in enumerate(gltf.get("meshes", [])):
+        for prim_index, primitive in enumerate(mesh["primitives"]):
+            name = f"{mesh.get('name', mesh_index)}[{prim_index}]"
+            if primitive.get("mode", 4) != 4:
+                log(f"{name} : mode non triangulaire, ignoré", "WARN")
+                continue
+            if primitive.get("targets"):
+                log(f"{name} : morph targets, ignoré", "WARN")
+                continue
+
+            positions = glb_utils.read_accessor(gltf, binary, primitive["attributes"]["POSITION"])
+            if len(positions) < threshold:
+                continue
+
+            if "indices" in primitive:
+                indices = glb_utils.read_accessor(gltf, binary, primitive["indices"])
+            else:
+                indices = np.arange(len(positions))
+            triangles = indices.reshape(-1, 3)
+
+            target = max(3, int(len(positions) * ratio))
+            tasks.append(((mesh_index, prim_index), positions, triangles, target, options))
+    return tasks
+
+
+def rebuild_primitive(gltf, binary, blob, primitive, triangles, kept):
+    """Remplace les accessors de la primitive par les données simplifiées."""
+    for name, accessor_index in list(primitive["attributes"].items()):
+        accessor = gltf["accessors"][accessor_index]
+        values = glb_utils.read_accessor(gltf, binary, accessor_index)[kept]
+        primitive["attributes"][name] = glb_utils.append_accessor(
+            gltf, blob, values,
+            target=glb_utils.TARGET_ARRAY_BUFFER,
+            normalized=accessor.get("normalized", False),
+            with_bounds=(name == "POSITION"),
+        )
+
+    index_dtype = np.uint16 if len(kept) < 65535 else np.uint32
+    primitive["indices"] = glb_utils.append_accessor(
+        gltf, blob, triangles.reshape(-1, 1).astype(index_dtype),
+        target=glb_utils.TARGET_ELEMENT_ARRAY_BUFFER,
+    )
+
+
+def decimate_gltf(gltf, binary, ratio, lock_borders, workers):
+    """
+    Décime toutes les primitives de `gltf` (modifié sur place).
+    Retourne le nouveau buffer binaire (compacté).
+    """
+    glb_utils.check_supported(gltf)
+
+    options = {
+        "lock_borders": lock_borders,
+        "seam_tolerance": CONFIG["seam_tolerance"],
+        "pass_fraction": CONFIG["pass_fraction"],
+        "max_passes": CONFIG["max_passes"],
+        "min_normal_cosine": CONFIG["min_normal_cosine"],
+    }
+    tasks = collect_tasks(gltf, binary, ratio, CONFIG["decimation_threshold"], options)
+    log(f"Primitives à décimer : {len(tasks)} (processus : {workers})", "STEP")
+
+    vertices_before = {task[0]: len(task[1]) for task in tasks}
+    blob = bytearray(binary)
+
+    with ProcessPoolExecutor(max_workers=max(1, workers)) as pool:
+        for key, triangles, kept, duration in pool.map(simplify_task, tasks):
+            mesh_index, prim_index = key
+            mesh = gltf["meshes"][mesh_index]
+            rebuild_primitive(gltf, binary, blob, mesh["primitives"][prim_index], triangles, kept)
+
+            before = vertices_before[key]
+            log(f"  {mesh.get('name', mesh_index)}[{prim_index}] : {before} -> {len(kept)} "
+                f"vertices ({duration:.2f} s)", "OK")
+            if len(kept) > before * ratio * 1.5:
+                log("    cible non atteinte (bords verrouillés ou coutures divergentes)", "WARN")
+
+    glb_utils.prune_unused(gltf)
+    return glb_utils.compact_buffers(gltf, bytes(blob))
+
+
+def decimate_glb(input_path, output_path, ratio, lock_borders, workers):
+    gltf, binary = glb_utils.read_glb(input_path)
+    binary = decimate_gltf(gltf, binary, ratio, lock_borders, workers)
+    return glb_utils.write_glb(output_path, gltf, binary)
+
+
+# =============================================================================
+# MAIN
+# =============================================================================
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Décimation QEM d'un GLB (sans Blender)")
+    parser.add_argument("input", help="GLB source")
+    parser.add_argument("output", help="GLB simplifié")
+    parser.add_argument("--ratio", type=float, default=CONFIG["ratio"],
+                        help="Part des vertices conservés par primitive")
+    parser.add_argument("--lock-borders", dest="lock_borders", action="store_true",
+                        default=CONFIG["lock_borders"])
+    parser.add_argument("--no-lock-borders", dest="lock_borders", action="store_false")
+    parser.add_argument("--workers", type=int, default=CONFIG["workers"])
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    print("\n" + "=" * 60)
+    print("DÉCIMATION GLB (QEM) - SANS BLENDER")
+    print("=" * 60)
+
+    start = time.perf_counter()
+    try:
+        size = decimate_glb(args.input, args.output, args.ratio, args.lock_borders, args.workers)
+    except ValueError as e:
+        log(str(e), "ERROR")
+        return 1
+
+    log(f"Écrit : {args.output} ({size / (1024 * 1024):.2f} Mo, "
+        f"{time.perf_counter() - start:.1f} s)", "OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,405 @@
+"""
+===============================================================================
+UTILITAIRES GLB (LECTURE / ÉCRITURE / COMPACTAGE)
+===============================================================================
+
+Projet     : AR Pédagogique - Moteur Hemi
+Fichier    : glb_utils.py
+
+Fonctions communes aux outils qui travaillent directement sur les GLB
+exportés, sans Blender :
+- lecture et écriture du conteneur GLB (chunks JSON + BIN)
+- lecture et ajout d'accessors (NumPy, importé seulement si nécessaire)
+- suppression des éléments non référencés et compactage du buffer binaire
+
+Limites : un seul buffer (celui du GLB), pas d'accessors "sparse".
+
+===============================================================================
+"""
+
+import json
+import struct
+
+GLB_MAGIC = 0x46546C67  # "glTF"
+CHUNK_JSON = 0x4E4F534A  # "JSON"
+CHUNK_BIN = 0x004E4942   # "BIN\0"
+
+# componentType glTF -> dtype NumPy
+COMPONENT_DTYPES = {
+    5120: "i1",
+    5121: "u1",
+    5122: "i2",
+    5123: "u2",
+    5125: "u4",
+    5126: "f4",
+}
+
+TYPE_SIZES = {
+    "SCALAR": 1,
+    "VEC2": 2,
+    "VEC3": 3,
+    "VEC4": 4,
+    "MAT2": 4,
+    "MAT3": 9,
+    "MAT4": 16,
+}
+
+TARGET_ARRAY_BUFFER = 34962
+TARGET_ELEMENT_ARRAY_BUFFER = 34963
+
+
+# =============================================================================
+# CONTENEUR GLB
+# =============================================================================
+
+def read_glb(path):
+    """Lit un fichier GLB. Retourne (gltf: dict, bin: bytes)."""
+    with open(path, "rb") as f:
+        data = f.read()
+    return parse_glb(data)
+
+
+def parse_glb(data):
+    magic, version, length = struct.unpack_from("<III", data, 0)
+    if magic != GLB_MAGIC:
+        raise ValueError("Fichier GLB invalide (en-tête)")
+    if version != 2:
+        raise ValueError(f"Version GLB non supportée : {version}")
+
+    gltf = None
+    binary = b""
+    offset = 12
+    while offset < length:
+        chunk_length, chunk_type = struct.unpack_from("<II", data, offset)
+        chunk = data[offset + 8:offset + 8 + chunk_length]
+        if chunk_type == CHUNK_JSON:
+            gltf = json.loads(chunk.decode("utf-8"))
+        elif chunk_type == CHUNK_BIN:
+            binary = bytes(chunk)
+        offset += 8 + chunk_length
+
+    if gltf is None:
+        raise ValueError("Fichier GLB invalide (chunk JSON absent)")
+    return gltf, binary
+
+
+def build_glb(gltf, binary):
+    """Assemble un GLB (bytes) à partir du JSON et du buffer binaire."""
+    binary = bytes(binary)
+    if binary:
+        buffers = gltf.setdefault("buffers", [{}])
+        buffers[0]["byteLength"] = len(binary)
+        buffers[0].pop("uri", None)
+
+    json_bytes = json.dumps(gltf, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    json_bytes += b" " * (-len(json_bytes) % 4)
+    bin_bytes = binary + b"\0" * (-len(binary) % 4)
+
+    length = 12 + 8 + len(json_bytes)
+    if bin_bytes:
+        length += 8 + len(bin_bytes)
+
+    parts = [
+        struct.pack("<III", GLB_MAGIC, 2, length),
+        struct.pack("<II", len(json_bytes), CHUNK_JSON),
+        json_bytes,
+    ]
+    if bin_bytes:
+        parts += [struct.pack("<II", len(bin_bytes), CHUNK_BIN), bin_bytes]
+    return b"".join(parts)
+
+
+def write_glb(path, gltf, binary):
+    """Écrit un fichier GLB. Retourne sa taille en octets."""
+    data = build_glb(gltf, binary)
+    with open(path, "wb") as f:
+        f.write(data)
+    return len(data)
+
+
+def check_supported(gltf, allow_compressed=False):
+    """
+    Refuse les fichiers que ces outils ne savent pas traiter.
+    `allow_compressed` : la géométrie compressée est acceptée si l'outil
+    ne fait que recopier les données (sans les décoder).
+    """
+    if len(gltf.get("buffers", [])) > 1:
+        raise ValueError("Plusieurs buffers : seul le buffer GLB est supporté")
+    if allow_compressed:
+        return
+    for name in ("KHR_draco_mesh_compression", "EXT_meshopt_compression"):
+        if name in gltf.get("extensionsUsed", []):
+            raise ValueError(f"Géométrie compressée ({name}) : exporter sans compression")
+
+
+# =============================================================================
+# ACCESSORS
+# =============================================================================
+
+def read_accessor(gltf, binary, index):
+    """Retourne les données d'un accessor sous forme de tableau NumPy (count, n)."""
+    import numpy as np
+
+    accessor = gltf["accessors"][index]
+    if "sparse" in accessor:
+        raise ValueError(f"Accessor {index} : format sparse non supporté")
+
+    dtype = np.dtype(COMPONENT_DTYPES[accessor["componentType"]])
+    components = TYPE_SIZES[accessor["type"]]
+    count = accessor["count"]
+
+    if "bufferView" not in accessor:
+        return np.zeros((count, components), dtype=dtype)
+
+    view = gltf["bufferViews"][accessor["bufferView"]]
+    offset = view.get("byteOffset", 0) + accessor.get("byteOffset", 0)
+    element_size = dtype.itemsize * components
+    stride = view.get("byteStride") or element_size
+
+    if stride == element_size:
+        array = np.frombuffer(binary, dtype=dtype, count=count * components, offset=offset)
+        return array.reshape(count, components).copy()
+
+    # Données entrelacées : lecture ligne par ligne via une vue strided
+    raw = np.frombuffer(binary, dtype=np.uint8, count=stride * (count - 1) + element_size,
+                        offset=offset)
+    rows = np.lib.stride_tricks.as_strided(raw, shape=(count, element_size), strides=(stride, 1))
+    return rows.copy().view(dtype).reshape(count, components)
+
+
+def append_buffer_view(gltf, blob, data, target=None):
+    """Ajoute des données à la fin du buffer (aligné sur 4 octets). Retourne l'index."""
+    blob.extend(b"\0" * (-len(blob) % 4))
+    view = {"buffer": 0, "byteOffset": len(blob), "byteLength": len(data)}
+    if target is not None:
+        view["target"] = target
+    blob.extend(data)
+
+    views = gltf.setdefault("bufferViews", [])
+    views.append(view)
+    return len(views) - 1
+
+
+def append_accessor(gltf, blob, array, target=None, normalized=False, with_bounds=False):
+    """Ajoute un tableau NumPy (count, n) comme nouvel accessor. Retourne l'index."""
+    import numpy as np
+
+    array = np.ascontiguousarray(array)
+    if array.ndim == 1:
+        array = array.reshape(-1, 1)
+
+    component_type = next(
+        (code for code, name in COMPONENT_DTYPES.items() if np.dtype(name) == array.dtype),
+        None,
+    )
+    if component_type is None:
+        raise ValueError(f"Type de données non supporté par glTF : {array.dtype}")
+    type_name = next(name for name, size in TYPE_SIZES.items()
+                     if size == array.shape[1] and not name.startswith("MAT"))
+
+    accessor = {
+        "bufferView": append_buffer_view(gltf, blob, array.tobytes(), target),
+        "componentType": component_type,
+        "count": int(array.shape[0]),
+        "type": type_name,
+    }
+    if normalized:
+        accessor["normalized"] = True
+    if with_bounds and len(array):
+        accessor["min"] = array.min(axis=0).tolist()
+        accessor["max"] = array.max(axis=0).tolist()
+
+    accessors = gltf.setdefault("accessors", [])
+    accessors.append(accessor)
+    return len(accessors) - 1
+
+
+# =============================================================================
+# SUPPRESSION DES ÉLÉMENTS INUTILISÉS ET COMPACTAGE
+# =============================================================================
+
+def _filter(gltf, key, used):
+    """Garde les éléments utilisés de gltf[key]. Retourne {ancien: nouveau}."""
+    items = gltf.get(key, [])
+    mapping = {}
+    kept = []
+    for old, item in enumerate(items):
+        if old in used:
+            mapping[old] = len(kept)
+            kept.append(item)
+    if key in gltf:
+        gltf[key] = kept
+    return mapping
+
+
+def _texture_infos(obj):
+    """Parcourt un matériau et retourne les textureInfo ({"index": ...})."""
+    found = []
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            if isinstance(value, dict) and key.lower().endswith("texture") and "index" in value:
+                found.append(value)
+            found.extend(_texture_infos(value))
+    elif isinstance(obj, list):
+        for value in obj:
+            found.extend(_texture_infos(value))
+    return found
+
+
+def _texture_sources(texture):
+    """Retourne les références d'image d'une texture (source et extensions)."""
+    holders = [texture] + list(texture.get("extensions", {}).values())
+    return [holder for holder in holders if isinstance(holder, dict) and "source" in holder]
+
+
+def _primitive_accessor_holders(primitive):
+    """Retourne (dict, clé) pour chaque référence d'accessor d'une primitive."""
+    holders = [(primitive["attributes"], name) for name in primitive["attributes"]]
+    if "indices" in primitive:
+        holders.append((primitive, "indices"))
+    for target in primitive.get("targets", []):
+        holders += [(target, name) for name in target]
+    return holders
+
+
+def remove_nodes(gltf, node_indices):
+    """
+    Supprime des nœuds et leurs descendants, ainsi que les canaux d'animation
+    qui les ciblent. Les données devenues inutiles restent à purger avec
+    prune_unused().
+    """
+    nodes = gltf.get("nodes", [])
+    removed = set()
+    stack = list(node_indices)
+    while stack:
+        index = stack.pop()
+        if index in removed:
+            continue
+        removed.add(index)
+        stack.extend(nodes[index].get("children", []))
+
+    for skin in gltf.get("skins", []):
+        if removed & set(skin.get("joints", [])):
+            raise ValueError("Suppression de nœuds utilisés par un squelette : non supporté")
+
+    node_map = _filter(gltf, "nodes", set(range(len(nodes))) - removed)
+
+    for node in gltf.get("nodes", []):
+        if "children" in node:
+            node["children"] = [node_map[c] for c in node["children"] if c in node_map]
+            if not node["children"]:
+                del node["children"]
+    for scene in gltf.get("scenes", []):
+        scene["nodes"] = [node_map[n] for n in scene.get("nodes", []) if n in node_map]
+    for skin in gltf.get("skins", []):
+        skin["joints"] = [node_map[j] for j in skin["joints"]]
+        if "skeleton" in skin:
+            skin["skeleton"] = node_map[skin["skeleton"]]
+
+    animations = []
+    for animation in gltf.get("animations", []):
+        channels = [
+            channel for channel in animation["channels"]
+            if channel["target"].get("node") in node_map
+        ]
+        if not channels:
+            continue
+        sampler_map = _filter(animation, "samplers", {c["sampler"] for c in channels})
+        for channel in channels:
+            channel["sampler"] = sampler_map[channel["sampler"]]
+            channel["target"]["node"] = node_map[channel["target"]["node"]]
+        animation["channels"] = channels
+        animations.append(animation)
+    if "animations" in gltf:
+        gltf["animations"] = animations
+
+    return len(removed)
+
+
+def prune_unused(gltf):
+    """
+    Supprime les meshes, matériaux, textures, images, samplers, accessors et
+    bufferViews qui ne sont plus référencés (après suppression de nœuds par ex.).
+    """
+    nodes = gltf.get("nodes", [])
+    meshes = gltf.get("meshes", [])
+    animations = gltf.get("animations", [])
+
+    # Meshes
+    mesh_map = _filter(gltf, "meshes", {n["mesh"] for n in nodes if "mesh" in n})
+    for node in nodes:
+        if "mesh" in node:
+            node["mesh"] = mesh_map[node["mesh"]]
+    meshes = gltf.get("meshes", [])
+    primitives = [p for mesh in meshes for p in mesh["primitives"]]
+
+    # Matériaux
+    material_map = _filter(gltf, "materials", {p["material"] for p in primitives if "material" in p})
+    for primitive in primitives:
+        if "material" in primitive:
+            primitive["material"] = material_map[primitive["material"]]
+
+    # Textures, images, samplers
+    texture_infos = [info for mat in gltf.get("materials", []) for info in _texture_infos(mat)]
+    texture_map = _filter(gltf, "textures", {info["index"] for info in texture_infos})
+    for info in texture_infos:
+        info["index"] = texture_map[info["index"]]
+
+    textures = gltf.get("textures", [])
+    sources = [src for tex in textures for src in _texture_sources(tex)]
+    image_map = _filter(gltf, "images", {src["source"] for src in sources})
+    for src in sources:
+        src["source"] = image_map[src["source"]]
+
+    sampler_map = _filter(gltf, "samplers", {t["sampler"] for t in textures if "sampler" in t})
+    for texture in textures:
+        if "sampler" in texture:
+            texture["sampler"] = sampler_map[texture["sampler"]]
+
+    # Accessors
+    holders = [h for p in primitives for h in _primitive_accessor_holders(p)]
+    for animation in animations:
+        for sampler in animation.get("samplers", []):
+            holders += [(sampler, "input"), (sampler, "output")]
+    for skin in gltf.get("skins", []):
+        if "inverseBindMatrices" in skin:
+            holders.append((skin, "inverseBindMatrices"))
+
+    accessor_map = _filter(gltf, "accessors", {h[k] for h, k in holders})
+    for holder, key in holders:
+        holder[key] = accessor_map[holder[key]]
+
+    # BufferViews
+    view_holders = []
+    for accessor in gltf.get("accessors", []):
+        if "bufferView" in accessor:
+            view_holders.append((accessor, "bufferView"))
+        sparse = accessor.get("sparse")
+        if sparse:
+            view_holders += [(sparse["indices"], "bufferView"), (sparse["values"], "bufferView")]
+    for image in gltf.get("images", []):
+        if "bufferView" in image:
+            view_holders.append((image, "bufferView"))
+    for primitive in primitives:
+        draco = primitive.get("extensions", {}).get("KHR_draco_mesh_compression")
+        if draco:
+            view_holders.append((draco, "bufferView"))
+
+    view_map = _filter(gltf, "bufferViews", {h[k] for h, k in view_holders})
+    for holder, key in view_holders:
+        holder[key] = view_map[holder[key]]
+
+
+def compact_buffers(gltf, binary):
+    """
+    Reconstruit le buffer binaire en ne copiant que les bufferViews présentes
+    (sans décodage). Retourne le nouveau buffer (bytes).
+    """
+    blob = bytearray()
+    for view in gltf.get("bufferViews", []):
+        start = view.get("byteOffset", 0)
+        data = binary[start:start + view["byteLength"]]
+        blob.extend(b"\0" * (-len(blob) % 4))
+        view["byteOffset"] = len(blob)
+        blob.extend(data)
+    return bytes(blob)
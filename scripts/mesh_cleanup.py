@@ -0,0 +1,407 @@
+"""
+===============================================================================
+NETTOYAGE ET RECONSTRUCTION VECTORISÉE DES MESHES
+===============================================================================
+
+Projet     : AR Pédagogique - Moteur Hemi
+Fichier    : mesh_cleanup.py
+
+Fonctions communes à export_states.py et export_glb.py :
+- lecture des tableaux d'un mesh (foreach_get) et reconstruction d'un mesh
+  à partir d'un sous-ensemble de faces (foreach_set, sans boucle Python)
+- détection des doublons, faces dégénérées, arêtes et vertices sans face
+- nettoyage des copies avant décimation
+
+Données conservées par la reconstruction : positions, matériaux et
+lissage des faces, UV, attributs génériques (vertex, arête, face, coin),
+marques des arêtes (coutures, arêtes vives, crease, bevel weight) et
+normales par coin (posées en normales personnalisées). Les groupes de
+vertices et les clés de forme ne sont pas reconstruits : les objets qui en
+ont ne sont pas nettoyés (voir rebuild_blockers).
+
+Les seuils (merge_distance, min_face_area) sont lus dans la configuration
+passée par l'appelant.
+
+===============================================================================
+"""
+
+import bpy
+import numpy as np
+
+
+def log(message, level="INFO"):
+    prefix = {
+        "INFO": "[INFO]",
+        "WARN": "[ATTENTION]",
+        "ERROR": "[ERREUR]",
+        "OK": "[OK]",
+        "STEP": ">>>"
+    }.get(level, "[INFO]")
+    print(f"{prefix} {message}")
+
+
+# =============================================================================
+# TABLEAUX DE MAILLAGE (RECONSTRUCTION PAR FOREACH_SET)
+# =============================================================================
+
+# Attributs génériques recopiés à la reconstruction d'un mesh :
+# type -> (propriété, largeur, dtype)
+MESH_ATTRIBUTE_LAYOUT = {
+    'FLOAT': ("value", 1, np.float32),
+    'INT': ("value", 1, np.int32),
+    'BOOLEAN': ("value", 1, bool),
+    'FLOAT2': ("vector", 2, np.float32),
+    'FLOAT_VECTOR': ("vector", 3, np.float32),
+    'FLOAT_COLOR': ("color", 4, np.float32),
+    'BYTE_COLOR': ("color", 4, np.float32),
+}
+
+# Marques des arêtes exposées par MeshEdge (crease et bevel_weight
+# deviennent des attributs génériques à partir de Blender 4.0)
+EDGE_FLAGS = {
+    "use_seam": bool,
+    "use_edge_sharp": bool,
+    "use_freestyle_mark": bool,
+    "crease": np.float32,
+    "bevel_weight": np.float32,
+}
+
+
+def read_corner_normals(mesh):
+    """Normales par coin (split normals) du mesh, tableau Nx3."""
+    normals = np.empty(len(mesh.loops) * 3, dtype=np.float32)
+    if hasattr(mesh, "corner_normals"):
+        # Blender 4.1+
+        mesh.corner_normals.foreach_get("vector", normals)
+    else:
+        mesh.calc_normals_split()
+        mesh.loops.foreach_get("normal", normals)
+    return normals.reshape(-1, 3)
+
+
+def read_mesh_arrays(mesh):
+    """
+    Lit une seule fois les tableaux d'un mesh à reconstruire (positions,
+    arêtes, coins, faces, UV, attributs, normales par coin).
+    """
+    def get(collection, prop, count, width, dtype):
+        values = np.empty(count * width, dtype=dtype)
+        collection.foreach_get(prop, values)
+        return values.reshape(-1, width) if width > 1 else values
+
+    v_count, e_count = len(mesh.vertices), len(mesh.edges)
+    l_count, f_count = len(mesh.loops), len(mesh.polygons)
+    counts = {'POINT': v_count, 'EDGE': e_count, 'FACE': f_count, 'CORNER': l_count}
+    uv_names = {layer.name for layer in mesh.uv_layers}
+    attributes = []
+    for attribute in mesh.attributes:
+        layout = MESH_ATTRIBUTE_LAYOUT.get(attribute.data_type)
+        if (layout is None or attribute.name.startswith(".") or attribute.name in uv_names
+                or attribute.name in ("position", "material_index", "sharp_face")
+                or attribute.domain not in counts):
+            continue
+        prop, width, dtype = layout
+        attributes.append((attribute.name, attribute.data_type, attribute.domain, prop,
+                           get(attribute.data, prop, counts[attribute.domain], width, dtype)))
+
+    edge_properties = bpy.types.MeshEdge.bl_rna.properties
+    edge_flags = []
+    for prop, dtype in EDGE_FLAGS.items():
+        if prop in edge_properties and not edge_properties[prop].is_readonly:
+            values = get(mesh.edges, prop, e_count, 1, dtype)
+            if values.any():
+                edge_flags.append((prop, values))
+
+    return {
+        "co": get(mesh.vertices, "co", v_count, 3, np.float32),
+        "edges": get(mesh.edges, "vertices", e_count, 2, np.int64),
+        "loop_vertex": get(mesh.loops, "vertex_index", l_count, 1, np.int32),
+        "loop_start": get(mesh.polygons, "loop_start", f_count, 1, np.int32),
+        "loop_total": get(mesh.polygons, "loop_total", f_count, 1, np.int32),
+        "material_index": get(mesh.polygons, "material_index", f_count, 1, np.int32),
+        "use_smooth": get(mesh.polygons, "use_smooth", f_count, 1, bool),
+        "centers": get(mesh.polygons, "center", f_count, 3, np.float32),
+        "uv_layers": [(layer.name, get(layer.data, "uv", l_count, 2, np.float32))
+                      for layer in mesh.uv_layers],
+        "uv_active": mesh.uv_layers.active_index,
+        "attributes": attributes,
+        "edge_flags": edge_flags,
+        "normals": read_corner_normals(mesh),
+    }
+
+
+def face_loops(loop_start, loop_total, faces):
+    """Coins des faces `faces`, dans l'ordre des faces. Retourne (coins, nombre par face)."""
+    totals = loop_total[faces]
+    starts = np.cumsum(totals) - totals
+    loops = np.repeat(loop_start[faces] - starts, totals) + np.arange(totals.sum())
+    return loops, totals
+
+
+def match_edges(arrays, used, new_edges, vertex_map):
+    """
+    Arête source de chaque arête reconstruite (-1 si elle n'existait pas),
+    retrouvée par ses deux vertices dans l'espace des indices source.
+    """
+    source = arrays["edges"] if vertex_map is None else vertex_map[arrays["edges"]]
+    source = np.sort(source, axis=1)
+    rebuilt = np.sort(used[new_edges], axis=1)
+    stride = len(arrays["co"])
+    source_keys = source[:, 0] * stride + source[:, 1]
+    rebuilt_keys = rebuilt[:, 0] * stride + rebuilt[:, 1]
+
+    matches = np.full(len(rebuilt), -1, dtype=np.int64)
+    if len(source_keys) == 0:
+        return matches
+    order = np.argsort(source_keys, kind="stable")
+    positions = np.minimum(np.searchsorted(source_keys[order], rebuilt_keys), len(order) - 1)
+    found = source_keys[order][positions] == rebuilt_keys
+    matches[found] = order[positions[found]]
+    return matches
+
+
+def build_mesh(name, materials, arrays, faces, loops, totals, loop_vertex, vertex_map=None):
+    """
+    Construit un mesh à partir des tableaux d'un autre (read_mesh_arrays) :
+    faces `faces` formées des coins `loops` (`totals` coins par face), le
+    coin i pointant sur le vertex source loop_vertex[i]. `vertex_map`
+    renvoie chaque vertex source vers celui qui le remplace (soudure), pour
+    retrouver les arêtes d'origine. Les normales par coin d'origine sont
+    posées en normales personnalisées (ombrage inchangé).
+    """
+    used, loop_vertex = np.unique(loop_vertex, return_inverse=True)
+    starts = np.cumsum(totals) - totals
+
+    mesh = bpy.data.meshes.new(name)
+    for material in materials:
+        mesh.materials.append(material)
+
+    mesh.vertices.add(len(used))
+    mesh.vertices.foreach_set("co", arrays["co"][used].ravel())
+    mesh.loops.add(len(loops))
+    mesh.loops.foreach_set("vertex_index", loop_vertex.astype(np.int32))
+    mesh.polygons.add(len(faces))
+    mesh.polygons.foreach_set("loop_start", starts.astype(np.int32))
+    if not mesh.polygons.bl_rna.properties["loop_total"].is_readonly:
+        # Lecture seule à partir de Blender 4.0 (déduit de loop_start)
+        mesh.polygons.foreach_set("loop_total", totals.astype(np.int32))
+    mesh.polygons.foreach_set("material_index", arrays["material_index"][faces])
+    mesh.polygons.foreach_set("use_smooth", arrays["use_smooth"][faces])
+
+    for layer_name, uv in arrays["uv_layers"]:
+        layer = mesh.uv_layers.new(name=layer_name)
+        layer.data.foreach_set("uv", uv[loops].ravel())
+    if arrays["uv_layers"]:
+        mesh.uv_layers.active_index = arrays["uv_active"]
+
+    mesh.update(calc_edges=True)
+
+    new_edges = np.empty(len(mesh.edges) * 2, dtype=np.int64)
+    mesh.edges.foreach_get("vertices", new_edges)
+    edge_source = match_edges(arrays, used, new_edges.reshape(-1, 2), vertex_map)
+    found = edge_source >= 0
+
+    def gather(values, indices):
+        if indices is not edge_source:
+            return values[indices]
+        # Arêtes nouvelles : valeur par défaut (zéro)
+        result = np.zeros((len(indices),) + values.shape[1:], dtype=values.dtype)
+        result[found] = values[indices[found]]
+        return result
+
+    for prop, values in arrays["edge_flags"]:
+        mesh.edges.foreach_set(prop, gather(values, edge_source))
+
+    domain_indices = {'POINT': used, 'EDGE': edge_source, 'FACE': faces, 'CORNER': loops}
+    for attr_name, data_type, domain, prop, values in arrays["attributes"]:
+        attribute = mesh.attributes.get(attr_name) or mesh.attributes.new(attr_name, data_type, domain)
+        attribute.data.foreach_set(prop, gather(values, domain_indices[domain]).ravel())
+
+    if len(loops):
+        if hasattr(mesh, "use_auto_smooth"):
+            # Avant Blender 4.1 : requis pour les normales personnalisées
+            mesh.use_auto_smooth = True
+        mesh.normals_split_custom_set(arrays["normals"][loops])
+    return mesh
+
+
+def rebuild_blockers(obj):
+    """Données de `obj` que build_mesh ne reconstruit pas (liste vide si aucune)."""
+    blockers = []
+    if obj.vertex_groups:
+        blockers.append("groupes de vertices")
+    if obj.data.shape_keys:
+        blockers.append("clés de forme")
+    return blockers
+
+
+# =============================================================================
+# NETTOYAGE DES MESHES
+# =============================================================================
+
+def is_empty_mesh(mesh, config):
+    """Mesh sans face, ou dont toutes les faces sont d'aire nulle."""
+    if mesh is None or len(mesh.polygons) == 0:
+        return True
+    areas = np.empty(len(mesh.polygons), dtype=np.float32)
+    mesh.polygons.foreach_get("area", areas)
+    return bool((areas <= config["min_face_area"]).all())
+
+
+def find_duplicate_vertices(coords, distance):
+    """
+    Regroupe les vertices à moins de `distance` les uns des autres (chaînes
+    comprises). Les paires candidates partagent une cellule de côté
+    2 x distance dans l'une des 8 grilles décalées d'une demi-cellule par
+    axe : aucune paire n'est manquée à cheval sur une frontière.
+    Retourne le représentant (plus petit indice) du groupe de chaque vertex.
+    """
+    labels = np.arange(len(coords))
+    pairs = []
+    for shift in np.ndindex(2, 2, 2):
+        cells = np.floor(coords / (2 * distance) + 0.5 * np.array(shift)).astype(np.int64)
+        _, cell = np.unique(cells, axis=0, return_inverse=True)
+        cell = cell.ravel()
+        order = np.argsort(cell, kind="stable")
+        sorted_cells = cell[order]
+        step = 1
+        while step < len(order):
+            same = sorted_cells[step:] == sorted_cells[:-step]
+            if not same.any():
+                break
+            pairs.append(np.stack([order[:-step][same], order[step:][same]], axis=1))
+            step += 1
+
+    if not pairs:
+        return labels
+    pairs = np.unique(np.concatenate(pairs), axis=0)
+    close = np.linalg.norm(coords[pairs[:, 0]] - coords[pairs[:, 1]], axis=1) <= distance
+    a, b = pairs[close, 0], pairs[close, 1]
+
+    # Composantes connexes par propagation du plus petit indice
+    while True:
+        low = np.minimum(labels[a], labels[b])
+        updated = labels.copy()
+        np.minimum.at(updated, a, low)
+        np.minimum.at(updated, b, low)
+        updated = updated[updated]
+        if np.array_equal(updated, labels):
+            return labels
+        labels = updated
+
+
+def detect_mesh_defects(mesh, config):
+    """
+    Analyse un mesh par opérations sur tableaux (foreach_get) :
+    doublons (vertices à moins de config["merge_distance"], voir
+    find_duplicate_vertices), faces dégénérées (moins de 3 sommets distincts
+    après fusion, ou aire nulle), puis arêtes et vertices qui n'ont plus de
+    face une fois les faces dégénérées retirées.
+    Retourne (comptes, plan de nettoyage pour clean_mesh). Vertices et faces
+    retirés par clean_mesh sont exactement ceux comptés ; les arêtes
+    soudées avec les doublons ne sont pas comptées.
+    """
+    counts = {"doublons": 0, "faces_degenerees": 0, "aretes_sans_face": 0, "vertices_sans_face": 0}
+    v_count, e_count, l_count, p_count = (
+        len(mesh.vertices), len(mesh.edges), len(mesh.loops), len(mesh.polygons)
+    )
+    if v_count == 0:
+        return counts, None
+
+    coords = np.empty(v_count * 3, dtype=np.float64)
+    mesh.vertices.foreach_get("co", coords)
+    merged = find_duplicate_vertices(coords.reshape(-1, 3), config["merge_distance"])
+    representatives = np.unique(merged)
+    counts["doublons"] = v_count - len(representatives)
+
+    loop_vertices = np.empty(l_count, dtype=np.int64)
+    mesh.loops.foreach_get("vertex_index", loop_vertices)
+    loop_edges = np.empty(l_count, dtype=np.int64)
+    mesh.loops.foreach_get("edge_index", loop_edges)
+    starts = np.empty(p_count, dtype=np.int64)
+    mesh.polygons.foreach_get("loop_start", starts)
+    totals = np.empty(p_count, dtype=np.int64)
+    mesh.polygons.foreach_get("loop_total", totals)
+    areas = np.empty(p_count, dtype=np.float32)
+    mesh.polygons.foreach_get("area", areas)
+
+    # Coins dans l'ordre des faces ; un coin est retiré s'il pointe sur le
+    # même vertex (après fusion) que le coin suivant de sa face
+    loops, _ = face_loops(starts, totals, np.arange(p_count))
+    face_of_loop = np.repeat(np.arange(p_count), totals)
+    vertices = merged[loop_vertices[loops]]
+    following = np.arange(len(loops)) + 1
+    ends = np.cumsum(totals) - 1
+    following[ends] = ends - totals + 1
+    keep_loop = vertices != vertices[following]
+
+    new_totals = np.bincount(face_of_loop[keep_loop], minlength=p_count)
+    pairs = np.unique(np.stack([face_of_loop[keep_loop], vertices[keep_loop]], axis=1), axis=0)
+    distinct = np.bincount(pairs[:, 0], minlength=p_count)
+    degenerate = (distinct < 3) | (distinct != new_totals) | (areas <= config["min_face_area"])
+    counts["faces_degenerees"] = int(degenerate.sum())
+
+    kept_face_loop = ~degenerate[face_of_loop]
+    edge_kept = np.zeros(e_count, dtype=bool)
+    edge_kept[loop_edges[loops[kept_face_loop]]] = True
+    counts["aretes_sans_face"] = int((~edge_kept).sum())
+
+    keep_loop &= kept_face_loop
+    counts["vertices_sans_face"] = len(representatives) - len(np.unique(vertices[keep_loop]))
+
+    plan = {
+        "merged": merged,
+        "faces": np.flatnonzero(~degenerate),
+        "loops": loops[keep_loop],
+        "totals": new_totals[~degenerate],
+    }
+    return counts, plan
+
+
+def clean_mesh(obj, plan):
+    """
+    Reconstruit le mesh de `obj` selon le plan de detect_mesh_defects :
+    seuls les doublons détectés sont soudés, les faces dégénérées et les
+    éléments sans face disparaissent (reconstruction par foreach_set, sans
+    boucle Python).
+    """
+    mesh = obj.data
+    arrays = read_mesh_arrays(mesh)
+    loop_vertex = plan["merged"][arrays["loop_vertex"][plan["loops"]]]
+    cleaned = build_mesh(mesh.name, mesh.materials, arrays, plan["faces"], plan["loops"],
+                         plan["totals"], loop_vertex, vertex_map=plan["merged"])
+    obj.data = cleaned
+    name = mesh.name
+    bpy.data.meshes.remove(mesh)
+    cleaned.name = name
+
+
+def clean_copies(copies, config):
+    """
+    Nettoie les copies avant décimation et retire celles qui deviennent vides.
+    Affiche, par objet, le nombre d'éléments supprimés. Les copies dont des
+    données ne survivraient pas à la reconstruction restent telles quelles.
+    """
+    for original_name, obj_copy in list(copies.items()):
+        if obj_copy.type != 'MESH':
+            continue
+
+        mesh = obj_copy.data
+        defects, plan = detect_mesh_defects(mesh, config)
+        details = ", ".join(f"{key} {value}" for key, value in defects.items() if value)
+        blockers = rebuild_blockers(obj_copy) if details else []
+        if blockers:
+            log(f"Non nettoyé : {original_name} ({details}) : "
+                f"{', '.join(blockers)} à conserver", "WARN")
+        elif details:
+            before = len(mesh.vertices)
+            clean_mesh(obj_copy, plan)
+            mesh = obj_copy.data
+            log(f"Nettoyé : {original_name} ({details}) : "
+                f"{before:,} -> {len(mesh.vertices):,} vertices", "INFO")
+
+        if is_empty_mesh(mesh, config):
+            log(f"Ignoré : {original_name} (vide après nettoyage)", "WARN")
+            del copies[original_name]
+            bpy.data.objects.remove(obj_copy, do_unlink=True)
+            bpy.data.meshes.remove(mesh)
@@ -0,0 +1,164 @@
+"""
+===============================================================================
+GLB PROGRESSIF : VERSION GROSSIÈRE EN TÊTE DU BUFFER (SANS BLENDER)
+===============================================================================
+
+Projet     : AR Pédagogique - Moteur Hemi
+Fichier    : progressive_glb.py
+Sortie     : GLB progressif (même contenu que l'entrée, lisible partout)
+
+PRINCIPE DE FONCTIONNEMENT :
+----------------------------
+1. Lit le GLB d'un état (export sans Draco)
+2. En dérive une version grossière : chaque primitive fortement décimée
+   (glb_decimate.py), textures retirées (couleurs des matériaux gardées)
+3. Écrit un GLB dont le chunk BIN commence par les données grossières,
+   suivies des données complètes (bufferViews décalées d'autant)
+4. Le JSON de la version grossière est rangé dans
+   extras.progressive du JSON principal, avec sa longueur en octets
+
+Un lecteur ordinaire ignore extras et n'affiche que la version complète.
+app.js, lui, lit le fichier en flux : dès que le JSON puis les
+`coarseByteLength` premiers octets du BIN sont arrivés, il assemble un
+GLB grossier et l'affiche, puis passe au modèle complet en fin de
+téléchargement.
+
+USAGE :
+-------
+python3 scripts/progressive_glb.py assets/models/hemi_state_a_full.glb
+python3 scripts/progressive_glb.py entree.glb --output sortie.glb --coarse-ratio 0.05
+
+Dépendance : NumPy (via glb_decimate.py).
+
+===============================================================================
+"""
+
+import argparse
+import copy
+import sys
+import time
+
+import glb_decimate
+import glb_utils
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+CONFIG = {
+    # Part des vertices gardés dans la version grossière
+    "coarse_ratio": 0.1,
+    # Bords libres : la version grossière peut s'éloigner de la silhouette
+    "coarse_lock_borders": False,
+    # Retirer textures et coordonnées UV de la version grossière
+    "strip_textures": True,
+    "workers": glb_decimate.CONFIG["workers"],
+}
+
+TEXTURE_SLOTS = ("normalTexture", "occlusionTexture", "emissiveTexture")
+PBR_TEXTURE_SLOTS = ("baseColorTexture", "metallicRoughnessTexture")
+
+
+# =============================================================================
+# FONCTIONS UTILITAIRES
+# =============================================================================
+
+log = glb_decimate.log
+
+
+def strip_textures(gltf):
+    """Retire les textures des matériaux et les UV des primitives."""
+    for material in gltf.get("materials", []):
+        for slot in TEXTURE_SLOTS:
+            material.pop(slot, None)
+        pbr = material.get("pbrMetallicRoughness", {})
+        for slot in PBR_TEXTURE_SLOTS:
+            pbr.pop(slot, None)
+        material.pop("extensions", None)
+
+    for mesh in gltf.get("meshes", []):
+        for primitive in mesh["primitives"]:
+            attributes = primitive["attributes"]
+            for name in [n for n in attributes if n.startswith("TEXCOORD_")]:
+                del attributes[name]
+
+    for key in ("extensionsUsed", "extensionsRequired"):
+        if key in gltf:
+            gltf[key] = [name for name in gltf[key] if not name.startswith("KHR_texture")]
+
+
+# =============================================================================
+# CONSTRUCTION
+# =============================================================================
+
+def make_progressive(gltf, binary, coarse_ratio, workers):
+    """
+    Ajoute la version grossière à `gltf` (modifié sur place).
+    Retourne (buffer binaire : grossier puis complet, octets grossiers).
+    """
+    glb_utils.check_supported(gltf)
+    if "progressive" in gltf.get("extras", {}):
+        raise ValueError("GLB déjà progressif")
+
+    coarse = copy.deepcopy(gltf)
+    coarse.pop("extras", None)
+    if CONFIG["strip_textures"]:
+        strip_textures(coarse)
+    coarse_binary = glb_decimate.decimate_gltf(
+        coarse, binary, coarse_ratio, CONFIG["coarse_lock_borders"], workers
+    )
+    coarse_binary += b"\0" * (-len(coarse_binary) % 4)
+    coarse["buffers"] = [{"byteLength": len(coarse_binary)}]
+
+    # Données complètes placées après les données grossières
+    offset = len(coarse_binary)
+    for view in gltf.get("bufferViews", []):
+        view["byteOffset"] = view.get("byteOffset", 0) + offset
+
+    gltf.setdefault("extras", {})["progressive"] = {
+        "coarseByteLength": len(coarse_binary),
+        "coarse": coarse,
+    }
+    return coarse_binary + binary, len(coarse_binary)
+
+
+# =============================================================================
+# MAIN
+# =============================================================================
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="GLB progressif (version grossière en tête)")
+    parser.add_argument("input", help="GLB d'un état (sans Draco)")
+    parser.add_argument("--output", help="GLB progressif (par défaut : remplace l'entrée)")
+    parser.add_argument("--coarse-ratio", type=float, default=CONFIG["coarse_ratio"],
+                        help="Part des vertices gardés dans la version grossière")
+    parser.add_argument("--workers", type=int, default=CONFIG["workers"])
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    print("\n" + "=" * 60)
+    print("GLB PROGRESSIF - SANS BLENDER")
+    print("=" * 60)
+
+    start = time.perf_counter()
+    try:
+        gltf, binary = glb_utils.read_glb(args.input)
+        full_bytes = len(binary)
+        binary, coarse_bytes = make_progressive(gltf, binary, args.coarse_ratio, args.workers)
+        size = glb_utils.write_glb(args.output or args.input, gltf, binary)
+    except ValueError as e:
+        log(str(e), "ERROR")
+        return 1
+
+    log(f"Version grossière : {coarse_bytes / 1024:.0f} Ko "
+        f"(complète : {full_bytes / 1024:.0f} Ko)", "OK")
+    log(f"Écrit : {args.output or args.input} ({size / (1024 * 1024):.2f} Mo, "
+        f"{time.perf_counter() - start:.1f} s)", "OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
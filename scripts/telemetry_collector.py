@@ -0,0 +1,295 @@
+"""
+===============================================================================
+COLLECTEUR DE TÉLÉMÉTRIE DU MODULE AR
+===============================================================================
+
+Projet     : AR Pédagogique - Moteur Hemi
+Fichier    : telemetry_collector.py
+Sortie     : telemetry.jsonl (une mesure par ligne, ajout uniquement)
+
+PRINCIPE DE FONCTIONNEMENT :
+----------------------------
+1. "serve" : petit serveur HTTP local qui reçoit les lots envoyés par
+   app.js (navigator.sendBeacon) et les ajoute au fichier JSON lines
+2. "summary" : lit le fichier et affiche les percentiles par état et
+   par classe d'appareil
+
+MESURES REÇUES (voir TELEMETRY_CONFIG dans assets/js/app.js) :
+--------------------------------------------------------------
+- fetch  : téléchargement d'un GLB (durée en ms, octets) ; les
+           préchargements (prefetch: true) sont comptés à part
+- load   : changement de src -> événement 'load' du model-viewer (ms) ;
+           en chargement progressif, la version grossière (level:
+           "coarse") est comptée à part du modèle complet
+- frames : durées de frame échantillonnées (orbite, entrée en AR)
+
+USAGE :
+-------
+python3 scripts/telemetry_collector.py serve --port 8787
+# puis dans index.html : <model-viewer data-telemetry-endpoint="http://localhost:8787/telemetry" ...>
+
+python3 scripts/telemetry_collector.py summary
+
+# Vérification des percentiles (valeurs connues)
+python3 -m doctest scripts/telemetry_collector.py
+
+===============================================================================
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+CONFIG = {
+    "host": "0.0.0.0",
+    "port": 8787,
+    "path": "/telemetry",
+    "store": "telemetry.jsonl",
+    # Taille maximale d'un lot accepté (octets)
+    "max_body": 256 * 1024,
+    "percentiles": [50, 90, 99],
+    # Champs numériques des événements, convertis en nombres à la réception
+    "numeric_fields": ["duration", "bytes", "count", "p50", "p95", "max", "t"],
+}
+
+
+# =============================================================================
+# FONCTIONS UTILITAIRES
+# =============================================================================
+
+def log(message, level="INFO"):
+    prefix = {
+        "INFO": "[INFO]",
+        "WARN": "[ATTENTION]",
+        "ERROR": "[ERREUR]",
+        "OK": "[OK]",
+        "STEP": ">>>"
+    }.get(level, "[INFO]")
+    print(f"{prefix} {message}", flush=True)
+
+
+def percentile(sorted_values, p):
+    """
+    Percentile par rang le plus proche (liste déjà triée) : rang
+    ceil(p/100 x n), borné à [1, n].
+
+    >>> percentile([1, 2, 3, 4, 5], 50)
+    3
+    >>> percentile([1, 2, 3, 4], 50)
+    2
+    >>> percentile([15, 20, 35, 40, 50], 90)
+    50
+    >>> percentile([15, 20, 35, 40, 50], 0)
+    15
+    >>> percentile(list(range(1, 101)), 95)
+    95
+    """
+    if not sorted_values:
+        return None
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(p / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+# =============================================================================
+# COLLECTE
+# =============================================================================
+
+def normalize_event(event):
+    """
+    Valide un événement reçu : type texte, champs numériques convertis en
+    nombres finis. Retourne l'événement normalisé, ou None s'il est rejeté.
+    """
+    if not isinstance(event, dict) or not isinstance(event.get("type"), str):
+        return None
+
+    for field in CONFIG["numeric_fields"]:
+        if field not in event or event[field] is None:
+            continue
+        value = event[field]
+        if isinstance(value, bool):
+            return None
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            return None
+        if not math.isfinite(value):
+            return None
+        event[field] = value
+    return event
+
+
+class TelemetryStore:
+    """Fichier JSON lines en ajout seul, partagé entre les threads du serveur."""
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+
+    def append(self, events):
+        """Ajoute les événements valides. Retourne le nombre de rejetés."""
+        received = time.time()
+        rejected = 0
+        with self.lock, open(self.path, "a", encoding="utf-8") as f:
+            for event in events:
+                event = normalize_event(event)
+                if event is None:
+                    rejected += 1
+                    continue
+                event["received"] = received
+                f.write(json.dumps(event, ensure_ascii=False) + "\n")
+        return rejected
+
+
+def make_handler(store):
+    class TelemetryHandler(BaseHTTPRequestHandler):
+        def _send(self, status):
+            self.send_response(status)
+            self.send_header("Access-Control-Allow-Origin", "*")
+            self.send_header("Access-Control-Allow-Methods", "POST, OPTIONS")
+            self.send_header("Access-Control-Allow-Headers", "Content-Type")
+            self.end_headers()
+
+        def do_OPTIONS(self):
+            self._send(204)
+
+        def do_POST(self):
+            if self.path != CONFIG["path"]:
+                self._send(404)
+                return
+
+            length = int(self.headers.get("Content-Length", 0))
+            if length <= 0 or length > CONFIG["max_body"]:
+                self._send(413)
+                return
+
+            try:
+                payload = json.loads(self.rfile.read(length).decode("utf-8"))
+                events = payload.get("events", [])
+            except (ValueError, AttributeError):
+                self._send(400)
+                return
+            if not isinstance(events, list):
+                self._send(400)
+                return
+
+            rejected = store.append(events)
+            if rejected:
+                log(f"{rejected} événement(s) invalide(s) ignoré(s)", "WARN")
+            self._send(204)
+
+        def log_message(self, format, *args):
+            pass
+
+    return TelemetryHandler
+
+
+def serve(host, port, store_path):
+    server = ThreadingHTTPServer((host, port), make_handler(TelemetryStore(store_path)))
+    log(f"Collecteur prêt : http://{host}:{port}{CONFIG['path']} -> {store_path}", "OK")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    server.server_close()
+
+
+# =============================================================================
+# SYNTHÈSE
+# =============================================================================
+
+def load_events(store_path):
+    events = []
+    with open(store_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                events.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return events
+
+
+def metric_values(event):
+    """Retourne [(nom_de_mesure, valeur)] pour un événement."""
+    kind = event.get("type")
+    if kind == "fetch":
+        # Préchargements en tâche de fond : hors du temps d'attente ressenti
+        prefix = "prefetch" if event.get("prefetch") else "fetch"
+        return [(f"{prefix}_ms", event.get("duration")),
+                (f"{prefix}_kb", (event.get("bytes") or 0) / 1024)]
+    if kind == "load":
+        # Chargement progressif : version grossière mesurée à part
+        if event.get("level") == "coarse":
+            return [("load_coarse_ms", event.get("duration"))]
+        return [("load_ms", event.get("duration"))]
+    if kind == "frames":
+        return [(f"frame_{event.get('kind')}_p50_ms", event.get("p50")),
+                (f"frame_{event.get('kind')}_p95_ms", event.get("p95"))]
+    return []
+
+
+def summarize(store_path):
+    if not os.path.exists(store_path):
+        log(f"Aucune mesure : {store_path} introuvable (lancer d'abord 'serve')", "ERROR")
+        return False
+
+    groups = defaultdict(list)
+    for event in load_events(store_path):
+        for metric, value in metric_values(event):
+            if value is not None:
+                groups[(event.get("state"), event.get("device"), metric)].append(value)
+
+    print("\n" + "=" * 78)
+    print("TÉLÉMÉTRIE : PERCENTILES PAR ÉTAT ET CLASSE D'APPAREIL")
+    print("=" * 78)
+    header = "  ".join(f"{'p' + str(p):>7}" for p in CONFIG["percentiles"])
+    print(f"{'état':<10} {'appareil':<11} {'mesure':<22} {'n':>5}  {header}")
+    print("-" * 78)
+
+    for (state, device, metric), values in sorted(groups.items(), key=lambda item: str(item[0])):
+        values.sort()
+        cells = "  ".join(f"{percentile(values, p):>7.1f}" for p in CONFIG["percentiles"])
+        print(f"{str(state):<10} {str(device):<11} {metric:<22} {len(values):>5}  {cells}")
+
+    print("=" * 78 + "\n")
+    return True
+
+
+# =============================================================================
+# MAIN
+# =============================================================================
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Collecteur de télémétrie du module AR")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = sub.add_parser("serve", help="Recevoir les mesures")
+    serve_parser.add_argument("--host", default=CONFIG["host"])
+    serve_parser.add_argument("--port", type=int, default=CONFIG["port"])
+    serve_parser.add_argument("--store", default=CONFIG["store"])
+
+    summary_parser = sub.add_parser("summary", help="Afficher les percentiles")
+    summary_parser.add_argument("--store", default=CONFIG["store"])
+
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.command == "serve":
+        serve(args.host, args.port, args.store)
+        return 0
+    return 0 if summarize(args.store) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())